@@ -0,0 +1,52 @@
+"""reservation period range and no-overlap exclusion constraint
+
+Revision ID: 3b8e51c0d2a4
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e51c0d2a4'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Statements are idempotent because app startup runs create_all, which
+    # may already have created the column and constraint on fresh databases.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        """
+        ALTER TABLE reservations ADD COLUMN IF NOT EXISTS period tsrange
+        GENERATED ALWAYS AS (
+            tsrange("date" + "time", CASE
+                WHEN end_time IS NULL THEN "date" + "time" + interval '2 hours'
+                WHEN end_time > "time" THEN "date" + end_time
+                ELSE "date" + end_time + interval '1 day' END, '[)')
+        ) STORED
+        """
+    )
+    # Fails if confirmed reservations already overlap on a table; cancel or
+    # move the duplicates before upgrading.
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'reservations_no_overlap') THEN
+                ALTER TABLE reservations ADD CONSTRAINT reservations_no_overlap
+                EXCLUDE USING gist (table_id WITH =, period WITH &&)
+                WHERE (status = 'confirmed' AND table_id IS NOT NULL);
+            END IF;
+        END $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE reservations DROP CONSTRAINT IF EXISTS reservations_no_overlap")
+    op.execute("ALTER TABLE reservations DROP COLUMN IF EXISTS period")
@@ -0,0 +1,26 @@
+"""composite indexes for keyset pagination of reservations and orders
+
+Revision ID: 7c2d9e4f1a60
+Revises: 3b8e51c0d2a4
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2d9e4f1a60'
+down_revision = '3b8e51c0d2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_reservations_date_id ON reservations (date, id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_orders_order_time_id ON orders (order_time, id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_orders_order_time_id")
+    op.execute("DROP INDEX IF EXISTS ix_reservations_date_id")
@@ -0,0 +1,51 @@
+"""reservation change versions and tombstones for the calendar delta feed
+
+Revision ID: 9e4a7b3c5d18
+Revises: 7c2d9e4f1a60
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4a7b3c5d18'
+down_revision = '7c2d9e4f1a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS reservation_change_seq")
+    # The default numbers existing rows as well
+    op.execute(
+        "ALTER TABLE reservations ADD COLUMN IF NOT EXISTS change_version bigint "
+        "NOT NULL DEFAULT nextval('reservation_change_seq')"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_reservations_date_change_version "
+        "ON reservations (date, change_version)"
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reservation_tombstones (
+            id varchar PRIMARY KEY,
+            reservation_id varchar NOT NULL,
+            date date NOT NULL,
+            change_version bigint NOT NULL DEFAULT nextval('reservation_change_seq'),
+            created_at timestamp without time zone NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_reservation_tombstones_date_change_version "
+        "ON reservation_tombstones (date, change_version)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS reservation_tombstones")
+    op.execute("DROP INDEX IF EXISTS ix_reservations_date_change_version")
+    op.execute("ALTER TABLE reservations DROP COLUMN IF EXISTS change_version")
+    op.execute("DROP SEQUENCE IF EXISTS reservation_change_seq")
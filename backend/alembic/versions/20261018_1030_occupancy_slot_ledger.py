@@ -0,0 +1,54 @@
+"""occupancy slot ledger
+
+Revision ID: 4f6b0a8d2c91
+Revises: 9e4a7b3c5d18
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f6b0a8d2c91'
+down_revision = '9e4a7b3c5d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS occupancy_slots (
+            date date NOT NULL,
+            slot integer NOT NULL,
+            table_id varchar NOT NULL REFERENCES tables (id) ON DELETE CASCADE,
+            reservation_id varchar NOT NULL REFERENCES reservations (id) ON DELETE CASCADE,
+            PRIMARY KEY (date, slot, table_id, reservation_id)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_occupancy_slots_reservation_id "
+        "ON occupancy_slots (reservation_id)"
+    )
+    # Backfill 15 minute slots from existing confirmed reservations
+    op.execute(
+        """
+        INSERT INTO occupancy_slots (date, slot, table_id, reservation_id)
+        SELECT r.date, s.slot, r.table_id, r.id
+        FROM reservations r
+        CROSS JOIN LATERAL (
+            SELECT
+                floor(extract(epoch FROM lower(r.period) - r.date::timestamp) / 60 / 15)::int * 15 AS first_slot,
+                ceil(extract(epoch FROM upper(r.period) - r.date::timestamp) / 60 / 15)::int * 15 AS end_slot
+        ) b
+        CROSS JOIN LATERAL generate_series(b.first_slot, b.end_slot - 15, 15) AS s(slot)
+        WHERE r.status = 'confirmed' AND r.table_id IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS occupancy_slots")
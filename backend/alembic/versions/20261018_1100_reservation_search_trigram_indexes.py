@@ -0,0 +1,47 @@
+"""reservation search trigram indexes
+
+Revision ID: a61c3e8f0b27
+Revises: 4f6b0a8d2c91
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61c3e8f0b27'
+down_revision = '4f6b0a8d2c91'
+branch_labels = None
+depends_on = None
+
+# Must match app.utils.search.fold_expression / digits_expression
+FOLD = "lower(translate({}, 'İIıŞşĞğÜüÖöÇç', 'iiissgguuoocc'))"
+DIGITS = "regexp_replace(coalesce({}, ''), '[^0-9]', '', 'g')"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_first_name_trgm "
+        f"ON users USING gin ({FOLD.format('first_name')} gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_last_name_trgm "
+        f"ON users USING gin ({FOLD.format('last_name')} gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_users_phone_trgm "
+        f"ON users USING gin ({DIGITS.format('phone')} gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_reservations_confirmation_number_trgm "
+        "ON reservations USING gin (confirmation_number gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_reservations_confirmation_number_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_phone_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_last_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_first_name_trgm")
@@ -0,0 +1,28 @@
+"""active orders partial index
+
+Revision ID: c84d2f7a9e13
+Revises: a61c3e8f0b27
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c84d2f7a9e13'
+down_revision = 'a61c3e8f0b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Kitchen view reads only non-terminal orders
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_orders_active_order_time ON orders (order_time) "
+        "WHERE status IN ('pending', 'preparing', 'ready')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_orders_active_order_time")
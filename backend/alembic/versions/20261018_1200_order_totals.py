@@ -0,0 +1,44 @@
+"""order subtotal and total amount
+
+Revision ID: e2a9b4c7d130
+Revises: c84d2f7a9e13
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9b4c7d130'
+down_revision = 'c84d2f7a9e13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE orders ADD COLUMN IF NOT EXISTS subtotal numeric(10, 2) NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE orders ADD COLUMN IF NOT EXISTS total_amount numeric(10, 2) NOT NULL DEFAULT 0")
+    # Backfill from existing order items
+    op.execute(
+        """
+        UPDATE orders o
+        SET subtotal = t.amount, total_amount = t.amount
+        FROM (
+            SELECT order_id, SUM(price_at_order * quantity) AS amount
+            FROM order_items
+            GROUP BY order_id
+        ) t
+        WHERE t.order_id = o.id
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_orders_order_time_revenue "
+        "ON orders (order_time) INCLUDE (status, total_amount)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_orders_order_time_revenue")
+    op.execute("ALTER TABLE orders DROP COLUMN IF EXISTS total_amount")
+    op.execute("ALTER TABLE orders DROP COLUMN IF EXISTS subtotal")
@@ -0,0 +1,41 @@
+"""idempotency keys
+
+Revision ID: 5d7e1f3a8b42
+Revises: e2a9b4c7d130
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d7e1f3a8b42'
+down_revision = 'e2a9b4c7d130'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            user_id varchar NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            scope varchar NOT NULL,
+            key varchar(255) NOT NULL,
+            request_hash varchar(64) NOT NULL,
+            status_code integer,
+            response json,
+            created_at timestamp without time zone NOT NULL,
+            PRIMARY KEY (user_id, scope, key)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_created_at "
+        "ON idempotency_keys (created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS idempotency_keys")
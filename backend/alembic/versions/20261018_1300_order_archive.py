@@ -0,0 +1,64 @@
+"""order archive
+
+Revision ID: 8b3f6d2e1c75
+Revises: 5d7e1f3a8b42
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3f6d2e1c75'
+down_revision = '5d7e1f3a8b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS orders_archive (
+            id varchar PRIMARY KEY,
+            order_number varchar NOT NULL UNIQUE,
+            reservation_id varchar,
+            table_id varchar,
+            status orderstatus NOT NULL,
+            order_time timestamp without time zone NOT NULL,
+            ready_time timestamp without time zone,
+            notes text,
+            subtotal numeric(10, 2) NOT NULL,
+            total_amount numeric(10, 2) NOT NULL,
+            created_at timestamp without time zone NOT NULL,
+            updated_at timestamp without time zone NOT NULL,
+            archived_at timestamp without time zone NOT NULL
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS order_items_archive (
+            id varchar PRIMARY KEY,
+            order_id varchar NOT NULL REFERENCES orders_archive (id) ON DELETE CASCADE,
+            menu_item_id varchar NOT NULL,
+            quantity integer NOT NULL,
+            price_at_order numeric(10, 2) NOT NULL,
+            special_notes text,
+            created_at timestamp without time zone NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_orders_archive_order_time_id "
+        "ON orders_archive (order_time, id)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_orders_archive_reservation_id ON orders_archive (reservation_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_orders_archive_table_id ON orders_archive (table_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_order_items_archive_order_id ON order_items_archive (order_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_order_items_archive_menu_item_id ON order_items_archive (menu_item_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS order_items_archive")
+    op.execute("DROP TABLE IF EXISTS orders_archive")
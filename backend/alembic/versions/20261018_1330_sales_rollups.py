@@ -0,0 +1,65 @@
+"""sales rollups
+
+Revision ID: 1e7c9a4d5b36
+Revises: 8b3f6d2e1c75
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e7c9a4d5b36'
+down_revision = '8b3f6d2e1c75'
+branch_labels = None
+depends_on = None
+
+# Served order lines, live and archived
+SERVED_LINES = """
+    SELECT o.id, o.order_time, oi.menu_item_id, oi.quantity, oi.price_at_order
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.status = 'served'
+    UNION ALL
+    SELECT o.id, o.order_time, oi.menu_item_id, oi.quantity, oi.price_at_order
+    FROM orders_archive o JOIN order_items_archive oi ON oi.order_id = o.id
+    WHERE o.status = 'served'
+"""
+
+
+def upgrade() -> None:
+    for table, bucket, bucket_type, bucket_expr in (
+        ("sales_daily", "day", "date", "CAST(s.order_time AS date)"),
+        ("sales_hourly", "hour", "timestamp without time zone", "date_trunc('hour', s.order_time)"),
+    ):
+        op.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {bucket} {bucket_type} NOT NULL,
+                menu_item_id varchar NOT NULL,
+                category menucategory,
+                quantity integer NOT NULL DEFAULT 0,
+                revenue numeric(12, 2) NOT NULL DEFAULT 0,
+                order_count integer NOT NULL DEFAULT 0,
+                PRIMARY KEY ({bucket}, menu_item_id)
+            )
+            """
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_category ON {table} (category)")
+        # Backfill from order history
+        op.execute(
+            f"""
+            INSERT INTO {table} ({bucket}, menu_item_id, category, quantity, revenue, order_count)
+            SELECT {bucket_expr}, s.menu_item_id, mi.category,
+                   SUM(s.quantity), SUM(s.quantity * s.price_at_order), COUNT(DISTINCT s.id)
+            FROM ({SERVED_LINES}) s
+            LEFT JOIN menu_items mi ON mi.id = s.menu_item_id
+            GROUP BY 1, s.menu_item_id, mi.category
+            ON CONFLICT DO NOTHING
+            """
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS sales_hourly")
+    op.execute("DROP TABLE IF EXISTS sales_daily")
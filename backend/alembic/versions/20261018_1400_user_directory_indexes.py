@@ -0,0 +1,29 @@
+"""user directory indexes
+
+Revision ID: 6a2d8f4b9e07
+Revises: 1e7c9a4d5b36
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2d8f4b9e07'
+down_revision = '1e7c9a4d5b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_role_created_at_id ON users (role, created_at, id)")
+    # Email prefix search (LIKE 'term%') on the lowercased address
+    op.execute("CREATE INDEX IF NOT EXISTS ix_users_email_prefix ON users (lower(email) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_email_prefix")
+    op.execute("DROP INDEX IF EXISTS ix_users_role_created_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_users_created_at_id")
@@ -0,0 +1,42 @@
+"""reservation tombstones written by a delete trigger
+
+Revision ID: 3f8b1c6e2a94
+Revises: 6a2d8f4b9e07
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8b1c6e2a94'
+down_revision = '6a2d8f4b9e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Reservations deleted with their user never passed through
+    # delete_booking(); the trigger covers every delete
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION reservation_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO reservation_tombstones (id, reservation_id, date, created_at)
+            VALUES (gen_random_uuid()::text, OLD.id, OLD.date, timezone('utc', clock_timestamp()));
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS reservations_tombstone ON reservations")
+    op.execute(
+        "CREATE TRIGGER reservations_tombstone AFTER DELETE ON reservations "
+        "FOR EACH ROW EXECUTE FUNCTION reservation_tombstone()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS reservations_tombstone ON reservations")
+    op.execute("DROP FUNCTION IF EXISTS reservation_tombstone()")
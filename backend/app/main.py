@@ -9,12 +9,16 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import socketio
+import asyncio
 import os
 from app.config import settings
 from app.routers import auth, reservation, menu, order, table, admin, chat, category, upload
 from app.routers import settings as settings_router
 from app.utils.logger import logger
 from app.database import engine, Base
+from app.realtime import sio
+from app.services.order_archive import run_archiver
+from app.services.idempotency import run_key_purger
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -40,14 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
-
-# Socket.IO server
-sio = socketio.AsyncServer(
-    async_mode='asgi',
-    cors_allowed_origins=settings.cors_origins_list,
-    logger=False,
-    engineio_logger=False
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Combine FastAPI and Socket.IO
@@ -70,6 +67,20 @@ static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
 os.makedirs(os.path.join(static_dir, "uploads"), exist_ok=True)
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
+# Background order archiver
+@app.on_event("startup")
+async def start_order_archiver():
+    """Start moving old finished orders to the archive tables"""
+    if settings.ORDER_ARCHIVE_INTERVAL_MINUTES > 0:
+        asyncio.create_task(run_archiver())
+
+# Expired Idempotency-Key purge, independent of the archiver
+@app.on_event("startup")
+async def start_idempotency_key_purger():
+    """Start deleting expired idempotency keys"""
+    if settings.IDEMPOTENCY_PURGE_INTERVAL_MINUTES > 0:
+        asyncio.create_task(run_key_purger())
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -105,49 +116,6 @@ async def not_found_handler(request: Request, exc):
         }
     )
 
-# Socket.IO event handlers
-@sio.event
-async def connect(sid, environ):
-    """Handle client connection"""
-    logger.info(f"Socket connected: {sid}")
-    await sio.emit('connection_established', {'status': 'connected'}, room=sid)
-
-@sio.event
-async def disconnect(sid):
-    """Handle client disconnection"""
-    logger.info(f"Socket disconnected: {sid}")
-
-@sio.event
-async def join_kitchen(sid):
-    """Join kitchen room for real-time updates"""
-    await sio.enter_room(sid, 'kitchen')
-    logger.info(f"Socket {sid} joined kitchen room")
-    await sio.emit('joined_kitchen', {'success': True}, room=sid)
-
-@sio.event
-async def leave_kitchen(sid):
-    """Leave kitchen room"""
-    await sio.leave_room(sid, 'kitchen')
-    logger.info(f"Socket {sid} left kitchen room")
-
-@sio.event
-async def update_order_status(sid, data):
-    """Broadcast order status update"""
-    logger.info(f"Order {data.get('orderId')} status updated to {data.get('status')}")
-    await sio.emit('order_updated', data, room='kitchen')
-
-# Helper function to emit new order (can be called from order router)
-async def emit_new_order(order_data: dict):
-    """Emit new order to kitchen"""
-    await sio.emit('new_order', order_data, room='kitchen')
-    logger.info(f"New order {order_data.get('id')} emitted to kitchen")
-
-# Helper function to emit order deletion
-async def emit_order_deleted(order_id: str):
-    """Emit order deletion to kitchen"""
-    await sio.emit('order_deleted', {'orderId': order_id}, room='kitchen')
-    logger.info(f"Order {order_id} deletion emitted to kitchen")
-
 # Export socket app
 __all__ = ['socket_app', 'app', 'sio']
 
@@ -3,20 +3,31 @@ Database models
 """
 from app.models.user import User
 from app.models.table import Table
-from app.models.reservation import Reservation
+from app.models.reservation import Reservation, ReservationTombstone
 from app.models.menu_item import MenuItem
 from app.models.order import Order, OrderItem
+from app.models.order_archive import OrderArchive, OrderItemArchive
 from app.models.restaurant_settings import RestaurantSettings
 from app.models.category import Category
+from app.models.occupancy import OccupancySlot
+from app.models.idempotency import IdempotencyKey
+from app.models.sales_rollup import SalesDaily, SalesHourly
 
 __all__ = [
     "User",
     "Table",
     "Reservation",
+    "ReservationTombstone",
     "MenuItem",
     "Order",
     "OrderItem",
+    "OrderArchive",
+    "OrderItemArchive",
     "RestaurantSettings",
     "Category",
+    "OccupancySlot",
+    "IdempotencyKey",
+    "SalesDaily",
+    "SalesHourly",
 ]
 
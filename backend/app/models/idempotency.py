@@ -0,0 +1,24 @@
+"""
+Idempotency key model
+"""
+from sqlalchemy import Column, String, Integer, DateTime, JSON, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Result of a create request sent with an Idempotency-Key header.
+    Inserted in the same transaction as the write it guards, so a retry
+    either finds the committed result or waits for the first attempt.
+    """
+    __tablename__ = "idempotency_keys"
+    
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Endpoint the key was used on, e.g. "POST /orders"
+    scope = Column(String, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
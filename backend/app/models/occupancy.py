@@ -0,0 +1,23 @@
+"""
+Occupancy ledger model
+"""
+from sqlalchemy import Column, String, Integer, Date, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class OccupancySlot(Base):
+    """
+    One fixed-length time slot of a table held by a confirmed reservation.
+    Maintained by the booking service whenever a reservation is written.
+    """
+    __tablename__ = "occupancy_slots"
+    
+    date = Column(Date, primary_key=True)
+    # Slot start in minutes after midnight of `date` (past 1440 after midnight)
+    slot = Column(Integer, primary_key=True)
+    table_id = Column(String, ForeignKey("tables.id", ondelete="CASCADE"), primary_key=True)
+    reservation_id = Column(String, ForeignKey("reservations.id", ondelete="CASCADE"), primary_key=True, index=True)
+    
+    # Relationships (also makes the session insert the reservation first)
+    reservation = relationship("Reservation")
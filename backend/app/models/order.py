@@ -1,9 +1,10 @@
 """
 Order and OrderItem models
 """
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Numeric, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Numeric, Index, event, text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from decimal import Decimal
 import enum
 import uuid
 from app.database import Base
@@ -21,6 +22,22 @@ class OrderStatus(str, enum.Enum):
 class Order(Base):
     """Order model"""
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination of order lists
+        Index("ix_orders_order_time_id", "order_time", "id"),
+        # Kitchen view: only orders that are still being worked on
+        Index(
+            "ix_orders_active_order_time",
+            "order_time",
+            postgresql_where=text("status IN ('pending', 'preparing', 'ready')")
+        ),
+        # Revenue aggregates over a period, answered from the index alone
+        Index(
+            "ix_orders_order_time_revenue",
+            "order_time",
+            postgresql_include=["status", "total_amount"]
+        ),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     order_number = Column(String, unique=True, nullable=False)
@@ -30,6 +47,9 @@ class Order(Base):
     order_time = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     ready_time = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
+    # Sum of item lines, kept up to date as items are added, removed or changed
+    subtotal = Column(Numeric(10, 2), default=0, nullable=False)
+    total_amount = Column(Numeric(10, 2), default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -55,3 +75,36 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="order_items")
     menu_item = relationship("MenuItem", back_populates="order_items")
 
+
+def line_total(price, quantity) -> Decimal:
+    """Amount of one order item line"""
+    return Decimal(price or 0) * (quantity or 0)
+
+
+def adjust_order_totals(order: Order, delta: Decimal) -> None:
+    """Add delta to the order subtotal and total"""
+    order.subtotal = Decimal(order.subtotal or 0) + delta
+    order.total_amount = order.subtotal
+
+
+@event.listens_for(Order.order_items, "append")
+def order_item_added(order, item, initiator):
+    adjust_order_totals(order, line_total(item.price_at_order, item.quantity))
+
+
+@event.listens_for(Order.order_items, "remove")
+def order_item_removed(order, item, initiator):
+    adjust_order_totals(order, -line_total(item.price_at_order, item.quantity))
+
+
+@event.listens_for(OrderItem.quantity, "set", active_history=True)
+def order_item_quantity_changed(item, value, oldvalue, initiator):
+    # Only lines already on an order; new items are counted when appended
+    if item.order is not None and isinstance(oldvalue, int):
+        adjust_order_totals(item.order, line_total(item.price_at_order, value - oldvalue))
+
+
+@event.listens_for(OrderItem.price_at_order, "set", active_history=True)
+def order_item_price_changed(item, value, oldvalue, initiator):
+    if item.order is not None and isinstance(oldvalue, (int, Decimal)):
+        adjust_order_totals(item.order, (Decimal(value) - oldvalue) * item.quantity)
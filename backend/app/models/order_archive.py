@@ -0,0 +1,52 @@
+"""
+Archived order models
+"""
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Integer, Numeric, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from app.database import Base
+from app.models.order import OrderStatus
+
+
+class OrderArchive(Base):
+    """
+    Served or cancelled order moved out of `orders` by the archiver.
+    Same columns as Order; references to tables, reservations and menu items
+    are kept as plain ids so archived rows never block deletes.
+    """
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_order_time_id", "order_time", "id"),
+    )
+    
+    id = Column(String, primary_key=True)
+    order_number = Column(String, unique=True, nullable=False)
+    reservation_id = Column(String, nullable=True, index=True)
+    table_id = Column(String, nullable=True, index=True)
+    status = Column(SQLEnum(OrderStatus), nullable=False)
+    order_time = Column(DateTime, nullable=False)
+    ready_time = Column(DateTime, nullable=True)
+    notes = Column(Text, nullable=True)
+    subtotal = Column(Numeric(10, 2), nullable=False)
+    total_amount = Column(Numeric(10, 2), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+    
+    # Relationships
+    order_items = relationship("OrderItemArchive", back_populates="order", cascade="all, delete-orphan")
+
+
+class OrderItemArchive(Base):
+    """Item of an archived order"""
+    __tablename__ = "order_items_archive"
+    
+    id = Column(String, primary_key=True)
+    order_id = Column(String, ForeignKey("orders_archive.id", ondelete="CASCADE"), nullable=False, index=True)
+    menu_item_id = Column(String, nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    price_at_order = Column(Numeric(10, 2), nullable=False)
+    special_notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    
+    # Relationships
+    order = relationship("OrderArchive", back_populates="order_items")
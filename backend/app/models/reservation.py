@@ -1,7 +1,8 @@
 """
 Reservation model
 """
-from sqlalchemy import Column, String, Integer, DateTime, Date, Time, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Date, Time, Text, ForeignKey, Computed, DDL, Index, Sequence, event, text, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import TSRANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -17,9 +18,45 @@ class ReservationStatus(str, enum.Enum):
     no_show = "no_show"
 
 
+# Change version shared by reservations and their tombstones. Every insert
+# and update takes the next value, so clients can ask for changes since the
+# last version they saw.
+reservation_change_seq = Sequence("reservation_change_seq", metadata=Base.metadata)
+
+# Time range a reservation occupies its table. Bookings without an end time
+# last 2 hours; an end time before the start time runs past midnight.
+PERIOD_SQL = (
+    "tsrange(\"date\" + \"time\", CASE "
+    "WHEN end_time IS NULL THEN \"date\" + \"time\" + interval '2 hours' "
+    "WHEN end_time > \"time\" THEN \"date\" + end_time "
+    "ELSE \"date\" + end_time + interval '1 day' END, '[)')"
+)
+
+
 class Reservation(Base):
     """Reservation model"""
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Postgres rejects overlapping confirmed bookings on the same table
+        ExcludeConstraint(
+            ("table_id", "="),
+            ("period", "&&"),
+            name="reservations_no_overlap",
+            using="gist",
+            where=text("status = 'confirmed' AND table_id IS NOT NULL")
+        ),
+        # Keyset pagination of reservation lists
+        Index("ix_reservations_date_id", "date", "id"),
+        # Calendar delta feed
+        Index("ix_reservations_date_change_version", "date", "change_version"),
+        # Partial confirmation number search (pg_trgm is created with the users table)
+        Index(
+            "ix_reservations_confirmation_number_trgm",
+            "confirmation_number",
+            postgresql_using="gin",
+            postgresql_ops={"confirmation_number": "gin_trgm_ops"}
+        ),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -31,6 +68,13 @@ class Reservation(Base):
     status = Column(SQLEnum(ReservationStatus), default=ReservationStatus.confirmed, nullable=False, index=True)
     special_request = Column(Text, nullable=True)
     confirmation_number = Column(String, unique=True, nullable=False, index=True)
+    period = Column(TSRANGE, Computed(PERIOD_SQL, persisted=True))
+    change_version = Column(
+        BigInteger,
+        server_default=reservation_change_seq.next_value(),
+        onupdate=reservation_change_seq.next_value(),
+        nullable=False
+    )
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -39,3 +83,54 @@ class Reservation(Base):
     table = relationship("Table", back_populates="reservations")
     orders = relationship("Order", back_populates="reservation")
 
+
+
+class ReservationTombstone(Base):
+    """
+    Marks a reservation that left a date (deleted or moved to another day)
+    so calendar delta clients can drop it
+    """
+    __tablename__ = "reservation_tombstones"
+    __table_args__ = (
+        Index("ix_reservation_tombstones_date_change_version", "date", "change_version"),
+    )
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    reservation_id = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    change_version = Column(BigInteger, server_default=reservation_change_seq.next_value(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# The exclusion constraint compares table_id with "=" inside a GiST index
+event.listen(
+    Reservation.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+
+# Deleting a reservation leaves a tombstone whichever way it goes:
+# delete_booking(), the ORM cascade from its user or ON DELETE CASCADE
+RESERVATION_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION reservation_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO reservation_tombstones (id, reservation_id, date, created_at)
+    VALUES (gen_random_uuid()::text, OLD.id, OLD.date, timezone('utc', clock_timestamp()));
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql
+"""
+RESERVATION_TOMBSTONE_TRIGGER = (
+    "CREATE TRIGGER reservations_tombstone AFTER DELETE ON reservations "
+    "FOR EACH ROW EXECUTE FUNCTION reservation_tombstone()"
+)
+event.listen(
+    Reservation.__table__,
+    "after_create",
+    DDL(RESERVATION_TOMBSTONE_FUNCTION).execute_if(dialect="postgresql")
+)
+event.listen(
+    Reservation.__table__,
+    "after_create",
+    DDL(RESERVATION_TOMBSTONE_TRIGGER).execute_if(dialect="postgresql")
+)
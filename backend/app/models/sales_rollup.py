@@ -0,0 +1,34 @@
+"""
+Sales rollup models
+"""
+from sqlalchemy import Column, String, Integer, Date, DateTime, Numeric, Enum as SQLEnum
+from app.database import Base
+from app.models.menu_item import MenuCategory
+
+
+class SalesDaily(Base):
+    """
+    Served quantity and revenue of one menu item on one day (by order time).
+    Maintained by the order routes whenever an order enters or leaves `served`.
+    """
+    __tablename__ = "sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    # Plain id so rollups survive menu item deletion
+    menu_item_id = Column(String, primary_key=True)
+    category = Column(SQLEnum(MenuCategory), nullable=True, index=True)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    order_count = Column(Integer, default=0, nullable=False)
+
+
+class SalesHourly(Base):
+    """Served quantity and revenue of one menu item in one hour (by order time)"""
+    __tablename__ = "sales_hourly"
+    
+    hour = Column(DateTime, primary_key=True)
+    menu_item_id = Column(String, primary_key=True)
+    category = Column(SQLEnum(MenuCategory), nullable=True, index=True)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    order_count = Column(Integer, default=0, nullable=False)
@@ -1,12 +1,13 @@
 """
 User model
 """
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, DDL, Index, event, func, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 import uuid
 from app.database import Base
+from app.utils.search import fold_expression, digits_expression
 
 
 class UserRole(str, enum.Enum):
@@ -21,6 +22,11 @@ class UserRole(str, enum.Enum):
 class User(Base):
     """User model"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of the admin user directory, optionally per role
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, nullable=False, index=True)
@@ -35,3 +41,36 @@ class User(Base):
     # Relationships
     reservations = relationship("Reservation", back_populates="user", cascade="all, delete-orphan")
 
+
+# Trigram indexes for front desk search on folded names and phone digits
+Index(
+    "ix_users_first_name_trgm",
+    fold_expression(User.first_name).label("first_name_folded"),
+    postgresql_using="gin",
+    postgresql_ops={"first_name_folded": "gin_trgm_ops"}
+)
+Index(
+    "ix_users_last_name_trgm",
+    fold_expression(User.last_name).label("last_name_folded"),
+    postgresql_using="gin",
+    postgresql_ops={"last_name_folded": "gin_trgm_ops"}
+)
+Index(
+    "ix_users_phone_trgm",
+    digits_expression(User.phone).label("phone_digits"),
+    postgresql_using="gin",
+    postgresql_ops={"phone_digits": "gin_trgm_ops"}
+)
+
+# Email prefix search of the admin user directory
+Index(
+    "ix_users_email_prefix",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"}
+)
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
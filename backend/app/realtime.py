@@ -0,0 +1,226 @@
+"""
+Socket.IO server and kitchen event publishing
+
+Lives outside app.main so routers can publish events without importing the
+application module (which imports the routers).
+"""
+import asyncio
+import itertools
+import uuid
+from typing import Dict, Hashable, List, Optional, Tuple
+import socketio
+from app.config import settings
+from app.database import SessionLocal
+from app.services.kitchen_scheduler import kitchen_scheduler
+from app.utils.logger import logger
+
+KITCHEN_ROOM = 'kitchen'
+
+
+def create_client_manager() -> Optional[socketio.AsyncManager]:
+    """
+    Build the Socket.IO client manager from SOCKETIO_MESSAGE_QUEUE
+    
+    Without a message queue rooms live in process memory, which only works
+    with a single worker. With one, every emit is published to the queue and
+    each worker delivers it to its own connected clients.
+    """
+    url = settings.SOCKETIO_MESSAGE_QUEUE
+    if not url:
+        return None
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return socketio.AsyncRedisManager(url)
+    if url.startswith(('amqp://', 'amqps://')):
+        return socketio.AsyncAioPikaManager(url)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE scheme: {url.split(':', 1)[0]}")
+
+
+# Socket.IO server
+sio = socketio.AsyncServer(
+    async_mode='asgi',
+    client_manager=create_client_manager(),
+    cors_allowed_origins=settings.cors_origins_list,
+    logger=False,
+    engineio_logger=False
+)
+
+# Every kitchen frame carries the next number of this process's sequence and
+# the process id. A client that sees a gap for a source (missed frame,
+# reconnect) refetches the order list once.
+EVENT_SOURCE = uuid.uuid4().hex[:8]
+_sequence = itertools.count(1)
+
+PendingEvent = Tuple[str, dict]
+
+
+def merge_order_events(previous: PendingEvent, event: str, data: dict) -> Optional[PendingEvent]:
+    """
+    Collapse two events about the same order into its latest state
+    
+    Returns:
+        The event to keep, or None when the order came and went in one window
+    """
+    previous_event, previous_data = previous
+    if previous_event == 'new-order':
+        if event == 'order-deleted':
+            return None
+        if event == 'order-updated':
+            return 'new-order', {
+                **previous_data,
+                'status': data['status'],
+                'notes': data['notes'],
+                'updatedAt': data['updatedAt']
+            }
+    if previous_event == 'order-updated' and event == 'order-updated':
+        # Keep the status the client last saw as the starting point
+        return event, {**data, 'previousStatus': previous_data['previousStatus']}
+    return event, data
+
+
+class EmitCoalescer:
+    """
+    Batches events per room over a short window
+    
+    Events sharing a key (one order, the schedule) are merged into their
+    latest state, and everything left when the window closes is sent as a
+    single 'kitchen-batch' frame.
+    """
+    
+    def __init__(self, window_ms: int):
+        self.window = window_ms / 1000
+        self._pending: Dict[str, Dict[Hashable, PendingEvent]] = {}
+        self._flushes: Dict[str, asyncio.Task] = {}
+        self.events_in = 0
+        self.frames_out = 0
+    
+    async def add(self, room: str, key: Hashable, event: str, data: dict) -> None:
+        """Queue an event for the room's next frame"""
+        self.events_in += 1
+        pending = self._pending.setdefault(room, {})
+        if key in pending:
+            merged = merge_order_events(pending.pop(key), event, data)
+            if merged:
+                pending[key] = merged
+        else:
+            pending[key] = (event, data)
+        if room not in self._flushes:
+            self._flushes[room] = asyncio.create_task(self._flush_later(room))
+    
+    async def _flush_later(self, room: str) -> None:
+        await asyncio.sleep(self.window)
+        await self.flush(room)
+    
+    async def flush(self, room: str) -> None:
+        """Send everything queued for the room as one frame"""
+        self._flushes.pop(room, None)
+        pending = self._pending.pop(room, None)
+        if not pending:
+            return
+        events: List[dict] = [{'event': event, 'data': data} for event, data in pending.values()]
+        self.frames_out += 1
+        await sio.emit('kitchen-batch', {
+            'seq': next(_sequence),
+            'source': EVENT_SOURCE,
+            'events': events
+        }, room=room)
+    
+    def metrics(self) -> dict:
+        """Event and frame counters of this process"""
+        return {
+            "windowMs": int(self.window * 1000),
+            "eventsIn": self.events_in,
+            "framesOut": self.frames_out,
+            "coalescingRatio": round(self.events_in / self.frames_out, 2) if self.frames_out else None
+        }
+
+
+coalescer = EmitCoalescer(settings.SOCKETIO_COALESCE_WINDOW_MS)
+
+
+async def emit_kitchen_event(event: str, data: dict, key: Hashable, sequenced: bool = True) -> None:
+    """
+    Emit an event to the kitchen room
+    
+    With a coalescing window the event joins the next 'kitchen-batch' frame;
+    without one it is sent right away, stamped with the next sequence number
+    unless it is a full snapshot.
+    """
+    if coalescer.window > 0:
+        await coalescer.add(KITCHEN_ROOM, key, event, data)
+        return
+    coalescer.events_in += 1
+    coalescer.frames_out += 1
+    if sequenced:
+        data = {**data, 'seq': next(_sequence), 'source': EVENT_SOURCE}
+    await sio.emit(event, data, room=KITCHEN_ROOM)
+
+
+# Socket.IO event handlers
+@sio.event
+async def connect(sid, environ):
+    """Handle client connection"""
+    logger.info(f"Socket connected: {sid}")
+    await sio.emit('connection_established', {'status': 'connected'}, room=sid)
+
+@sio.event
+async def disconnect(sid):
+    """Handle client disconnection"""
+    logger.info(f"Socket disconnected: {sid}")
+
+@sio.event
+async def join_kitchen(sid):
+    """Join kitchen room for real-time updates"""
+    await sio.enter_room(sid, KITCHEN_ROOM)
+    logger.info(f"Socket {sid} joined kitchen room")
+    await sio.emit('joined_kitchen', {'success': True}, room=sid)
+
+@sio.event
+async def leave_kitchen(sid):
+    """Leave kitchen room"""
+    await sio.leave_room(sid, KITCHEN_ROOM)
+    logger.info(f"Socket {sid} left kitchen room")
+
+@sio.event
+async def get_kitchen_schedule(sid):
+    """Send the current kitchen schedule to the requesting client"""
+    db = SessionLocal()
+    try:
+        kitchen_scheduler.ensure_loaded(db)
+    finally:
+        db.close()
+    await sio.emit('kitchen-schedule', kitchen_scheduler.snapshot(), room=sid)
+
+@sio.event
+async def update_order_status(sid, data):
+    """Broadcast order status update"""
+    logger.info(f"Order {data.get('orderId')} status updated to {data.get('status')}")
+    await sio.emit('order_updated', data, room=KITCHEN_ROOM)
+
+# Called by the order router after a successful commit
+async def emit_new_order(order_data: dict):
+    """Emit a new order, with its items, to the kitchen"""
+    await emit_kitchen_event('new-order', order_data, ('order', order_data['id']))
+    logger.info(f"New order {order_data.get('id')} emitted to kitchen")
+
+async def emit_order_updated(order_data: dict):
+    """Emit an order status transition to the kitchen"""
+    await emit_kitchen_event('order-updated', order_data, ('order', order_data['orderId']))
+
+async def emit_orders_updated(updates: List[dict]):
+    """Emit the status transitions of several orders in one frame"""
+    if coalescer.window > 0:
+        # Queued together, so they leave in the same kitchen-batch frame
+        for update in updates:
+            await coalescer.add(KITCHEN_ROOM, ('order', update['orderId']), 'order-updated', update)
+        return
+    await emit_kitchen_event('orders-updated', {'updates': updates}, ('orders',))
+
+async def emit_order_deleted(order_id: str):
+    """Emit order deletion to kitchen"""
+    await emit_kitchen_event('order-deleted', {'orderId': order_id}, ('order', order_id))
+    logger.info(f"Order {order_id} deletion emitted to kitchen")
+
+async def emit_kitchen_schedule(schedule: dict):
+    """Emit the fire-next list and ticket ETAs to the kitchen"""
+    # A full snapshot, so only the latest one matters and it takes no sequence number
+    await emit_kitchen_event('kitchen-schedule', schedule, ('schedule',), sequenced=False)
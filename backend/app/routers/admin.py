@@ -1,18 +1,31 @@
 """
 Admin routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict
+from sqlalchemy import func, select, cast, literal, or_, tuple_, String
+from typing import Dict, Optional
+from datetime import date as date_type, datetime as datetime_type, timedelta as timedelta_type
 from app.database import get_db
 from app.models.user import User, UserRole
-from app.models.reservation import Reservation, ReservationStatus
-from app.models.order import Order, OrderStatus
-from app.models.menu_item import MenuItem
-from app.models.table import Table, TableStatus
+from app.models.reservation import Reservation
+from app.models.order import Order, OrderItem
+from app.models.order_archive import OrderArchive, OrderItemArchive
+from app.models.menu_item import MenuItem, MenuCategory
+from app.models.sales_rollup import SalesDaily, SalesHourly
+from app.models.table import Table
 from app.middleware.auth import require_roles
+from app.realtime import coalescer
+from app.routers.order import kitchen_cache
+from app.services.occupancy import occupancy_by_slot, SLOT_MINUTES
+from app.services.table_analytics import load_columns, occupancy_metrics
+from app.services.availability import to_minutes
+from app.services.dashboard import dashboard_stats, stats_cache
+from app.services.export import stream_export, MEDIA_TYPES
 from app.utils.logger import logger
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.search import fold_text, fold_expression
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -28,41 +41,8 @@ async def get_stats(
     from datetime import date
     today = date.today()
     
-    # Count total customers
-    total_customers = db.query(func.count(User.id)).filter(
-        User.role == UserRole.customer
-    ).scalar() or 0
-    
-    # Count today's reservations
-    today_reservations = db.query(func.count(Reservation.id)).filter(
-        Reservation.date == today
-    ).scalar() or 0
-    
-    # Count active orders (pending + preparing)
-    active_orders = db.query(func.count(Order.id)).filter(
-        Order.status.in_([OrderStatus.pending, OrderStatus.preparing])
-    ).scalar() or 0
-    
-    # Count tables by status
-    available_tables = db.query(func.count(Table.id)).filter(
-        Table.status == TableStatus.available
-    ).scalar() or 0
-    occupied_tables = db.query(func.count(Table.id)).filter(
-        Table.status == TableStatus.occupied
-    ).scalar() or 0
-    
-    # Today's revenue - calculating from order items for served orders today
-    # For now, set to 0 as the Order model doesn't have total_amount
-    today_revenue = 0.0
-    
-    stats = {
-        "todayReservations": today_reservations,
-        "todayRevenue": today_revenue,
-        "totalCustomers": total_customers,
-        "activeOrders": active_orders,
-        "availableTables": available_tables,
-        "occupiedTables": occupied_tables
-    }
+    # One query on a miss; cached until a counted table is written
+    stats = stats_cache.get_or_load(today, lambda: dashboard_stats(db, today))
     
     logger.info(f"Admin stats requested by {current_user.email}")
     
@@ -72,20 +52,462 @@ async def get_stats(
     }
 
 
+@router.get("/occupancy")
+async def get_occupancy(
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get table and seat occupancy per time slot of a day (admin/manager only)
+    Read from the occupancy ledger.
+    """
+    from datetime import datetime, timedelta
+    
+    try:
+        target_date = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    totals = db.query(
+        func.count(Table.id),
+        func.coalesce(func.sum(Table.capacity), 0)
+    ).one()
+    total_tables, total_seats = totals[0], int(totals[1])
+    
+    day_start = datetime.combine(target_date, datetime.min.time())
+    slots = []
+    for slot, usage in occupancy_by_slot(db, target_date).items():
+        slots.append({
+            "time": (day_start + timedelta(minutes=slot)).strftime("%H:%M"),
+            "occupiedTables": usage["tables"],
+            "occupiedSeats": usage["seats"],
+            "tableOccupancy": round(usage["tables"] / total_tables, 4) if total_tables else None
+        })
+    
+    return {
+        "success": True,
+        "data": {
+            "date": date,
+            "slotMinutes": SLOT_MINUTES,
+            "totalTables": total_tables,
+            "totalSeats": total_seats,
+            "slots": slots
+        }
+    }
+
+
+# Longest range served hour by hour (one row per item and hour)
+MAX_HOURLY_DAYS = 92
+
+
+def analytics_range(date_from: Optional[date_type], date_to: Optional[date_type], default_days: int = 365) -> tuple:
+    """Resolve an analytics date range; the last 12 months by default"""
+    date_to = date_to or date_type.today()
+    date_from = date_from or date_to - timedelta_type(days=default_days - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return date_from, date_to
+
+
+@router.get("/analytics/sales")
+async def get_sales_analytics(
+    date_from: Optional[date_type] = Query(None, description="First day (default: 12 months, or 7 days hourly, before date_to)"),
+    date_to: Optional[date_type] = Query(None, description="Last day (default: today)"),
+    interval: str = Query("day", pattern="^(day|hour)$"),
+    category: Optional[MenuCategory] = Query(None),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get served revenue and quantity per day or hour (admin/manager only)
+    Read from the sales rollups.
+    """
+    date_from, date_to = analytics_range(date_from, date_to, 7 if interval == "hour" else 365)
+    
+    if interval == "hour":
+        if (date_to - date_from).days >= MAX_HOURLY_DAYS:
+            raise HTTPException(status_code=400, detail=f"Hourly sales cover at most {MAX_HOURLY_DAYS} days")
+        model, bucket = SalesHourly, SalesHourly.hour
+        start = datetime_type.combine(date_from, datetime_type.min.time())
+        end = datetime_type.combine(date_to + timedelta_type(days=1), datetime_type.min.time())
+    else:
+        model, bucket = SalesDaily, SalesDaily.day
+        start, end = date_from, date_to + timedelta_type(days=1)
+    
+    query = db.query(
+        bucket.label("period"),
+        func.sum(model.quantity).label("quantity"),
+        func.sum(model.revenue).label("revenue")
+    ).filter(bucket >= start, bucket < end)
+    if category:
+        query = query.filter(model.category == category)
+    rows = query.group_by(bucket).order_by(bucket).all()
+    
+    series = [
+        {"period": row.period.isoformat(), "quantity": int(row.quantity), "revenue": float(row.revenue)}
+        for row in rows
+    ]
+    
+    return {
+        "success": True,
+        "data": {
+            "dateFrom": date_from.isoformat(),
+            "dateTo": date_to.isoformat(),
+            "interval": interval,
+            "totalQuantity": sum(point["quantity"] for point in series),
+            "totalRevenue": round(sum(point["revenue"] for point in series), 2),
+            "series": series
+        }
+    }
+
+
+@router.get("/analytics/categories")
+async def get_category_analytics(
+    date_from: Optional[date_type] = Query(None, description="First day (default: 12 months before date_to)"),
+    date_to: Optional[date_type] = Query(None, description="Last day (default: today)"),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get served revenue and quantity per menu category (admin/manager only)
+    Read from the sales rollups.
+    """
+    date_from, date_to = analytics_range(date_from, date_to)
+    
+    rows = db.query(
+        SalesDaily.category,
+        func.sum(SalesDaily.quantity).label("quantity"),
+        func.sum(SalesDaily.revenue).label("revenue")
+    ).filter(
+        SalesDaily.day >= date_from,
+        SalesDaily.day <= date_to
+    ).group_by(SalesDaily.category).order_by(func.sum(SalesDaily.revenue).desc()).all()
+    
+    total_revenue = sum(float(row.revenue) for row in rows)
+    
+    return {
+        "success": True,
+        "data": [
+            {
+                "category": row.category.value if row.category else None,
+                "quantity": int(row.quantity),
+                "revenue": float(row.revenue),
+                "share": round(float(row.revenue) / total_revenue, 4) if total_revenue else None
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/analytics/items")
+async def get_item_analytics(
+    date_from: Optional[date_type] = Query(None, description="First day (default: 12 months before date_to)"),
+    date_to: Optional[date_type] = Query(None, description="Last day (default: today)"),
+    category: Optional[MenuCategory] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the best selling menu items by served revenue (admin/manager only)
+    Read from the sales rollups; names come from the menu.
+    """
+    date_from, date_to = analytics_range(date_from, date_to)
+    
+    totals = db.query(
+        SalesDaily.menu_item_id,
+        SalesDaily.category,
+        func.sum(SalesDaily.quantity).label("quantity"),
+        func.sum(SalesDaily.revenue).label("revenue"),
+        func.sum(SalesDaily.order_count).label("orders")
+    ).filter(
+        SalesDaily.day >= date_from,
+        SalesDaily.day <= date_to
+    )
+    if category:
+        totals = totals.filter(SalesDaily.category == category)
+    totals = totals.group_by(SalesDaily.menu_item_id, SalesDaily.category).subquery()
+    
+    rows = db.query(totals, MenuItem.name).outerjoin(
+        MenuItem, MenuItem.id == totals.c.menu_item_id
+    ).order_by(totals.c.revenue.desc(), totals.c.menu_item_id).limit(limit).all()
+    
+    return {
+        "success": True,
+        "data": [
+            {
+                "menuItemId": row.menu_item_id,
+                "name": row.name,
+                "category": row.category.value if row.category else None,
+                "quantity": int(row.quantity),
+                "revenue": float(row.revenue),
+                "orders": int(row.orders)
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/analytics/occupancy")
+async def get_occupancy_analytics(
+    date_from: Optional[date_type] = Query(None, description="First night (default: 30 nights before date_to)"),
+    date_to: Optional[date_type] = Query(None, description="Last night (default: today)"),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get seating time, table turns, seat utilization by area and no-show
+    rates over a date range (admin/manager only)
+    """
+    from app.routers.settings import get_or_create_settings
+    
+    date_from, date_to = analytics_range(date_from, date_to, 30)
+    
+    restaurant_settings = get_or_create_settings(db)
+    try:
+        open_min = to_minutes(datetime_type.strptime(restaurant_settings.opening_time, "%H:%M").time())
+        close_min = to_minutes(datetime_type.strptime(restaurant_settings.closing_time, "%H:%M").time())
+    except ValueError:
+        raise HTTPException(status_code=500, detail="Invalid opening hours in restaurant settings")
+    if close_min <= open_min:
+        # Closing after midnight
+        close_min += 24 * 60
+    
+    columns = load_columns(db, date_from, date_to)
+    
+    return {
+        "success": True,
+        "data": occupancy_metrics(columns, date_from, date_to, close_min - open_min)
+    }
+
+
+def export_response(statements: list, fmt: str, name: str, date_from: Optional[date_type], date_to: Optional[date_type]) -> StreamingResponse:
+    """Stream an export as a file download"""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    period = f"_{date_from or 'start'}_{date_to or 'now'}" if date_from or date_to else ""
+    return StreamingResponse(
+        stream_export(statements, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}{period}.{fmt}"'}
+    )
+
+
+def order_time_filters(model, date_from: Optional[date_type], date_to: Optional[date_type]) -> list:
+    """Order time conditions for a [date_from, date_to] day range"""
+    filters = []
+    if date_from:
+        filters.append(model.order_time >= datetime_type.combine(date_from, datetime_type.min.time()))
+    if date_to:
+        filters.append(model.order_time < datetime_type.combine(date_to + timedelta_type(days=1), datetime_type.min.time()))
+    return filters
+
+
+@router.get("/export/reservations")
+async def export_reservations(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date_type] = Query(None, description="First reservation date"),
+    date_to: Optional[date_type] = Query(None, description="Last reservation date"),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+):
+    """
+    Export reservations as CSV or NDJSON (admin/manager only)
+    Rows are streamed from a server-side cursor.
+    """
+    statement = select(
+        Reservation.id,
+        Reservation.confirmation_number,
+        Reservation.date,
+        Reservation.time,
+        Reservation.end_time,
+        Reservation.party_size,
+        cast(Reservation.status, String).label("status"),
+        Table.table_number,
+        User.first_name.label("customer_first_name"),
+        User.last_name.label("customer_last_name"),
+        User.email.label("customer_email"),
+        Reservation.created_at
+    ).join(
+        User, User.id == Reservation.user_id
+    ).outerjoin(
+        Table, Table.id == Reservation.table_id
+    ).order_by(Reservation.date, Reservation.id)
+    if date_from:
+        statement = statement.where(Reservation.date >= date_from)
+    if date_to:
+        statement = statement.where(Reservation.date <= date_to)
+    
+    logger.info(f"Reservation export requested by {current_user.email}")
+    return export_response([statement], format, "reservations", date_from, date_to)
+
+
+@router.get("/export/orders")
+async def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date_type] = Query(None, description="First order day"),
+    date_to: Optional[date_type] = Query(None, description="Last order day"),
+    include_archived: bool = Query(True, description="Also export archived orders"),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+):
+    """
+    Export orders as CSV or NDJSON (admin/manager only)
+    Rows are streamed from a server-side cursor; archived orders come first.
+    """
+    def orders_of(model, archived: bool):
+        return select(
+            model.id,
+            model.order_number,
+            model.order_time,
+            cast(model.status, String).label("status"),
+            Table.table_number,
+            model.reservation_id,
+            model.subtotal,
+            model.total_amount,
+            model.ready_time,
+            literal(archived).label("archived")
+        ).outerjoin(
+            Table, Table.id == model.table_id
+        ).where(
+            *order_time_filters(model, date_from, date_to)
+        ).order_by(model.order_time, model.id)
+    
+    statements = [orders_of(Order, False)]
+    if include_archived:
+        statements.insert(0, orders_of(OrderArchive, True))
+    
+    logger.info(f"Order export requested by {current_user.email}")
+    return export_response(statements, format, "orders", date_from, date_to)
+
+
+@router.get("/export/order-items")
+async def export_order_items(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date_type] = Query(None, description="First order day"),
+    date_to: Optional[date_type] = Query(None, description="Last order day"),
+    include_archived: bool = Query(True, description="Also export items of archived orders"),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
+):
+    """
+    Export order items as CSV or NDJSON (admin/manager only)
+    One row per item with its order and menu item; streamed from a server-side cursor.
+    """
+    def items_of(order_model, item_model):
+        return select(
+            item_model.id,
+            item_model.order_id,
+            order_model.order_number,
+            order_model.order_time,
+            cast(order_model.status, String).label("order_status"),
+            item_model.menu_item_id,
+            MenuItem.name.label("menu_item_name"),
+            item_model.quantity,
+            item_model.price_at_order,
+            (item_model.quantity * item_model.price_at_order).label("line_total"),
+            item_model.special_notes
+        ).join(
+            order_model, order_model.id == item_model.order_id
+        ).outerjoin(
+            MenuItem, MenuItem.id == item_model.menu_item_id
+        ).where(
+            *order_time_filters(order_model, date_from, date_to)
+        ).order_by(order_model.order_time, item_model.order_id, item_model.id)
+    
+    statements = [items_of(Order, OrderItem)]
+    if include_archived:
+        statements.insert(0, items_of(OrderArchive, OrderItemArchive))
+    
+    logger.info(f"Order item export requested by {current_user.email}")
+    return export_response(statements, format, "order_items", date_from, date_to)
+
+
+@router.get("/metrics")
+async def get_metrics(
+    current_user: User = Depends(require_roles(UserRole.admin))
+):
+    """
+    Get runtime counters of this worker process (admin only)
+    """
+    return {
+        "success": True,
+        "data": {
+            "realtime": coalescer.metrics(),
+            "caches": {
+                "dashboardStats": stats_cache.metrics(),
+                "kitchenOrders": kitchen_cache.metrics()
+            }
+        }
+    }
+
+
 @router.get("/users")
 async def get_all_users(
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="meta.nextCursor from the previous page"),
+    role: Optional[UserRole] = Query(None),
+    search: Optional[str] = Query(None, max_length=100, description="Name or email, matched per word"),
     current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager)),
     db: Session = Depends(get_db)
 ):
     """
-    Get all users (admin/manager only)
+    Get users (admin/manager only)
+    
+    Newest first. With `limit`, pages are keyed on (created_at, id): pass
+    the returned `meta.nextCursor` to fetch the following page. Every word of
+    `search` must match the start of the email or part of the first or last
+    name (Turkish letters folded). The first page also carries per-role
+    counts for the directory header.
     """
-    users = db.query(User).all()
+    # Only the listed columns are read, never the password hash
+    query = db.query(
+        User.id, User.email, User.first_name, User.last_name, User.phone,
+        User.role, User.created_at, User.updated_at
+    )
     
-    # Remove password hashes from response, use camelCase for frontend
-    users_data = []
-    for user in users:
-        user_dict = {
+    if role:
+        query = query.filter(User.role == role)
+    
+    terms = fold_text(search or "").split()
+    if terms:
+        # Matched first through the search indexes; left inline, a LIMIT can
+        # make the planner walk the created_at index and filter every user
+        matches = select(User.id).where(*[
+            or_(
+                func.lower(User.email).startswith(term, autoescape=True),
+                fold_expression(User.first_name).contains(term, autoescape=True),
+                fold_expression(User.last_name).contains(term, autoescape=True)
+            )
+            for term in terms
+        ]).cte("matches").prefix_with("MATERIALIZED")
+        query = query.join(matches, matches.c.id == User.id)
+    
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor, 2)
+        try:
+            cursor_time = datetime_type.fromisoformat(cursor_time)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        # Row comparison served by the (created_at, id) indexes
+        query = query.filter(tuple_(User.created_at, User.id) < tuple_(cursor_time, cursor_id))
+    
+    query = query.order_by(User.created_at.desc(), User.id.desc())
+    
+    next_cursor = None
+    if limit:
+        # Fetch one extra row to know whether another page exists
+        users = query.limit(limit + 1).all()
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+    else:
+        users = query.all()
+    
+    # camelCase for frontend
+    users_data = [
+        {
             "id": str(user.id),
             "email": user.email,
             "firstName": user.first_name,
@@ -95,11 +517,24 @@ async def get_all_users(
             "createdAt": user.created_at.isoformat() if user.created_at else None,
             "updatedAt": user.updated_at.isoformat() if user.updated_at else None
         }
-        users_data.append(user_dict)
+        for user in users
+    ]
+    
+    meta = {"nextCursor": next_cursor}
+    if not cursor:
+        month_start = date_type.today().replace(day=1)
+        counts = db.query(
+            User.role,
+            func.count(User.id),
+            func.count(User.id).filter(User.created_at >= month_start)
+        ).group_by(User.role).all()
+        meta["roleCounts"] = {user_role.value: total for user_role, total, _ in counts}
+        meta["newThisMonth"] = sum(new for _, _, new in counts)
     
     return {
         "success": True,
-        "data": users_data
+        "data": users_data,
+        "meta": meta
     }
 
 
@@ -1,35 +1,102 @@
 """
 Order routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
+from sqlalchemy import tuple_, select, update, case
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
 import uuid
 from datetime import datetime
+from app.config import settings
 from app.database import get_db
-from app.schemas.order import OrderCreate, OrderUpdate, OrderStatusUpdate, OrderResponse
+from app.schemas.order import OrderCreate, OrderUpdate, OrderStatusUpdate, OrderBulkStatusUpdate, OrderResponse
 from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order_archive import OrderArchive
 from app.models.menu_item import MenuItem
 from app.models.user import User, UserRole
-from app.middleware.auth import get_current_user, require_roles
+from app.middleware.auth import require_roles
+from app.realtime import emit_new_order, emit_order_updated, emit_orders_updated, emit_order_deleted, emit_kitchen_schedule
+from app.services.idempotency import claim_idempotency_key, save_idempotent_response
+from app.services.kitchen_scheduler import kitchen_scheduler, ticket_for
+from app.services.sales_rollup import record_sales, sales_delta
 from app.utils.logger import logger
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.cache import LocalCache
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+ACTIVE_STATUSES = (OrderStatus.pending, OrderStatus.preparing, OrderStatus.ready)
+
+# Formatted kitchen view, dropped on every order write
+kitchen_cache = LocalCache(settings.KITCHEN_CACHE_TTL_SECONDS)
+
 
 def generate_order_number() -> str:
     """Generate a unique order number"""
     return f"ORD-{uuid.uuid4().hex[:8].upper()}"
 
 
+def format_kitchen_order(order: Order) -> dict:
+    """Format an order, with its items, for the kitchen display"""
+    return {
+        "id": str(order.id),
+        "orderNumber": order.order_number,
+        "tableId": str(order.table_id) if order.table_id else None,
+        "status": order.status.value.upper() if order.status else None,
+        "notes": order.notes,
+        "totalAmount": float(order.total_amount or 0),
+        "createdAt": order.created_at.isoformat() if order.created_at else None,
+        "updatedAt": order.updated_at.isoformat() if order.updated_at else None,
+        "orderItems": [
+            {
+                "id": str(item.id),
+                "orderId": str(item.order_id),
+                "menuItemId": str(item.menu_item_id),
+                "quantity": item.quantity,
+                "price": float(item.price_at_order),
+                "specialInstructions": item.special_notes,
+                "menuItem": {
+                    "id": str(item.menu_item.id),
+                    "name": item.menu_item.name,
+                    "preparationTime": item.menu_item.preparation_time
+                } if item.menu_item else None
+            }
+            for item in order.order_items
+        ]
+    }
+
+
+def format_status_change(order: Order, previous_status: Optional[OrderStatus]) -> dict:
+    """Format an order status transition for the kitchen display"""
+    return {
+        "orderId": str(order.id),
+        "status": order.status.value.upper(),
+        "previousStatus": previous_status.value.upper() if previous_status else None,
+        "notes": order.notes,
+        "readyTime": order.ready_time.isoformat() if order.ready_time else None,
+        "updatedAt": order.updated_at.isoformat() if order.updated_at else None
+    }
+
+
+async def publish_status_change(db: Session, order: Order) -> None:
+    """Move the order's kitchen ticket and send the new schedule"""
+    kitchen_scheduler.ensure_loaded(db)
+    kitchen_scheduler.order_status_changed(str(order.id), order.status, order.updated_at)
+    await emit_kitchen_schedule(kitchen_scheduler.snapshot())
+
+
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order: OrderCreate,
     current_user: User = Depends(require_roles(UserRole.admin, UserRole.server)),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Create a new order (admin/server only)
+    
+    A retry with the same Idempotency-Key header returns the first result
+    instead of creating another order.
     """
     # Validate order has items
     if not order.items or len(order.items) == 0:
@@ -38,24 +105,22 @@ async def create_order(
             detail="Order must have at least one item"
         )
     
-    # Generate order number
-    order_number = generate_order_number()
-    
-    # Create order
-    new_order = Order(
-        order_number=order_number,
-        table_id=order.table_id,
-        reservation_id=order.reservation_id,
-        notes=order.notes
-    )
+    claim = None
+    if idempotency_key:
+        claim = claim_idempotency_key(db, current_user.id, "POST /orders", idempotency_key, order)
+        if isinstance(claim, Response):
+            return claim
     
-    db.add(new_order)
-    db.flush()  # Flush to get the order ID
+    # Load every referenced menu item with a single IN query
+    menu_item_ids = {item.menu_item_id for item in order.items}
+    menu_items = {
+        menu_item.id: menu_item
+        for menu_item in db.query(MenuItem).filter(MenuItem.id.in_(menu_item_ids))
+    }
     
-    # Create order items
+    # Validate items in request order before writing anything
     for item in order.items:
-        # Get menu item to get current price
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
+        menu_item = menu_items.get(item.menu_item_id)
         
         if not menu_item:
             raise HTTPException(
@@ -68,41 +133,219 @@ async def create_order(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Menu item {menu_item.name} is not available"
             )
-        
-        order_item = OrderItem(
-            order_id=new_order.id,
-            menu_item_id=item.menu_item_id,
-            quantity=item.quantity,
-            price_at_order=menu_item.price,
-            special_notes=item.special_notes
-        )
-        db.add(order_item)
+    
+    # Generate order number
+    order_number = generate_order_number()
+    
+    # Create order with its items; ids are generated client side, so the
+    # flush writes all items in one multi-row INSERT
+    new_order = Order(
+        order_number=order_number,
+        table_id=order.table_id,
+        reservation_id=order.reservation_id,
+        notes=order.notes,
+        status=OrderStatus.pending,
+        order_items=[
+            OrderItem(
+                menu_item_id=item.menu_item_id,
+                quantity=item.quantity,
+                price_at_order=menu_items[item.menu_item_id].price,
+                special_notes=item.special_notes
+            )
+            for item in order.items
+        ]
+    )
+    
+    db.add(new_order)
+    db.flush()
+    
+    # Build the response before commit expires the objects, so no reload is
+    # needed; menu items come from the identity map
+    order_response = OrderResponse.model_validate(new_order)
+    kitchen_order = format_kitchen_order(new_order)
+    ticket = ticket_for(new_order)
+    save_idempotent_response(claim, status.HTTP_201_CREATED, order_response)
     
     db.commit()
-    db.refresh(new_order)
+    kitchen_cache.invalidate()
     
     logger.info(f"New order created: {order_number}")
     
-    # Fetch order with items
-    order_with_items = db.query(Order).filter(Order.id == new_order.id).first()
-    return OrderResponse.model_validate(order_with_items)
+    await emit_new_order(kitchen_order)
+    kitchen_scheduler.ensure_loaded(db)
+    kitchen_scheduler.add_ticket(ticket)
+    await emit_kitchen_schedule(kitchen_scheduler.snapshot())
+    return order_response
 
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_orders(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    status_filter: Optional[OrderStatus] = Query(None, alias="status"),
+    date_from: Optional[datetime] = Query(None, description="Orders placed at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Orders placed before this time"),
+    table_id: Optional[str] = Query(None),
+    include_archived: bool = Query(False, description="Also return orders moved to the archive"),
     current_user: User = Depends(require_roles(UserRole.admin, UserRole.kitchen, UserRole.server)),
     db: Session = Depends(get_db)
 ):
     """
     Get all orders (for kitchen/admin/server)
+    
+    Newest first. With `limit`, pages are keyed on (order_time, id) and the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    Archived orders are only read when `include_archived` is set.
     """
-    orders = db.query(Order).order_by(Order.order_time.desc()).all()
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor, 2)
+        try:
+            cursor_time = datetime.fromisoformat(cursor_time)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+    
+    def load_orders(model) -> list:
+        query = db.query(model).options(selectinload(model.order_items))
+        
+        if status_filter:
+            query = query.filter(model.status == status_filter)
+        if date_from:
+            query = query.filter(model.order_time >= date_from)
+        if date_to:
+            query = query.filter(model.order_time < date_to)
+        if table_id:
+            query = query.filter(model.table_id == table_id)
+        if cursor:
+            # Row comparison served by the (order_time, id) index
+            query = query.filter(tuple_(model.order_time, model.id) < tuple_(cursor_time, cursor_id))
+        
+        query = query.order_by(model.order_time.desc(), model.id.desc())
+        # Fetch one extra row to know whether another page exists
+        return query.limit(limit + 1).all() if limit else query.all()
+    
+    orders = load_orders(Order)
+    if include_archived:
+        orders = sorted(
+            orders + load_orders(OrderArchive),
+            key=lambda order: (order.order_time, order.id),
+            reverse=True
+        )
+    
+    if limit and len(orders) > limit:
+        orders = orders[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(orders[-1].order_time, orders[-1].id)
+    
     return [OrderResponse.model_validate(order) for order in orders]
 
 
+@router.get("/kitchen")
+async def get_kitchen_orders(
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.kitchen, UserRole.server)),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the orders the kitchen is working on (pending, preparing, ready)
+    
+    Oldest first, with item and menu item names. Served and cancelled
+    orders never enter the query, so history size does not matter.
+    """
+    def load_active_orders() -> List[dict]:
+        orders = db.query(Order).options(
+            joinedload(Order.order_items).joinedload(OrderItem.menu_item).load_only(
+                MenuItem.id, MenuItem.name, MenuItem.preparation_time
+            )
+        ).filter(
+            Order.status.in_(ACTIVE_STATUSES)
+        ).order_by(Order.order_time, Order.id).all()
+        return [format_kitchen_order(order) for order in orders]
+    
+    return {
+        "success": True,
+        "data": kitchen_cache.get_or_load("active", load_active_orders)
+    }
+
+
+@router.patch("/status")
+async def bulk_update_order_status(
+    status_update: OrderBulkStatusUpdate,
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.kitchen)),
+    db: Session = Depends(get_db)
+):
+    """
+    Move several orders to the same status (admin/kitchen only)
+    
+    One UPDATE ... RETURNING for all of them; orders already in the target
+    status are left alone. The kitchen gets a single batched event.
+    """
+    order_ids = list(dict.fromkeys(status_update.order_ids))
+    new_status = status_update.status
+    now = datetime.utcnow()
+    
+    # Lock the rows first so the previous status comes back with the update
+    previous = select(
+        Order.id, Order.status.label("previous_status")
+    ).where(
+        Order.id.in_(order_ids)
+    ).with_for_update().subquery()
+    
+    ready_time = Order.ready_time
+    if new_status == OrderStatus.ready:
+        ready_time = case((Order.ready_time.is_(None), now), else_=Order.ready_time)
+    
+    rows = db.execute(
+        update(Order).where(
+            Order.id == previous.c.id,
+            previous.c.previous_status != new_status
+        ).values(
+            status=new_status,
+            ready_time=ready_time,
+            updated_at=now
+        ).returning(
+            Order.id, Order.order_number, Order.status, Order.notes, Order.ready_time,
+            Order.updated_at, previous.c.previous_status
+        ),
+        execution_options={"synchronize_session": False}
+    ).all()
+    # Every row changed to the same status, so only the previous one varies
+    for sign in (1, -1):
+        record_sales(db, [row.id for row in rows if sales_delta(row.previous_status, new_status) == sign], sign)
+    db.commit()
+    kitchen_cache.invalidate()
+    
+    updated_ids = {row.id for row in rows}
+    skipped_ids = [order_id for order_id in order_ids if order_id not in updated_ids]
+    existing_ids = set()
+    if skipped_ids:
+        existing_ids = {order_id for (order_id,) in db.query(Order.id).filter(Order.id.in_(skipped_ids))}
+    updates = [format_status_change(row, row.previous_status) for row in rows]
+    
+    logger.info(f"{len(rows)} orders moved to {new_status.value} by {current_user.email}")
+    
+    if updates:
+        await emit_orders_updated(updates)
+        kitchen_scheduler.ensure_loaded(db)
+        for row in rows:
+            kitchen_scheduler.order_status_changed(str(row.id), row.status, row.updated_at)
+        await emit_kitchen_schedule(kitchen_scheduler.snapshot())
+    
+    return {
+        "success": True,
+        "data": {
+            "updated": updates,
+            "unchanged": [order_id for order_id in skipped_ids if order_id in existing_ids],
+            "notFound": [order_id for order_id in skipped_ids if order_id not in existing_ids]
+        }
+    }
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: str,
+    include_archived: bool = Query(False, description="Also look the order up in the archive"),
     current_user: User = Depends(require_roles(UserRole.admin, UserRole.kitchen, UserRole.server)),
     db: Session = Depends(get_db)
 ):
@@ -110,6 +353,8 @@ async def get_order(
     Get order by ID
     """
     order = db.query(Order).filter(Order.id == order_id).first()
+    if not order and include_archived:
+        order = db.query(OrderArchive).filter(OrderArchive.id == order_id).first()
     
     if not order:
         raise HTTPException(
@@ -130,7 +375,9 @@ async def update_order_status(
     """
     Update order status (admin/kitchen only)
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked, so concurrent changes see each other's status and the sales
+    # rollups get exactly one delta per transition
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
     
     if not order:
         raise HTTPException(
@@ -139,17 +386,24 @@ async def update_order_status(
         )
     
     # Update status
+    previous_status = order.status
     order.status = status_update.status
     
     # Set ready time if status is ready
     if status_update.status == OrderStatus.ready and not order.ready_time:
         order.ready_time = datetime.utcnow()
     
+    record_sales(db, [order.id], sales_delta(previous_status, order.status))
     db.commit()
+    kitchen_cache.invalidate()
     db.refresh(order)
     
     logger.info(f"Order {order.order_number} status updated to {status_update.status}")
     
+    if order.status != previous_status:
+        await emit_order_updated(format_status_change(order, previous_status))
+        await publish_status_change(db, order)
+    
     return OrderResponse.model_validate(order)
 
 
@@ -163,7 +417,8 @@ async def update_order(
     """
     Update order (admin/server only)
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked for the same reason as in update_order_status
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
     
     if not order:
         raise HTTPException(
@@ -172,15 +427,24 @@ async def update_order(
         )
     
     # Update fields
+    previous_status = order.status
+    previous_notes = order.notes
     update_data = order_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(order, field, value)
     
+    record_sales(db, [order.id], sales_delta(previous_status, order.status))
     db.commit()
+    kitchen_cache.invalidate()
     db.refresh(order)
     
     logger.info(f"Order updated: {order.order_number}")
     
+    if order.status != previous_status or order.notes != previous_notes:
+        await emit_order_updated(format_status_change(order, previous_status))
+    if order.status != previous_status:
+        await publish_status_change(db, order)
+    
     return OrderResponse.model_validate(order)
 
 
@@ -193,7 +457,8 @@ async def delete_order(
     """
     Delete order (admin only)
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked for the same reason as in update_order_status
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
     
     if not order:
         raise HTTPException(
@@ -201,10 +466,17 @@ async def delete_order(
             detail="Order not found"
         )
     
+    order_id = str(order.id)
+    record_sales(db, [order_id], sales_delta(order.status, None))
     db.delete(order)
     db.commit()
+    kitchen_cache.invalidate()
     
     logger.info(f"Order deleted: {order.order_number}")
     
+    await emit_order_deleted(order_id)
+    kitchen_scheduler.order_removed(order_id)
+    await emit_kitchen_schedule(kitchen_scheduler.snapshot())
+    
     return None
 
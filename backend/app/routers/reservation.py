@@ -1,34 +1,42 @@
 """
 Reservation routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-import uuid
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
+from sqlalchemy import func, select, tuple_, or_, true, union
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from typing import Optional
+from datetime import date as date_type, timedelta
+import hashlib
+from app.config import settings
 from app.database import get_db
-from app.schemas.reservation import ReservationCreate, ReservationUpdate, ReservationResponse
-from app.models.reservation import Reservation
+from app.schemas.reservation import ReservationCreate, ReservationUpdate, ReservationResponse, TablePreferences, AutoAssignRequest
+from app.models.reservation import Reservation, ReservationStatus, ReservationTombstone
+from app.models.table import TableArea
 from app.models.user import User, UserRole
 from app.middleware.auth import get_current_user, require_roles
+from app.services.availability import availability_index, reservation_period, reservation_window
+from app.services.booking import CONFIRMATION_PREFIX, create_booking, update_booking, delete_booking, flush_booking, commit_booking
+from app.services.idempotency import claim_idempotency_key, save_idempotent_response
+from app.services.table_assignment import plan_assignments, preference_misses, rank_tables
 from app.utils.logger import logger
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.search import fold_text, digits_only, fold_expression, digits_expression
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
 
-def generate_confirmation_number() -> str:
-    """Generate a unique confirmation number"""
-    return f"RES-{uuid.uuid4().hex[:8].upper()}"
-
-
 @router.post("/", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
 async def create_reservation(
     reservation: ReservationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Create a new reservation
+    
+    A retry with the same Idempotency-Key header returns the first result
+    instead of booking again.
     """
     # Validate party size
     if reservation.party_size < 1:
@@ -37,52 +45,85 @@ async def create_reservation(
             detail="Party size must be at least 1"
         )
     
-    # Generate confirmation number
-    confirmation_number = generate_confirmation_number()
-    
-    # Create reservation with end_time and table_id
-    new_reservation = Reservation(
-        user_id=current_user.id,
-        date=reservation.date,
-        time=reservation.time,
-        end_time=reservation.end_time,
-        party_size=reservation.party_size,
-        special_request=reservation.special_request,
-        table_id=reservation.table_id if reservation.table_id else None,
-        confirmation_number=confirmation_number
-    )
+    claim = None
+    if idempotency_key:
+        claim = claim_idempotency_key(db, current_user.id, "POST /reservations", idempotency_key, reservation)
+        if isinstance(claim, Response):
+            return claim
     
-    db.add(new_reservation)
-    db.commit()
+    # Lock the table, re-check availability and insert in one transaction
+    new_reservation = create_booking(db, current_user.id, reservation)
+    flush_booking(db)
+    reservation_response = ReservationResponse.model_validate(new_reservation)
+    save_idempotent_response(claim, status.HTTP_201_CREATED, reservation_response)
+    commit_booking(db)
     db.refresh(new_reservation)
+    availability_index.upsert(new_reservation)
     
-    logger.info(f"New reservation created: {confirmation_number} for user {current_user.email}, table_id: {reservation.table_id}")
+    logger.info(f"New reservation created: {new_reservation.confirmation_number} for user {current_user.email}, table_id: {reservation.table_id}")
     
-    return ReservationResponse.model_validate(new_reservation)
+    return reservation_response
 
 
 @router.get("/")
 async def get_reservations(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
-    limit: int = None
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+    status_filter: Optional[ReservationStatus] = Query(None, alias="status"),
+    date_from: Optional[date_type] = Query(None),
+    date_to: Optional[date_type] = Query(None),
+    table_id: Optional[str] = Query(None)
 ):
     """
     Get all reservations for current user (or all for admin/staff)
+    
+    Newest first. With `limit`, pages are keyed on (date, id): pass the
+    returned `nextCursor` to fetch the following page.
     """
-    if current_user.role in [UserRole.admin, UserRole.manager, UserRole.server]:
-        # Admin/staff can see all reservations
-        query = db.query(Reservation).order_by(Reservation.date.desc())
-        if limit:
-            query = query.limit(limit)
-        reservations = query.all()
-    else:
+    # Load user and table in the same query instead of one lazy load per row
+    query = db.query(Reservation).options(
+        joinedload(Reservation.user),
+        joinedload(Reservation.table)
+    )
+    
+    if current_user.role not in [UserRole.admin, UserRole.manager, UserRole.server]:
         # Customers only see their own reservations
-        query = db.query(Reservation).filter(
-            Reservation.user_id == current_user.id
-        ).order_by(Reservation.date.desc())
-        if limit:
-            query = query.limit(limit)
+        query = query.filter(Reservation.user_id == current_user.id)
+    
+    if status_filter:
+        query = query.filter(Reservation.status == status_filter)
+    if date_from:
+        query = query.filter(Reservation.date >= date_from)
+    if date_to:
+        query = query.filter(Reservation.date <= date_to)
+    if table_id:
+        query = query.filter(Reservation.table_id == table_id)
+    
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor, 2)
+        try:
+            cursor_date = date_type.fromisoformat(cursor_date)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        # Row comparison served by the (date, id) index
+        query = query.filter(tuple_(Reservation.date, Reservation.id) < tuple_(cursor_date, cursor_id))
+    
+    query = query.order_by(Reservation.date.desc(), Reservation.id.desc())
+    
+    next_cursor = None
+    if limit:
+        # Fetch one extra row to know whether another page exists
+        reservations = query.limit(limit + 1).all()
+        if len(reservations) > limit:
+            reservations = reservations[:limit]
+            last = reservations[-1]
+            next_cursor = encode_cursor(last.date, last.id)
+    else:
         reservations = query.all()
     
     # Format response for frontend
@@ -117,20 +158,49 @@ async def get_reservations(
     return {
         "success": True,
         "data": {
-            "reservations": reservation_list
+            "reservations": reservation_list,
+            "nextCursor": next_cursor
         }
     }
 
 
+def format_calendar_reservation(r: Reservation) -> dict:
+    """Format a reservation for the calendar view"""
+    return {
+        "id": str(r.id),
+        "tableId": str(r.table_id) if r.table_id else None,
+        "tableNumber": r.table.table_number if r.table else None,
+        "time": r.time.strftime("%H:%M") if r.time else None,
+        "endTime": reservation_period(r.date, r.time, r.end_time)[1].strftime("%H:%M") if r.time else None,
+        "guestCount": r.party_size,
+        "status": r.status.value if r.status else None,
+        "confirmationNumber": r.confirmation_number,
+        "specialRequests": r.special_request,
+        "version": r.change_version,
+        "customer": {
+            "firstName": r.user.first_name if r.user else "Misafir",
+            "lastName": r.user.last_name if r.user else "",
+            "phone": r.user.phone if r.user else None
+        } if r.user else None
+    }
+
+
 @router.get("/calendar/by-date")
 async def get_reservations_by_date(
     date: str,
+    request: Request,
+    response: Response,
+    since: Optional[int] = Query(None, ge=0, description="Only return changes after this version"),
     current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager, UserRole.server)),
     db: Session = Depends(get_db)
 ):
     """
     Get all reservations for a specific date with table assignments.
     Used for the reservation calendar view.
+    
+    Full snapshots carry an ETag; send it back in If-None-Match to get a 304
+    while the day is unchanged. With `since`, only reservations changed after
+    that version and the ids of reservations that left the day are returned.
     """
     from datetime import datetime as dt
     from app.models.table import Table
@@ -143,34 +213,85 @@ async def get_reservations_by_date(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Get all reservations for the date
-    reservations = db.query(Reservation).filter(
+    # Fingerprint of the day in one statement. Versions only grow, so the
+    # sums change on every insert, update, delete or move touching the day.
+    #
+    # Versions are taken when a row is written, not when it commits, so a
+    # slower transaction can still commit a version below one already seen.
+    # The version handed out only counts rows written more than
+    # CALENDAR_VERSION_LAG_SECONDS ago; newer changes are sent again with
+    # the next delta, which clients apply idempotently by id.
+    settled = dt.utcnow() - timedelta(seconds=settings.CALENDAR_VERSION_LAG_SECONDS)
+    reservation_stats = select(
+        func.count(Reservation.id).label("count"),
+        func.coalesce(func.sum(Reservation.change_version), 0).label("version_sum"),
+        func.coalesce(
+            func.max(Reservation.change_version).filter(Reservation.updated_at < settled), 0
+        ).label("version")
+    ).where(Reservation.date == target_date).subquery()
+    tombstone_stats = select(
+        func.coalesce(func.sum(ReservationTombstone.change_version), 0).label("tombstone_sum"),
+        func.coalesce(
+            func.max(ReservationTombstone.change_version).filter(ReservationTombstone.created_at < settled), 0
+        ).label("tombstone_version")
+    ).where(ReservationTombstone.date == target_date).subquery()
+    table_stats = select(
+        func.count(Table.id).label("table_count"),
+        func.max(Table.updated_at).label("tables_updated")
+    ).subquery()
+    stats = db.execute(
+        select(reservation_stats, tombstone_stats, table_stats).select_from(
+            reservation_stats.join(tombstone_stats, true()).join(table_stats, true())
+        )
+    ).one()
+    
+    version = max(stats.version, stats.tombstone_version, since or 0)
+    
+    if since is not None:
+        # Delta: reservations written after `since`, with user and table joined in
+        changed = db.query(Reservation).options(
+            joinedload(Reservation.user),
+            joinedload(Reservation.table)
+        ).filter(
+            Reservation.date == target_date,
+            Reservation.change_version > since
+        ).order_by(Reservation.time).all()
+        changed_ids = {r.id for r in changed}
+        removed = db.query(ReservationTombstone.reservation_id).filter(
+            ReservationTombstone.date == target_date,
+            ReservationTombstone.change_version > since
+        ).all()
+        
+        return {
+            "success": True,
+            "data": {
+                "date": date,
+                "since": since,
+                "version": version,
+                "reservations": [format_calendar_reservation(r) for r in changed],
+                "deletedIds": sorted({row.reservation_id for row in removed} - changed_ids)
+            }
+        }
+    
+    fingerprint = (
+        f"{target_date}:{stats.count}:{stats.version_sum}:{stats.tombstone_sum}:"
+        f"{stats.table_count}:{stats.tables_updated}"
+    )
+    etag = f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()[:20]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Get all reservations for the date, with user and table joined in
+    reservations = db.query(Reservation).options(
+        joinedload(Reservation.user),
+        joinedload(Reservation.table)
+    ).filter(
         Reservation.date == target_date
     ).order_by(Reservation.time).all()
     
     # Get all tables
     tables = db.query(Table).order_by(Table.table_number).all()
     
-    # Format reservations by table
-    reservation_list = []
-    for r in reservations:
-        reservation_list.append({
-            "id": str(r.id),
-            "tableId": str(r.table_id) if r.table_id else None,
-            "tableNumber": r.table.table_number if r.table else None,
-            "time": r.time.strftime("%H:%M") if r.time else None,
-            "endTime": (dt.combine(target_date, r.time) + __import__('datetime').timedelta(hours=2)).strftime("%H:%M") if r.time else None,
-            "guestCount": r.party_size,
-            "status": r.status.value if r.status else None,
-            "confirmationNumber": r.confirmation_number,
-            "specialRequests": r.special_request,
-            "customer": {
-                "firstName": r.user.first_name if r.user else "Misafir",
-                "lastName": r.user.last_name if r.user else "",
-                "phone": r.user.phone if r.user else None
-            } if r.user else None
-        })
-    
     # Format tables list
     table_list = []
     for t in tables:
@@ -182,16 +303,249 @@ async def get_reservations_by_date(
             "status": t.status.value if t.status else None
         })
     
+    response.headers["ETag"] = etag
     return {
         "success": True,
         "data": {
             "date": date,
-            "reservations": reservation_list,
+            "version": version,
+            "reservations": [format_calendar_reservation(r) for r in reservations],
             "tables": table_list
         }
     }
 
 
+@router.get("/search")
+async def search_reservations(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    date_from: Optional[date_type] = Query(None),
+    date_to: Optional[date_type] = Query(None),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager, UserRole.server)),
+    db: Session = Depends(get_db)
+):
+    """
+    Search reservations by guest name, phone or confirmation number.
+    Every word of `q` must match one of them; matching is partial and
+    folds Turkish letters, so "sahin" finds "ŞAHİN". Best matches first.
+    """
+    terms = fold_text(q).split()
+    query_digits = digits_only(q)
+    if terms and not any(c.isalpha() for c in q):
+        # A phone number typed with spaces or dashes is a single term; the
+        # national trunk "0" is dropped since numbers are stored with +90
+        query_digits = query_digits.lstrip("0") or query_digits
+        terms = [query_digits] if query_digits else terms
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query is empty"
+        )
+    
+    first_name = fold_expression(User.first_name)
+    last_name = fold_expression(User.last_name)
+    phone = digits_expression(User.phone)
+    
+    def guest_match(term: str) -> list:
+        match = [first_name.contains(term, autoescape=True), last_name.contains(term, autoescape=True)]
+        # Digits inside a word with letters ("res-00fd") are not a phone number
+        digits = digits_only(term)
+        if len(digits) >= 3 and not any(c.isalpha() for c in term):
+            match.append(phone.contains(digits, autoescape=True))
+        return match
+    
+    def confirmation_match(term: str):
+        code = term.upper()
+        # Every number shares the prefix, so its trigrams narrow nothing down
+        if code.startswith(CONFIRMATION_PREFIX) and len(code) >= len(CONFIRMATION_PREFIX) + 3:
+            code = code[len(CONFIRMATION_PREFIX):]
+        return Reservation.confirmation_number.contains(code, autoescape=True)
+    
+    date_filters = []
+    if date_from:
+        date_filters.append(Reservation.date >= date_from)
+    if date_to:
+        date_filters.append(Reservation.date <= date_to)
+    
+    # Candidates come from the longest word, as a UNION of two index-driven
+    # branches: reservations of guests found through the users trigram
+    # indexes (then ix_reservations_user_id), and reservations found through
+    # the confirmation number trigram index. An OR of both in one WHERE
+    # would force a scan of every reservation. Guests are a UNION too: the
+    # planner underrates the folding functions and would rather scan users
+    # than OR three trigram indexes together.
+    lead = max(terms, key=len)
+    guest_ids = union(*[select(User.id).where(match) for match in guest_match(lead)])
+    candidates = union(
+        select(Reservation.id).where(Reservation.user_id.in_(guest_ids), *date_filters),
+        select(Reservation.id).where(confirmation_match(lead), *date_filters)
+    ).subquery()
+    
+    folded_query = " ".join(terms)
+    rank = func.greatest(
+        func.similarity(first_name.concat(" ").concat(last_name), folded_query),
+        func.similarity(Reservation.confirmation_number, folded_query.upper()),
+        func.similarity(phone, query_digits) if len(query_digits) >= 3 else 0
+    )
+    
+    # The other words only filter the (few) candidates
+    query = db.query(Reservation).join(
+        candidates, candidates.c.id == Reservation.id
+    ).join(Reservation.user).options(
+        contains_eager(Reservation.user),
+        joinedload(Reservation.table)
+    ).filter(*[
+        or_(*guest_match(term), confirmation_match(term))
+        for term in terms if term != lead
+    ])
+    
+    reservations = query.order_by(
+        rank.desc(), Reservation.date.desc(), Reservation.id.desc()
+    ).limit(limit).all()
+    
+    results = []
+    for r in reservations:
+        result = format_calendar_reservation(r)
+        result["date"] = r.date.isoformat() if r.date else None
+        results.append(result)
+    
+    return {
+        "success": True,
+        "data": results
+    }
+
+
+@router.post("/auto-assign")
+async def auto_assign_tables(
+    request: AutoAssignRequest,
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager, UserRole.server)),
+    db: Session = Depends(get_db)
+):
+    """
+    Assign tables to every confirmed reservation of a day that has none.
+    Minimizes empty seats and unmet guest preferences; with `dry_run` the
+    plan is returned without saving it.
+    """
+    from app.models.table import Table, TableStatus
+    
+    tables = db.query(Table).filter(
+        Table.status != TableStatus.maintenance
+    ).order_by(Table.capacity, Table.table_number).all()
+    tables_by_id = {str(t.id): t for t in tables}
+    
+    pending = db.query(Reservation).filter(
+        Reservation.date == request.date,
+        Reservation.table_id.is_(None),
+        Reservation.status == ReservationStatus.confirmed
+    ).order_by(Reservation.time).all()
+    
+    plan = plan_assignments(
+        tables,
+        availability_index.day_intervals(db, request.date),
+        [(r.id, r.party_size, *reservation_window(r.time, r.end_time)) for r in pending],
+        request.preferences
+    )
+    
+    assignments = []
+    unassigned = []
+    for r in pending:
+        table_id = plan.get(r.id)
+        if not table_id:
+            unassigned.append(r.id)
+            continue
+        table = tables_by_id[table_id]
+        if not request.dry_run:
+            update_booking(db, r, {"table_id": table_id})
+        assignments.append({
+            "reservationId": r.id,
+            "tableId": table_id,
+            "tableNumber": table.table_number,
+            "guestCount": r.party_size,
+            "capacity": table.capacity,
+            "unmetPreferences": preference_misses(table, request.preferences.get(r.id))
+        })
+    
+    if not request.dry_run and assignments:
+        commit_booking(db)
+        for r in pending:
+            availability_index.upsert(r)
+        logger.info(f"Auto-assigned {len(assignments)} reservations on {request.date} by {current_user.email}")
+    
+    seats_used = sum(a["guestCount"] for a in assignments)
+    seats_offered = sum(a["capacity"] for a in assignments)
+    
+    return {
+        "success": True,
+        "data": {
+            "date": request.date.isoformat(),
+            "dryRun": request.dry_run,
+            "assignments": assignments,
+            "unassigned": unassigned,
+            "seatUtilization": round(seats_used / seats_offered, 4) if seats_offered else None
+        }
+    }
+
+
+@router.get("/{reservation_id}/table-suggestions")
+async def suggest_tables(
+    reservation_id: str,
+    limit: int = Query(5, ge=1, le=50),
+    area: Optional[TableArea] = Query(None),
+    smoking: Optional[bool] = Query(None),
+    window: Optional[bool] = Query(None),
+    wall: Optional[bool] = Query(None),
+    vip: Optional[bool] = Query(None),
+    current_user: User = Depends(require_roles(UserRole.admin, UserRole.manager, UserRole.server)),
+    db: Session = Depends(get_db)
+):
+    """
+    Rank the tables free for a reservation's time slot, best fit first
+    """
+    from app.models.table import Table, TableStatus
+    
+    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+    
+    if not reservation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reservation not found"
+        )
+    
+    preferences = TablePreferences(area=area, smoking=smoking, window=window, wall=wall, vip=vip)
+    busy_ids = availability_index.busy_table_ids(db, reservation.date, reservation.time, reservation.end_time)
+    # A confirmed reservation keeps its own table free for itself: the
+    # exclusion constraint guarantees nobody else holds it. A cancelled or
+    # finished one no longer does, so another booking may have taken it.
+    if reservation.table_id and reservation.status == ReservationStatus.confirmed:
+        busy_ids.discard(str(reservation.table_id))
+    
+    tables = db.query(Table).filter(
+        Table.status != TableStatus.maintenance,
+        Table.capacity >= reservation.party_size
+    ).all()
+    
+    suggestions = []
+    for table, cost in rank_tables(tables, busy_ids, reservation.party_size, preferences)[:limit]:
+        suggestions.append({
+            "id": str(table.id),
+            "tableNumber": table.table_number,
+            "capacity": table.capacity,
+            "area": table.area.value if table.area else None,
+            "isWindow": table.is_window,
+            "isWall": table.is_wall,
+            "smokingAllowed": table.smoking_allowed,
+            "isVip": table.is_vip,
+            "wastedSeats": table.capacity - reservation.party_size,
+            "unmetPreferences": preference_misses(table, preferences),
+            "score": cost
+        })
+    
+    return {
+        "success": True,
+        "data": suggestions
+    }
+
+
 @router.get("/{reservation_id}", response_model=ReservationResponse)
 async def get_reservation(
     reservation_id: str,
@@ -251,12 +605,11 @@ async def update_reservation(
     logger.info(f"Update data received: {update_data}")
     logger.info(f"Current table_id: {reservation.table_id}")
     
-    for field, value in update_data.items():
-        logger.info(f"Setting {field} = {value}")
-        setattr(reservation, field, value)
-    
-    db.commit()
+    # Re-checks the table under a row lock when the booking stays confirmed
+    update_booking(db, reservation, update_data)
+    commit_booking(db)
     db.refresh(reservation)
+    availability_index.upsert(reservation)
     
     logger.info(f"Reservation updated: {reservation.confirmation_number}, new table_id: {reservation.table_id}")
     
@@ -280,8 +633,9 @@ async def delete_reservation(
             detail="Reservation not found"
         )
     
-    db.delete(reservation)
-    db.commit()
+    delete_booking(db, reservation)
+    commit_booking(db)
+    availability_index.discard(reservation.id)
     
     logger.info(f"Reservation deleted: {reservation.confirmation_number}")
     
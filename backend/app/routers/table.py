@@ -6,9 +6,10 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.schemas.table import TableCreate, TableUpdate, TableResponse
-from app.models.table import Table, TableStatus
+from app.models.table import Table, TableStatus, TableArea
 from app.models.user import User, UserRole
 from app.middleware.auth import get_current_user, require_roles
+from app.services.availability import availability_index, slot_grid, to_minutes, DEFAULT_DURATION_MINUTES
 from app.utils.logger import logger
 
 router = APIRouter(prefix="/tables", tags=["Tables"])
@@ -63,21 +64,15 @@ async def get_available_tables(
     1. Have capacity >= party_size
     2. Are not reserved for the given date and time slot (checks overlap)
     """
-    from app.models.reservation import Reservation, ReservationStatus
-    from datetime import datetime, timedelta, time as dt_time
+    from datetime import datetime
     
     # Parse date and time
     try:
         reservation_date = datetime.strptime(date, "%Y-%m-%d").date()
         reservation_start = datetime.strptime(time, "%H:%M").time()
-        if end_time:
-            reservation_end = datetime.strptime(end_time, "%H:%M").time()
-        else:
-            # Default: 2 hours after start
-            start_dt = datetime.combine(reservation_date, reservation_start)
-            reservation_end = (start_dt + timedelta(hours=2)).time()
+        # Without an end time the booking is assumed to last 2 hours
+        reservation_end = datetime.strptime(end_time, "%H:%M").time() if end_time else None
     except ValueError:
-        from fastapi import HTTPException
         raise HTTPException(status_code=400, detail="Invalid date or time format")
     
     # Get all tables with sufficient capacity
@@ -85,28 +80,10 @@ async def get_available_tables(
         Table.capacity >= party_size
     ).order_by(Table.capacity.asc(), Table.table_number).all()
     
-    # Get all confirmed reservations for that date
-    reservations = db.query(Reservation).filter(
-        Reservation.date == reservation_date,
-        Reservation.table_id.isnot(None),
-        Reservation.status == ReservationStatus.confirmed
-    ).all()
-    
-    # Find reserved table IDs for overlapping time slots
-    reserved_ids = set()
-    for res in reservations:
-        res_start = res.time
-        # Use end_time if available, otherwise assume 2 hours
-        if res.end_time:
-            res_end = res.end_time
-        else:
-            res_start_dt = datetime.combine(reservation_date, res_start)
-            res_end = (res_start_dt + timedelta(hours=2)).time()
-        
-        # Check time overlap: new reservation overlaps with existing
-        # Overlap if: new_start < existing_end AND new_end > existing_start
-        if reservation_start < res_end and reservation_end > res_start:
-            reserved_ids.add(str(res.table_id))
+    # Tables with a confirmed reservation overlapping the requested slot
+    reserved_ids = availability_index.busy_table_ids(
+        db, reservation_date, reservation_start, reservation_end
+    )
     
     # Filter available tables
     available_tables = []
@@ -134,6 +111,88 @@ async def get_available_tables(
     }
 
 
+@router.get("/availability-grid")
+async def get_availability_grid(
+    date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    party_size: int = Query(1, ge=1, description="Minimum party size"),
+    area: Optional[TableArea] = Query(None, description="Only tables in this area"),
+    slot_minutes: int = Query(15, ge=5, le=120, description="Slot length in minutes"),
+    duration: int = Query(DEFAULT_DURATION_MINUTES, ge=15, le=360, description="Booking length in minutes"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a whole-day availability matrix of tables x time slots.
+    A slot is available on a table when a booking of `duration` minutes
+    starting at that slot does not overlap a confirmed reservation.
+    Slots run from the restaurant's opening time to its closing time.
+    """
+    from datetime import datetime, timedelta
+    from app.routers.settings import get_or_create_settings
+    
+    try:
+        grid_date = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
+    
+    restaurant_settings = get_or_create_settings(db)
+    try:
+        open_min = to_minutes(datetime.strptime(restaurant_settings.opening_time, "%H:%M").time())
+        close_min = to_minutes(datetime.strptime(restaurant_settings.closing_time, "%H:%M").time())
+    except ValueError:
+        raise HTTPException(status_code=500, detail="Invalid opening hours in restaurant settings")
+    if close_min <= open_min:
+        # Closing after midnight
+        close_min += 24 * 60
+    
+    query = db.query(Table).filter(Table.capacity >= party_size)
+    if area:
+        query = query.filter(Table.area == area)
+    tables = query.order_by(Table.capacity.asc(), Table.table_number).all()
+    
+    table_ids = [str(table.id) for table in tables]
+    grid = slot_grid(
+        table_ids,
+        availability_index.day_intervals(db, grid_date),
+        open_min,
+        close_min,
+        slot_minutes,
+        duration
+    )
+    
+    day_start = datetime.combine(grid_date, datetime.min.time())
+    slots = [
+        (day_start + timedelta(minutes=open_min + i * slot_minutes)).strftime("%H:%M")
+        for i in range(grid.shape[1])
+    ]
+    
+    tables_data = []
+    for table, row in zip(tables, grid.tolist()):
+        tables_data.append({
+            "id": str(table.id),
+            "tableNumber": table.table_number,
+            "capacity": table.capacity,
+            "area": table.area.value if table.area else None,
+            "available": row
+        })
+    
+    return {
+        "success": True,
+        "data": {
+            "date": date,
+            "slots": slots,
+            "tables": tables_data,
+            "availableCounts": grid.sum(axis=0).tolist()
+        },
+        "meta": {
+            "partySize": party_size,
+            "area": area.value if area else None,
+            "slotMinutes": slot_minutes,
+            "duration": duration,
+            "totalTables": len(tables)
+        }
+    }
+
+
 @router.get("/{table_id}", response_model=TableResponse)
 async def get_table(table_id: str, db: Session = Depends(get_db)):
     """
@@ -226,6 +285,13 @@ async def delete_table(
             detail="Table not found"
         )
     
+    # Unassign its reservations with new change versions so calendar delta
+    # clients see the table go (ON DELETE SET NULL would leave them as is)
+    from app.models.reservation import Reservation, reservation_change_seq
+    db.query(Reservation).filter(Reservation.table_id == table_id).update(
+        {Reservation.table_id: None, Reservation.change_version: reservation_change_seq.next_value()},
+        synchronize_session=False
+    )
     db.delete(table)
     db.commit()
     
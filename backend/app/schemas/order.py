@@ -1,7 +1,7 @@
 """
 Order schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
 from decimal import Decimal
@@ -54,6 +54,12 @@ class OrderStatusUpdate(BaseModel):
     status: OrderStatus
 
 
+class OrderBulkStatusUpdate(BaseModel):
+    """Status update for several orders at once"""
+    order_ids: List[str] = Field(..., min_length=1, max_length=200)
+    status: OrderStatus
+
+
 class OrderResponse(OrderBase):
     """Order response schema"""
     id: str
@@ -61,6 +67,8 @@ class OrderResponse(OrderBase):
     status: OrderStatus
     order_time: datetime
     ready_time: Optional[datetime]
+    subtotal: Decimal
+    total_amount: Decimal
     created_at: datetime
     updated_at: datetime
     order_items: List[OrderItemResponse] = []
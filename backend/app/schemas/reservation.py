@@ -3,8 +3,10 @@ Reservation schemas
 """
 from pydantic import BaseModel
 from datetime import datetime, date, time
-from typing import Optional
+from datetime import date as date_type, time as time_type
+from typing import Optional, Dict
 from app.models.reservation import ReservationStatus
+from app.models.table import TableArea
 
 
 class ReservationBase(BaseModel):
@@ -23,9 +25,10 @@ class ReservationCreate(ReservationBase):
 
 class ReservationUpdate(BaseModel):
     """Reservation update schema"""
-    date: Optional[date] = None
-    time: Optional[time] = None
-    end_time: Optional[time] = None
+    # Aliased types: the field names shadow `date` and `time` in the class body
+    date: Optional[date_type] = None
+    time: Optional[time_type] = None
+    end_time: Optional[time_type] = None
     party_size: Optional[int] = None
     special_request: Optional[str] = None
     status: Optional[ReservationStatus] = None
@@ -45,3 +48,19 @@ class ReservationResponse(ReservationBase):
     
     class Config:
         from_attributes = True
+
+
+class TablePreferences(BaseModel):
+    """Guest seating preferences; None means no preference"""
+    area: Optional[TableArea] = None
+    smoking: Optional[bool] = None
+    window: Optional[bool] = None
+    wall: Optional[bool] = None
+    vip: Optional[bool] = None
+
+
+class AutoAssignRequest(BaseModel):
+    """Auto-assign tables for a day"""
+    date: date
+    preferences: Dict[str, TablePreferences] = {}
+    dry_run: bool = False
@@ -0,0 +1,270 @@
+"""
+In-memory table availability index
+
+Keeps, per reservation date, a sorted interval list of confirmed bookings for
+every table so that overlap checks for /tables/available do not have to load
+and re-parse the whole day from the database on every request.
+"""
+from bisect import bisect_left, insort
+from datetime import date as date_type, time as time_type, datetime, timedelta
+from threading import RLock
+from typing import Dict, List, Optional, Set, Tuple
+import time as monotonic_time
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, Query
+from app.config import settings
+from app.models.reservation import Reservation, ReservationStatus
+
+# Reservations without an explicit end time occupy the table for two hours
+DEFAULT_DURATION = timedelta(hours=2)
+DEFAULT_DURATION_MINUTES = int(DEFAULT_DURATION.total_seconds() // 60)
+
+
+def to_minutes(value: time_type) -> int:
+    """Convert a time of day to minutes since midnight"""
+    return value.hour * 60 + value.minute
+
+
+def reservation_window(start: time_type, end: Optional[time_type] = None) -> Tuple[int, int]:
+    """
+    Return the [start, end) window of a booking in minutes since midnight.
+
+    A missing end time means the default duration; an end time earlier than
+    the start means the booking runs past midnight.
+    """
+    start_min = to_minutes(start)
+    if end is None:
+        return start_min, start_min + DEFAULT_DURATION_MINUTES
+    end_min = to_minutes(end)
+    if end_min <= start_min:
+        end_min += 24 * 60
+    return start_min, end_min
+
+
+def reservation_period(day: date_type, start: time_type, end: Optional[time_type] = None) -> Tuple[datetime, datetime]:
+    """Return the [start, end) timestamps of a booking, matching Reservation.period"""
+    period_start = datetime.combine(day, start)
+    if end is None:
+        return period_start, period_start + DEFAULT_DURATION
+    period_end = datetime.combine(day, end)
+    if end <= start:
+        period_end += timedelta(days=1)
+    return period_start, period_end
+
+
+def overlapping_reservations(
+    db: Session,
+    table_id: str,
+    day: date_type,
+    start: time_type,
+    end: Optional[time_type] = None,
+    exclude_id: Optional[str] = None
+) -> Query:
+    """
+    Query confirmed reservations on a table that overlap a booking window.
+
+    Runs as a single range-overlap lookup served by the GiST index behind
+    the reservations_no_overlap exclusion constraint.
+    """
+    period_start, period_end = reservation_period(day, start, end)
+    query = db.query(Reservation).filter(
+        Reservation.table_id == table_id,
+        Reservation.status == ReservationStatus.confirmed,
+        Reservation.period.op("&&")(func.tsrange(period_start, period_end, "[)"))
+    )
+    if exclude_id:
+        query = query.filter(Reservation.id != exclude_id)
+    return query
+
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    """Check whether an IntegrityError came from the reservations_no_overlap constraint"""
+    # 23P01 = exclusion_violation
+    return getattr(exc.orig, "pgcode", None) == "23P01"
+
+
+class _DayIndex:
+    """Sorted interval lists of one date, keyed by table id"""
+
+    def __init__(self):
+        # table_id -> sorted list of (start_min, end_min, reservation_id)
+        self.tables: Dict[str, List[Tuple[int, int, str]]] = {}
+        # table_id -> longest booking on that table, bounds the backwards scan
+        self.max_length: Dict[str, int] = {}
+        self.loaded_at = monotonic_time.monotonic()
+
+    def add(self, table_id: str, start: int, end: int, reservation_id: str) -> None:
+        insort(self.tables.setdefault(table_id, []), (start, end, reservation_id))
+        self.max_length[table_id] = max(self.max_length.get(table_id, 0), end - start)
+
+    def remove(self, table_id: str, reservation_id: str) -> None:
+        intervals = self.tables.get(table_id)
+        if not intervals:
+            return
+        self.tables[table_id] = [i for i in intervals if i[2] != reservation_id]
+
+    def is_busy(self, table_id: str, start: int, end: int) -> bool:
+        intervals = self.tables.get(table_id)
+        if not intervals:
+            return False
+        # Every candidate starts before `end`; walk back only as far as the
+        # longest booking on this table could still reach into `start`.
+        idx = bisect_left(intervals, (end,))
+        horizon = start - self.max_length[table_id]
+        while idx > 0:
+            idx -= 1
+            res_start, res_end, _ = intervals[idx]
+            if res_start < horizon:
+                break
+            if res_end > start:
+                return True
+        return False
+
+    def busy_tables(self, start: int, end: int) -> Set[str]:
+        return {table_id for table_id in self.tables if self.is_busy(table_id, start, end)}
+
+
+class AvailabilityIndex:
+    """
+    Per-date availability index built lazily from Reservation rows.
+
+    Writes made through the reservation router update the index in place.
+    Days are reloaded after AVAILABILITY_INDEX_TTL_SECONDS so that bookings
+    written by other worker processes are picked up within that window.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._days: Dict[date_type, _DayIndex] = {}
+        # reservation_id -> (date, table_id) of the indexed entry
+        self._entries: Dict[str, Tuple[date_type, str]] = {}
+        self._lock = RLock()
+
+    def _load_day(self, db: Session, day: date_type) -> _DayIndex:
+        rows = db.query(
+            Reservation.id, Reservation.table_id, Reservation.time, Reservation.end_time
+        ).filter(
+            Reservation.date == day,
+            Reservation.table_id.isnot(None),
+            Reservation.status == ReservationStatus.confirmed
+        ).all()
+
+        index = _DayIndex()
+        for reservation_id, table_id, start, end in rows:
+            res_start, res_end = reservation_window(start, end)
+            index.add(str(table_id), res_start, res_end, str(reservation_id))
+        return index
+
+    def _get_day(self, db: Session, day: date_type) -> _DayIndex:
+        index = self._days.get(day)
+        if index and monotonic_time.monotonic() - index.loaded_at < self.ttl_seconds:
+            return index
+
+        index = self._load_day(db, day)
+        with self._lock:
+            old = self._days.get(day)
+            if old:
+                for intervals in old.tables.values():
+                    for _, _, reservation_id in intervals:
+                        self._entries.pop(reservation_id, None)
+            for table_id, intervals in index.tables.items():
+                for _, _, reservation_id in intervals:
+                    self._entries[reservation_id] = (day, table_id)
+            self._days[day] = index
+        return index
+
+    def busy_table_ids(self, db: Session, day: date_type, start: time_type, end: Optional[time_type] = None) -> Set[str]:
+        """Return ids of tables with a confirmed booking overlapping the window"""
+        res_start, res_end = reservation_window(start, end)
+        return self._get_day(db, day).busy_tables(res_start, res_end)
+
+    def day_intervals(self, db: Session, day: date_type) -> Dict[str, List[Tuple[int, int]]]:
+        """Return the booked (start, end) windows of every table on a date"""
+        index = self._get_day(db, day)
+        return {
+            table_id: [(start, end) for start, end, _ in intervals]
+            for table_id, intervals in index.tables.items()
+        }
+
+    def discard(self, reservation_id: str) -> None:
+        """Drop a reservation from the index (deleted or no longer confirmed)"""
+        with self._lock:
+            entry = self._entries.pop(str(reservation_id), None)
+            if entry:
+                day, table_id = entry
+                index = self._days.get(day)
+                if index:
+                    index.remove(table_id, str(reservation_id))
+
+    def upsert(self, reservation: Reservation) -> None:
+        """Re-index a reservation after it was created or changed"""
+        reservation_id = str(reservation.id)
+        with self._lock:
+            self.discard(reservation_id)
+            if reservation.table_id is None or reservation.status != ReservationStatus.confirmed:
+                return
+            # Days that were never loaded pick the booking up on first read
+            index = self._days.get(reservation.date)
+            if index is None:
+                return
+            res_start, res_end = reservation_window(reservation.time, reservation.end_time)
+            index.add(str(reservation.table_id), res_start, res_end, reservation_id)
+            self._entries[reservation_id] = (reservation.date, str(reservation.table_id))
+
+    def clear(self) -> None:
+        """Forget every indexed day"""
+        with self._lock:
+            self._days.clear()
+            self._entries.clear()
+
+
+def slot_grid(
+    table_ids: List[str],
+    intervals: Dict[str, List[Tuple[int, int]]],
+    open_min: int,
+    close_min: int,
+    slot_minutes: int,
+    duration_minutes: int = DEFAULT_DURATION_MINUTES
+) -> np.ndarray:
+    """
+    Compute a tables x slots boolean matrix of bookable start slots.
+
+    Cell [t, i] is True when a booking of `duration_minutes` starting at slot
+    i on table t does not overlap any existing booking. Occupancy is built
+    with one difference array per table and a cumulative sum, and the
+    duration check is a sliding-window sum, so no per-slot Python loop runs.
+    """
+    n_slots = max((close_min - open_min) // slot_minutes, 0)
+    n_tables = len(table_ids)
+    window = -(-duration_minutes // slot_minutes)
+
+    rows, starts, ends = [], [], []
+    for row, table_id in enumerate(table_ids):
+        for start, end in intervals.get(table_id, ()):
+            rows.append(row)
+            starts.append(start)
+            ends.append(end)
+
+    # Occupied slots: +1 at the first slot a booking touches, -1 after the last.
+    # The grid is padded by `window` slots so bookings running past closing
+    # still block late starts.
+    width = n_slots + window
+    diff = np.zeros((n_tables, width + 1), dtype=np.int32)
+    if rows:
+        rows_arr = np.asarray(rows)
+        first = np.clip((np.asarray(starts) - open_min) // slot_minutes, 0, width)
+        last = np.clip(-(-(np.asarray(ends) - open_min) // slot_minutes), 0, width)
+        np.add.at(diff, (rows_arr, first), 1)
+        np.add.at(diff, (rows_arr, last), -1)
+    occupied = np.cumsum(diff[:, :-1], axis=1) > 0
+
+    # Number of occupied slots inside each [i, i + window) start window
+    busy = np.zeros((n_tables, width + 1), dtype=np.int32)
+    np.cumsum(occupied, axis=1, out=busy[:, 1:])
+    return (busy[:, window:window + n_slots] - busy[:, :n_slots]) == 0
+
+
+# Global index instance
+availability_index = AvailabilityIndex(settings.AVAILABILITY_INDEX_TTL_SECONDS)
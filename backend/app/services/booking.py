@@ -0,0 +1,155 @@
+"""
+Booking engine - concurrency-safe reservation writes
+
+Every write that can put a confirmed reservation on a table goes through
+here. The table row is locked with SELECT ... FOR UPDATE before the overlap
+check, so simultaneous requests for the same table are serialized and only
+the first one can book a slot; the others get a 409. The
+reservations_no_overlap exclusion constraint remains the final safety net.
+The occupancy ledger is rewritten in the same transaction.
+"""
+from datetime import date as date_type, time as time_type
+from typing import Any, Dict, Optional
+import uuid
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.reservation import Reservation, ReservationStatus, ReservationTombstone
+from app.models.table import Table
+from app.schemas.reservation import ReservationCreate
+from app.services.availability import overlapping_reservations, is_overlap_violation
+from app.services.occupancy import sync_reservation
+
+
+CONFIRMATION_PREFIX = "RES-"
+
+
+def generate_confirmation_number() -> str:
+    """Generate a unique confirmation number"""
+    return f"{CONFIRMATION_PREFIX}{uuid.uuid4().hex[:8].upper()}"
+
+
+def table_conflict_error() -> HTTPException:
+    """Error returned when a table is already booked for the requested time"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Table is already reserved for this time slot"
+    )
+
+
+def lock_table(db: Session, table_id: str) -> Table:
+    """
+    Lock a table row until the current transaction ends
+    
+    Raises:
+        HTTPException: If the table does not exist
+    """
+    table = db.query(Table).filter(Table.id == table_id).with_for_update().first()
+    if not table:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Table not found"
+        )
+    return table
+
+
+def ensure_table_free(
+    db: Session,
+    table_id: str,
+    day: date_type,
+    start: time_type,
+    end: Optional[time_type] = None,
+    exclude_id: Optional[str] = None
+) -> None:
+    """
+    Lock the table and check that the booking window is still free
+    
+    Raises:
+        HTTPException: 404 if the table does not exist, 409 on overlap
+    """
+    lock_table(db, table_id)
+    if overlapping_reservations(db, table_id, day, start, end, exclude_id=exclude_id).first():
+        raise table_conflict_error()
+
+
+def create_booking(db: Session, user_id: str, data: ReservationCreate) -> Reservation:
+    """
+    Add a new reservation to the session after checking its table is free
+    
+    The caller commits with commit_booking().
+    """
+    table_id = data.table_id or None
+    if table_id:
+        ensure_table_free(db, table_id, data.date, data.time, data.end_time)
+    
+    reservation = Reservation(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        date=data.date,
+        time=data.time,
+        end_time=data.end_time,
+        party_size=data.party_size,
+        special_request=data.special_request,
+        table_id=table_id,
+        status=ReservationStatus.confirmed,
+        confirmation_number=generate_confirmation_number()
+    )
+    db.add(reservation)
+    sync_reservation(db, reservation)
+    return reservation
+
+
+def update_booking(db: Session, reservation: Reservation, changes: Dict[str, Any]) -> Reservation:
+    """
+    Apply changes to a reservation, re-checking its table when it stays booked
+    
+    The caller commits with commit_booking().
+    """
+    old_date = reservation.date
+    for field, value in changes.items():
+        setattr(reservation, field, value)
+    
+    if reservation.date != old_date:
+        # Tell calendar clients of the old day that the booking left it
+        db.add(ReservationTombstone(reservation_id=reservation.id, date=old_date))
+    
+    if reservation.table_id and reservation.status == ReservationStatus.confirmed:
+        ensure_table_free(
+            db, reservation.table_id, reservation.date, reservation.time, reservation.end_time,
+            exclude_id=reservation.id
+        )
+    sync_reservation(db, reservation)
+    return reservation
+
+
+def delete_booking(db: Session, reservation: Reservation) -> None:
+    """
+    Delete a reservation. The reservations_tombstone trigger leaves a
+    tombstone for calendar delta clients; its occupancy slots go with it
+    through ON DELETE CASCADE.
+    
+    The caller commits with commit_booking().
+    """
+    db.delete(reservation)
+
+
+def flush_booking(db: Session) -> None:
+    """Flush, turning an exclusion constraint violation into a 409"""
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_overlap_violation(exc):
+            raise table_conflict_error()
+        raise
+
+
+def commit_booking(db: Session) -> None:
+    """Commit, turning an exclusion constraint violation into a 409"""
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_overlap_violation(exc):
+            raise table_conflict_error()
+        raise
@@ -0,0 +1,88 @@
+"""
+Admin dashboard statistics
+
+All counters come from one statement (a cross join of single-row aggregate
+subqueries) and are cached per worker. Any commit that wrote users,
+reservations, orders or tables drops the cache, so the TTL only has to
+cover writes made by other workers.
+"""
+import itertools
+from datetime import date
+from sqlalchemy import event, func, select, true
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.user import User, UserRole
+from app.models.reservation import Reservation
+from app.models.order import Order, OrderStatus
+from app.models.table import Table, TableStatus
+from app.services.revenue import revenue_expression, day_bounds
+from app.utils.cache import LocalCache
+
+# Writes to these invalidate the cached stats
+STATS_MODELS = (User, Reservation, Order, Table)
+
+stats_cache = LocalCache(settings.ADMIN_STATS_CACHE_TTL_SECONDS)
+
+
+def dashboard_stats(db: Session, today: date) -> dict:
+    """Dashboard counters for the given day, read in a single query"""
+    customers = select(
+        func.count().label("total_customers")
+    ).where(User.role == UserRole.customer).subquery()
+    reservations = select(
+        func.count().label("today_reservations")
+    ).where(Reservation.date == today).subquery()
+    orders = select(
+        func.count().label("active_orders")
+    ).where(Order.status.in_([OrderStatus.pending, OrderStatus.preparing])).subquery()
+    tables = select(
+        func.count().filter(Table.status == TableStatus.available).label("available_tables"),
+        func.count().filter(Table.status == TableStatus.occupied).label("occupied_tables")
+    ).subquery()
+    
+    row = db.execute(
+        select(
+            customers.c.total_customers,
+            reservations.c.today_reservations,
+            orders.c.active_orders,
+            tables.c.available_tables,
+            tables.c.occupied_tables,
+            revenue_expression(*day_bounds(today)).label("today_revenue")
+        ).select_from(
+            customers.join(reservations, true()).join(orders, true()).join(tables, true())
+        )
+    ).one()
+    
+    return {
+        "todayReservations": row.today_reservations,
+        "todayRevenue": float(row.today_revenue),
+        "totalCustomers": row.total_customers,
+        "activeOrders": row.active_orders,
+        "availableTables": row.available_tables,
+        "occupiedTables": row.occupied_tables
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _note_stats_writes(session, flush_context):
+    if any(isinstance(obj, STATS_MODELS) for obj in itertools.chain(session.new, session.dirty, session.deleted)):
+        session.info["stats_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_stats_writes(orm_execute_state):
+    # Bulk UPDATE/DELETE statements bypass the flush
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and mapper and issubclass(mapper.class_, STATS_MODELS):
+        orm_execute_state.session.info["stats_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stats(session):
+    if session.info.pop("stats_dirty", False):
+        stats_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stats_writes(session):
+    session.info.pop("stats_dirty", None)
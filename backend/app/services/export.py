@@ -0,0 +1,65 @@
+"""
+Streaming CSV / NDJSON exports
+
+Export queries select plain columns (no ORM objects or Pydantic models) and
+are read from a server-side cursor in batches of EXPORT_BATCH_SIZE; each
+batch is written out and dropped before the next one is fetched, so memory
+use does not grow with the size of the export.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterator, List
+from sqlalchemy import Select
+from app.database import SessionLocal
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def json_default(value):
+    """JSON form of the column types exports contain"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # Kept as a string so amounts are not rounded through float
+        return str(value)
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def stream_export(statements: List[Select], fmt: str) -> Iterator[str]:
+    """
+    Run the statements one after another and yield their rows as CSV or
+    NDJSON text, one chunk per batch
+    
+    Opens its own session: the response body is produced after the request's
+    session has been closed.
+    """
+    db = SessionLocal()
+    try:
+        header_written = False
+        for statement in statements:
+            result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            keys = list(result.keys())
+            if fmt == "csv" and not header_written:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(keys)
+                header_written = True
+                yield buffer.getvalue()
+            for rows in result.partitions():
+                buffer = io.StringIO()
+                if fmt == "csv":
+                    csv.writer(buffer).writerows(rows)
+                else:
+                    for row in rows:
+                        buffer.write(json.dumps(dict(zip(keys, row)), default=json_default))
+                        buffer.write("\n")
+                yield buffer.getvalue()
+    finally:
+        db.close()
@@ -0,0 +1,144 @@
+"""
+Idempotency-Key handling for create endpoints
+
+The key row is inserted (and flushed) before the write it guards and gets
+the response just before commit. A concurrent duplicate blocks on the
+primary key until the first attempt finishes: it then sees the committed
+row and replays it, or, if the first attempt rolled back, takes the key
+itself. Expired keys are deleted by purge_expired_keys(), which
+run_key_purger() runs every IDEMPOTENCY_PURGE_INTERVAL_MINUTES.
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Union
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+from app.utils.logger import logger
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    """Hash of the request body, to detect a key reused for another request"""
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _find_key(db: Session, user_id: str, scope: str, key: str) -> Optional[IdempotencyKey]:
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.scope == scope,
+        IdempotencyKey.key == key
+    ).first()
+
+
+def _replay(record: IdempotencyKey, request_hash: str) -> JSONResponse:
+    if record.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return JSONResponse(
+        status_code=record.status_code,
+        content=record.response,
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def claim_idempotency_key(
+    db: Session,
+    user_id: str,
+    scope: str,
+    key: str,
+    payload: BaseModel
+) -> Union[IdempotencyKey, JSONResponse]:
+    """
+    Claim an idempotency key before running a create request
+    
+    Returns:
+        The stored response to send back if the key was already used,
+        otherwise the new key row to complete with save_idempotent_response()
+        
+    Raises:
+        HTTPException: 422 if the key was used for a different request body,
+            409 if the key kept changing hands while claiming it
+    """
+    request_hash = request_fingerprint(payload)
+    # The key that blocked the insert can be gone by the time it is read back
+    # (expired and replaced, or purged); claiming once more settles that
+    for _ in range(2):
+        existing = _find_key(db, user_id, scope, key)
+        if existing:
+            expires_at = existing.created_at + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+            if expires_at > datetime.utcnow():
+                return _replay(existing, request_hash)
+            db.delete(existing)
+            db.flush()
+        
+        record = IdempotencyKey(user_id=user_id, scope=scope, key=key, request_hash=request_hash)
+        db.add(record)
+        try:
+            # Waits here while another request holds the same key
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            existing = _find_key(db, user_id, scope, key)
+            if existing:
+                return _replay(existing, request_hash)
+            continue
+        return record
+    
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Idempotency-Key is being used by another request, retry later"
+    )
+
+
+def save_idempotent_response(record: Optional[IdempotencyKey], status_code: int, response: BaseModel) -> None:
+    """Store the response on the claimed key; committed with the write itself"""
+    if record is None:
+        return
+    record.status_code = status_code
+    record.response = response.model_dump(mode="json")
+
+
+def purge_expired_keys(db: Session) -> int:
+    """
+    Delete keys older than IDEMPOTENCY_KEY_TTL_HOURS
+    
+    Returns:
+        Number of keys deleted
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    deleted = db.query(IdempotencyKey).filter(
+        IdempotencyKey.created_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def _purge_keys_once() -> int:
+    db = SessionLocal()
+    try:
+        return purge_expired_keys(db)
+    finally:
+        db.close()
+
+
+async def run_key_purger() -> None:
+    """Purge expired idempotency keys every IDEMPOTENCY_PURGE_INTERVAL_MINUTES"""
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_PURGE_INTERVAL_MINUTES * 60)
+        try:
+            purged = await run_in_threadpool(_purge_keys_once)
+            if purged:
+                logger.info(f"Purged {purged} expired idempotency keys")
+        except Exception as e:
+            logger.error(f"Idempotency key purge failed: {e}")
@@ -0,0 +1,216 @@
+"""
+In-memory kitchen ticket scheduler
+
+Open orders are kept as tickets in a priority queue ordered by the latest
+time they can be fired and still be ready within the target ticket time
+(received time + target - longest item preparation time). Order events
+push or invalidate a single heap entry, so the queue is never rebuilt from
+the database; estimated ready times are planned from the head of the queue
+by assigning tickets to the first free cooking station.
+"""
+import heapq
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
+from app.config import settings
+from app.models.menu_item import MenuItem
+from app.models.order import Order, OrderItem, OrderStatus
+
+# A ticket should be ready this long after the order was received
+TARGET_TICKET_TIME = timedelta(minutes=20)
+DEFAULT_PREP_MINUTES = 15
+# Waiting tickets planned onto the stations in each snapshot; the rest of a
+# backlog gets no estimate until it reaches the head of the queue
+PLAN_LIMIT = 50
+
+
+@dataclass
+class Ticket:
+    """An order the kitchen still has to cook"""
+    order_id: str
+    order_number: str
+    received_at: datetime
+    prep_minutes: int
+    started_at: Optional[datetime] = None
+
+    @property
+    def fire_by(self) -> datetime:
+        """Latest start that still meets the target ticket time"""
+        return self.received_at + TARGET_TICKET_TIME - timedelta(minutes=self.prep_minutes)
+
+
+def ticket_for(order: Order) -> Ticket:
+    """Build the ticket of an order; needs its items and their menu items"""
+    # Items of a ticket are cooked in parallel, so the longest one decides
+    prep_minutes = max(
+        (item.menu_item.preparation_time or DEFAULT_PREP_MINUTES for item in order.order_items if item.menu_item),
+        default=DEFAULT_PREP_MINUTES
+    )
+    return Ticket(
+        order_id=str(order.id),
+        order_number=order.order_number,
+        received_at=order.order_time or datetime.utcnow(),
+        prep_minutes=prep_minutes
+    )
+
+
+class KitchenScheduler:
+    """
+    Priority queue of waiting tickets plus the tickets being cooked
+
+    Waiting tickets live in a heap keyed on (fire_by, order_id). Removing or
+    starting a ticket leaves its heap entry behind; stale entries are dropped
+    when they reach the head of the heap, and the heap is compacted once they
+    outnumber the live ones.
+    """
+
+    def __init__(self, stations: int):
+        self.stations = max(stations, 1)
+        self._waiting: Dict[str, Ticket] = {}
+        self._cooking: Dict[str, Ticket] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        self._loaded_at: Optional[float] = None
+        self._lock = RLock()
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Seed the queue from the open orders
+
+        Reloaded every KITCHEN_SCHEDULER_RESYNC_SECONDS so that a worker also
+        sees orders changed through other worker processes.
+        """
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            if age is not None and age < settings.KITCHEN_SCHEDULER_RESYNC_SECONDS:
+                return
+            self._waiting.clear()
+            self._cooking.clear()
+            self._heap = []
+            orders = db.query(Order).options(
+                joinedload(Order.order_items).joinedload(OrderItem.menu_item).load_only(
+                    MenuItem.id, MenuItem.preparation_time
+                )
+            ).filter(
+                Order.status.in_([OrderStatus.pending, OrderStatus.preparing])
+            ).all()
+            for order in orders:
+                self.add_ticket(ticket_for(order))
+                if order.status == OrderStatus.preparing:
+                    # The real start time is not stored; the last update is the best guess
+                    self.order_status_changed(order.id, OrderStatus.preparing, order.updated_at)
+            self._loaded_at = time.monotonic()
+
+    def add_ticket(self, ticket: Ticket) -> None:
+        """Queue a new order as a waiting ticket"""
+        with self._lock:
+            self._waiting[ticket.order_id] = ticket
+            heapq.heappush(self._heap, (ticket.fire_by, ticket.order_id))
+
+    def order_status_changed(self, order_id: str, status: OrderStatus, at: Optional[datetime] = None) -> None:
+        """Move a ticket along: preparing starts cooking, later states close it"""
+        with self._lock:
+            if status == OrderStatus.pending:
+                ticket = self._cooking.pop(order_id, None)
+                if ticket:
+                    ticket.started_at = None
+                    self._waiting[order_id] = ticket
+                    heapq.heappush(self._heap, (ticket.fire_by, order_id))
+            elif status == OrderStatus.preparing:
+                ticket = self._waiting.pop(order_id, None)
+                if ticket:
+                    ticket.started_at = at or datetime.utcnow()
+                    self._cooking[order_id] = ticket
+            else:
+                self.order_removed(order_id)
+            self._compact()
+
+    def order_removed(self, order_id: str) -> None:
+        """Forget a ticket (ready, served, cancelled or deleted)"""
+        with self._lock:
+            self._waiting.pop(order_id, None)
+            self._cooking.pop(order_id, None)
+            self._compact()
+
+    def _compact(self) -> None:
+        # Stale entries only cost memory; rebuild when they dominate
+        if len(self._heap) > 2 * len(self._waiting) + 16:
+            self._heap = [(t.fire_by, order_id) for order_id, t in self._waiting.items()]
+            heapq.heapify(self._heap)
+
+    def _first_waiting(self, count: int) -> List[Ticket]:
+        """The next count waiting tickets in fire order, in O(count log n)"""
+        taken: List[Tuple[datetime, str]] = []
+        while self._heap and len(taken) < count:
+            entry = heapq.heappop(self._heap)
+            ticket = self._waiting.get(entry[1])
+            # Entries of removed or started tickets are dropped for good; a
+            # ticket sent back to waiting has an older, equal entry next to it
+            if ticket is None or ticket.fire_by != entry[0] or (taken and taken[-1] == entry):
+                continue
+            taken.append(entry)
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+        return [self._waiting[order_id] for _, order_id in taken]
+
+    def snapshot(self, now: Optional[datetime] = None, fire_next: int = 5) -> dict:
+        """
+        Plan the head of the queue onto the cooking stations
+
+        Returns:
+            Waiting tickets to fire next and estimated ready times of the
+            cooking tickets and the first PLAN_LIMIT waiting ones
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            waiting = self._first_waiting(max(fire_next, PLAN_LIMIT))
+            waiting_count = len(self._waiting)
+            cooking = list(self._cooking.values())
+
+        etas = []
+        stations = []
+        for ticket in cooking:
+            ready_at = max(ticket.started_at + timedelta(minutes=ticket.prep_minutes), now)
+            stations.append(ready_at)
+            etas.append((ticket, "preparing", ticket.started_at, ready_at))
+        stations.extend([now] * (self.stations - len(stations)))
+        heapq.heapify(stations)
+
+        for ticket in waiting:
+            start = max(heapq.heappop(stations), now)
+            ready_at = start + timedelta(minutes=ticket.prep_minutes)
+            heapq.heappush(stations, ready_at)
+            etas.append((ticket, "pending", start, ready_at))
+
+        return {
+            "generatedAt": now.isoformat(),
+            "stations": self.stations,
+            "waiting": waiting_count,
+            "fireNext": [
+                {
+                    "orderId": t.order_id,
+                    "orderNumber": t.order_number,
+                    "prepMinutes": t.prep_minutes,
+                    "fireBy": t.fire_by.isoformat()
+                }
+                for t in waiting[:fire_next]
+            ],
+            "tickets": [
+                {
+                    "orderId": t.order_id,
+                    "orderNumber": t.order_number,
+                    "status": status.upper(),
+                    "prepMinutes": t.prep_minutes,
+                    "startAt": start.isoformat(),
+                    "estimatedReadyAt": ready_at.isoformat(),
+                    "late": ready_at > t.received_at + TARGET_TICKET_TIME
+                }
+                for t, status, start, ready_at in etas
+            ]
+        }
+
+
+# Global scheduler instance
+kitchen_scheduler = KitchenScheduler(settings.KITCHEN_STATIONS)
@@ -0,0 +1,94 @@
+"""
+Occupancy slot ledger
+
+Stores which table is held in every SLOT_MINUTES slot of a day, one row per
+(date, slot, table, reservation). Rows are rewritten in the same transaction
+as the reservation they belong to, so occupancy reads are a single indexed
+range scan on (date, slot) instead of a recomputation from reservations.
+"""
+from datetime import date as date_type
+from typing import Dict, Optional
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.models.occupancy import OccupancySlot
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.table import Table
+from app.services.availability import reservation_window
+
+SLOT_MINUTES = 15
+
+
+def slot_range(start_min: int, end_min: int) -> range:
+    """Slots touched by a [start, end) window in minutes"""
+    first = start_min // SLOT_MINUTES * SLOT_MINUTES
+    last = -(-end_min // SLOT_MINUTES) * SLOT_MINUTES
+    return range(first, last, SLOT_MINUTES)
+
+
+def sync_reservation(db: Session, reservation: Reservation) -> None:
+    """
+    Rewrite the ledger rows of one reservation inside the current transaction.
+    Confirmed reservations with a table hold slots; any other state holds none.
+    """
+    db.query(OccupancySlot).filter(
+        OccupancySlot.reservation_id == reservation.id
+    ).delete(synchronize_session=False)
+    
+    if reservation.table_id is None or reservation.status != ReservationStatus.confirmed:
+        return
+    
+    start_min, end_min = reservation_window(reservation.time, reservation.end_time)
+    db.add_all([
+        OccupancySlot(
+            date=reservation.date,
+            slot=slot,
+            table_id=reservation.table_id,
+            reservation_id=reservation.id
+        )
+        for slot in slot_range(start_min, end_min)
+    ])
+
+
+def occupancy_by_slot(db: Session, day: date_type) -> Dict[int, Dict[str, int]]:
+    """Occupied tables and seats per slot of a day"""
+    rows = db.query(
+        OccupancySlot.slot,
+        func.count(func.distinct(OccupancySlot.table_id)).label("tables"),
+        func.coalesce(func.sum(Table.capacity), 0).label("seats")
+    ).join(
+        Table, Table.id == OccupancySlot.table_id
+    ).filter(
+        OccupancySlot.date == day
+    ).group_by(OccupancySlot.slot).order_by(OccupancySlot.slot).all()
+    return {row.slot: {"tables": row.tables, "seats": int(row.seats)} for row in rows}
+
+
+def rebuild_ledger(db: Session, date_from: Optional[date_type] = None, date_to: Optional[date_type] = None) -> int:
+    """
+    Regenerate the ledger from reservations in bulk, optionally for a date range.
+    Runs as one DELETE and one INSERT ... SELECT; the caller commits.
+    
+    Returns:
+        Number of slot rows written
+    """
+    params = {"slot_minutes": SLOT_MINUTES, "date_from": date_from, "date_to": date_to}
+    range_filter = (
+        "(CAST(:date_from AS date) IS NULL OR {col} >= :date_from) "
+        "AND (CAST(:date_to AS date) IS NULL OR {col} <= :date_to)"
+    )
+    db.execute(text(f"DELETE FROM occupancy_slots WHERE {range_filter.format(col='date')}"), params)
+    
+    # Slot bounds follow slot_range(): floor of the start, ceiling of the end
+    result = db.execute(text(f"""
+        INSERT INTO occupancy_slots (date, slot, table_id, reservation_id)
+        SELECT r.date, s.slot, r.table_id, r.id
+        FROM reservations r
+        CROSS JOIN LATERAL (
+            SELECT
+                floor(extract(epoch FROM lower(r.period) - r.date::timestamp) / 60 / :slot_minutes)::int * :slot_minutes AS first_slot,
+                ceil(extract(epoch FROM upper(r.period) - r.date::timestamp) / 60 / :slot_minutes)::int * :slot_minutes AS end_slot
+        ) b
+        CROSS JOIN LATERAL generate_series(b.first_slot, b.end_slot - :slot_minutes, :slot_minutes) AS s(slot)
+        WHERE r.status = 'confirmed' AND r.table_id IS NOT NULL AND {range_filter.format(col='r.date')}
+    """), params)
+    return result.rowcount
@@ -0,0 +1,96 @@
+"""
+Order archiving
+
+Served and cancelled orders older than ORDER_ARCHIVE_AFTER_DAYS are moved,
+with their items, from orders/order_items to orders_archive and
+order_items_archive. Each batch is a single statement (DELETE ... RETURNING
+feeding the archive INSERTs), so a row is always in exactly one place, and
+rows are claimed with SKIP LOCKED so several workers can run it at once.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.order import Order, OrderItem
+from app.utils.logger import logger
+
+ORDER_COLUMNS = ", ".join(column.name for column in Order.__table__.columns)
+ITEM_COLUMNS = ", ".join(column.name for column in OrderItem.__table__.columns)
+
+ARCHIVE_BATCH_SQL = text(f"""
+    WITH moved AS (
+        DELETE FROM orders
+        WHERE id IN (
+            SELECT id FROM orders
+            WHERE status IN ('served', 'cancelled') AND order_time < :cutoff
+            ORDER BY order_time
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {ORDER_COLUMNS}
+    ),
+    moved_items AS (
+        DELETE FROM order_items
+        WHERE order_id IN (SELECT id FROM moved)
+        RETURNING {ITEM_COLUMNS}
+    ),
+    archived AS (
+        INSERT INTO orders_archive ({ORDER_COLUMNS}, archived_at)
+        SELECT {ORDER_COLUMNS}, :archived_at FROM moved
+        RETURNING id
+    ),
+    archived_items AS (
+        INSERT INTO order_items_archive ({ITEM_COLUMNS})
+        SELECT {ITEM_COLUMNS} FROM moved_items
+    )
+    SELECT count(*) FROM archived
+""")
+
+
+def archive_orders(db: Session, older_than_days: int = None, batch_size: int = None) -> int:
+    """
+    Move finished orders older than the given age to the archive tables
+    
+    Commits after every batch.
+    
+    Returns:
+        Number of orders archived
+    """
+    older_than_days = settings.ORDER_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    
+    total = 0
+    while True:
+        moved = db.execute(ARCHIVE_BATCH_SQL, {
+            "cutoff": cutoff,
+            "batch_size": batch_size,
+            "archived_at": datetime.utcnow()
+        }).scalar()
+        db.commit()
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+def _archive_once() -> int:
+    db = SessionLocal()
+    try:
+        return archive_orders(db)
+    finally:
+        db.close()
+
+
+async def run_archiver() -> None:
+    """Archive old orders every ORDER_ARCHIVE_INTERVAL_MINUTES"""
+    while True:
+        await asyncio.sleep(settings.ORDER_ARCHIVE_INTERVAL_MINUTES * 60)
+        try:
+            archived = await run_in_threadpool(_archive_once)
+            if archived:
+                logger.info(f"Archived {archived} orders")
+        except Exception as e:
+            logger.error(f"Order archiving failed: {e}")
@@ -0,0 +1,153 @@
+"""
+Table turnover and occupancy analytics
+
+Reservations of a date range are read as plain columns in one query and
+turned into NumPy arrays; every metric is then a mask, bincount or
+reduction over those arrays, so a year of reservations is summarised
+without a per-row Python loop. Seating time is the booked period of a
+reservation (its end time, or the default two hours).
+"""
+from datetime import date as date_type
+from typing import Dict
+import numpy as np
+from sqlalchemy import Date, Integer, String, cast, extract, func, literal
+from sqlalchemy.orm import Session
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.table import Table, TableArea
+
+# Reservations that held their table
+SEATED_STATUSES = (ReservationStatus.confirmed.value, ReservationStatus.completed.value)
+# Sorted, so area names map to indexes with searchsorted
+AREAS = sorted(area.value for area in TableArea)
+
+
+def load_columns(db: Session, date_from: date_type, date_to: date_type) -> Dict[str, np.ndarray]:
+    """Tables and the reservations of [date_from, date_to] as column arrays"""
+    tables = db.query(Table.id, cast(Table.area, String), Table.capacity).all()
+    # Plain ints and strings only: no per-row date or Decimal conversion
+    reservations = db.query(
+        func.coalesce(Reservation.table_id, ""),
+        cast(Reservation.date - literal(date_from, Date), Integer),
+        cast(Reservation.status, String),
+        Reservation.party_size,
+        cast(extract("epoch", func.upper(Reservation.period) - func.lower(Reservation.period)) / 60, Integer)
+    ).filter(
+        Reservation.date >= date_from,
+        Reservation.date <= date_to
+    ).all()
+    
+    table_cols = list(zip(*tables)) or [(), (), ()]
+    reservation_cols = list(zip(*reservations)) or [(), (), (), (), ()]
+    # Tables sorted by id (in code, not by the database collation) for searchsorted
+    table_id = np.array(table_cols[0], dtype=str)
+    order = np.argsort(table_id)
+    return {
+        "table_id": table_id[order],
+        "table_area": np.array(table_cols[1], dtype=str)[order],
+        "table_capacity": np.array(table_cols[2], dtype=np.int64)[order],
+        "table": np.array(reservation_cols[0], dtype=str),
+        "night": np.array(reservation_cols[1], dtype=np.int64),
+        "status": np.array(reservation_cols[2], dtype=str),
+        "party_size": np.array(reservation_cols[3], dtype=np.int64),
+        "minutes": np.array(reservation_cols[4], dtype=np.int64),
+    }
+
+
+def _ratio(numerator: float, denominator: float, digits: int = 4):
+    return round(float(numerator) / float(denominator), digits) if denominator else None
+
+
+def occupancy_metrics(
+    columns: Dict[str, np.ndarray],
+    date_from: date_type,
+    date_to: date_type,
+    service_minutes: int
+) -> dict:
+    """
+    Seating time, turns, seat utilization and no-show rates from column arrays
+    
+    Args:
+        columns: Output of load_columns
+        date_from: First night of the range
+        date_to: Last night of the range
+        service_minutes: Opening hours per night, the seat time on offer
+    """
+    nights = (date_to - date_from).days + 1
+    table_ids = columns["table_id"]
+    n_tables = len(table_ids)
+    area_of_table = np.searchsorted(AREAS, columns["table_area"]) if n_tables else np.zeros(0, dtype=np.int64)
+    capacity = columns["table_capacity"]
+    
+    status = columns["status"]
+    party = columns["party_size"]
+    minutes = columns["minutes"]
+    
+    # Map reservations to table rows; unassigned or deleted tables get -1
+    position = np.searchsorted(table_ids, columns["table"]) if n_tables else np.zeros(len(status), dtype=np.int64)
+    position = np.minimum(position, max(n_tables - 1, 0))
+    known = (table_ids[position] == columns["table"]) if n_tables else np.zeros(len(status), dtype=bool)
+    table_row = np.where(known, position, -1)
+    night = columns["night"]
+    
+    seated = np.isin(status, SEATED_STATUSES) & known
+    no_show = status == ReservationStatus.no_show.value
+    completed = status == ReservationStatus.completed.value
+    cancelled = status == ReservationStatus.cancelled.value
+    area_of_reservation = np.where(known, area_of_table[position] if n_tables else 0, -1)
+    
+    # Seatings per table and night
+    turns = np.bincount(
+        table_row[seated] * nights + night[seated],
+        minlength=n_tables * nights
+    ).reshape(n_tables, nights)
+    seat_minutes_used = np.bincount(
+        table_row[seated], weights=party[seated] * minutes[seated], minlength=n_tables
+    )
+    seats_at_seated = capacity[table_row[seated]]
+    
+    n_areas = len(AREAS)
+    area_tables = np.bincount(area_of_table, minlength=n_areas)
+    area_seats = np.bincount(area_of_table, weights=capacity, minlength=n_areas)
+    area_turns = np.bincount(area_of_table, weights=turns.sum(axis=1), minlength=n_areas)
+    area_used = np.bincount(area_of_table, weights=seat_minutes_used, minlength=n_areas)
+    seated_area = area_of_reservation[seated]
+    area_party = np.bincount(seated_area, weights=party[seated], minlength=n_areas)
+    area_capacity = np.bincount(seated_area, weights=seats_at_seated, minlength=n_areas)
+    resolved = (no_show | completed) & known
+    area_no_show = np.bincount(area_of_reservation[no_show & known], minlength=n_areas)
+    area_resolved = np.bincount(area_of_reservation[resolved], minlength=n_areas)
+    
+    seated_minutes = minutes[seated]
+    return {
+        "dateFrom": date_from.isoformat(),
+        "dateTo": date_to.isoformat(),
+        "nights": nights,
+        "serviceMinutes": service_minutes,
+        "reservations": {
+            "total": int(len(status)),
+            "seated": int(seated.sum()),
+            "completed": int(completed.sum()),
+            "cancelled": int(cancelled.sum()),
+            "noShow": int(no_show.sum())
+        },
+        "noShowRate": _ratio(no_show.sum(), (no_show | completed).sum()),
+        "cancellationRate": _ratio(cancelled.sum(), len(status)),
+        "averageSeatingMinutes": round(float(seated_minutes.mean()), 1) if seated_minutes.size else None,
+        "medianSeatingMinutes": round(float(np.median(seated_minutes)), 1) if seated_minutes.size else None,
+        "turnsPerTableNight": round(float(turns.mean()), 3) if turns.size else None,
+        "seatUtilization": _ratio(seat_minutes_used.sum(), capacity.sum() * service_minutes * nights),
+        "areas": [
+            {
+                "area": area,
+                "tables": int(area_tables[i]),
+                "seats": int(area_seats[i]),
+                "turnsPerTableNight": _ratio(area_turns[i], area_tables[i] * nights, 3),
+                # Share of the area's seat-minutes on offer that were booked
+                "seatUtilization": _ratio(area_used[i], area_seats[i] * service_minutes * nights),
+                # Guests per seat at the tables they were given
+                "seatFill": _ratio(area_party[i], area_capacity[i]),
+                "noShowRate": _ratio(area_no_show[i], area_resolved[i])
+            }
+            for i, area in enumerate(AREAS)
+        ]
+    }
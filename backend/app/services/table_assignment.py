@@ -0,0 +1,194 @@
+"""
+Table assignment solver
+
+Packs a day's reservations onto tables using the table features (area,
+smoking, window, VIP) as guest preferences. Reservations are swept in start
+time order over the interval graph of bookings and merged into groups of
+overlapping windows; each group needs one table per reservation and is
+assigned together with a minimum-cost bipartite matching, where the cost is
+wasted seats plus unmet preferences. This avoids the greedy failure mode of
+giving a big table to a small party just because its request was processed
+first.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from app.models.table import Table
+from app.schemas.reservation import TablePreferences
+
+# Cost of one empty seat at a table
+WASTED_SEAT_COST = 10
+# Cost of one unmet guest preference; outweighs a couple of empty seats
+PREFERENCE_COST = 25
+# Cost marking an impossible pairing (table too small, busy, or dummy column)
+INFEASIBLE_COST = 10 ** 6
+
+Interval = Tuple[int, int]
+# (reservation_id, party_size, start_min, end_min)
+Booking = Tuple[str, int, int, int]
+
+
+def preference_misses(table: Table, preferences: Optional[TablePreferences]) -> int:
+    """Count the guest preferences a table does not satisfy"""
+    if not preferences:
+        return 0
+    misses = 0
+    if preferences.area is not None and table.area != preferences.area:
+        misses += 1
+    if preferences.smoking is not None and table.smoking_allowed != preferences.smoking:
+        misses += 1
+    if preferences.window is not None and table.is_window != preferences.window:
+        misses += 1
+    if preferences.wall is not None and table.is_wall != preferences.wall:
+        misses += 1
+    if preferences.vip is not None and table.is_vip != preferences.vip:
+        misses += 1
+    return misses
+
+
+def assignment_cost(table: Table, party_size: int, preferences: Optional[TablePreferences] = None) -> int:
+    """Cost of seating a party at a table, INFEASIBLE_COST if it does not fit"""
+    if table.capacity < party_size:
+        return INFEASIBLE_COST
+    return (table.capacity - party_size) * WASTED_SEAT_COST + preference_misses(table, preferences) * PREFERENCE_COST
+
+
+def _overlaps(intervals: List[Interval], start: int, end: int) -> bool:
+    return any(res_start < end and res_end > start for res_start, res_end in intervals)
+
+
+def _overlapping_groups(ordered: List[Booking]) -> Iterator[List[Booking]]:
+    # Merge while the next start falls before the earliest end of the group,
+    # so every reservation in a group overlaps every other one
+    group: List[Booking] = []
+    group_end = 0
+    for reservation in ordered:
+        start, end = reservation[2], reservation[3]
+        if group and start >= group_end:
+            yield group
+            group = []
+        group_end = min(group_end, end) if group else end
+        group.append(reservation)
+    if group:
+        yield group
+
+
+def min_cost_assignment(cost: List[List[int]]) -> List[int]:
+    """
+    Solve a rectangular assignment problem (rows <= columns) with the
+    Hungarian algorithm in O(rows^2 * columns).
+    
+    Returns:
+        Column index chosen for each row
+    """
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    infinity = float("inf")
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    match = [0] * (m + 1)  # match[j] = row (1-based) assigned to column j
+    way = [0] * (m + 1)
+    
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        min_v = [infinity] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            delta = infinity
+            j1 = 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    current = row[j - 1] - u[i0] - v[j]
+                    if current < min_v[j]:
+                        min_v[j] = current
+                        way[j] = j0
+                    if min_v[j] < delta:
+                        delta = min_v[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_v[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    
+    result = [-1] * n
+    for j in range(1, m + 1):
+        if match[j]:
+            result[match[j] - 1] = j - 1
+    return result
+
+
+def plan_assignments(
+    tables: Sequence[Table],
+    booked: Dict[str, List[Interval]],
+    reservations: Sequence[Booking],
+    preferences: Optional[Dict[str, TablePreferences]] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Assign reservations to tables for one day
+    
+    Args:
+        tables: Candidate tables
+        booked: Already occupied (start, end) minute windows per table id
+        reservations: (reservation_id, party_size, start_min, end_min) to place
+        preferences: Guest preferences per reservation id
+        
+    Returns:
+        Table id (or None when nothing fits) for every reservation id
+    """
+    preferences = preferences or {}
+    occupied = {str(t.id): list(booked.get(str(t.id), ())) for t in tables}
+    plan: Dict[str, Optional[str]] = {}
+    
+    ordered = sorted(reservations, key=lambda r: (r[2], -r[1]))
+    for batch in _overlapping_groups(ordered):
+        cost = []
+        for reservation_id, party_size, start, end in batch:
+            prefs = preferences.get(reservation_id)
+            row = [
+                INFEASIBLE_COST if _overlaps(occupied[str(t.id)], start, end)
+                else assignment_cost(t, party_size, prefs)
+                for t in tables
+            ]
+            # Dummy columns let rows stay unassigned when tables run out
+            row.extend([INFEASIBLE_COST] * max(len(batch) - len(tables), 0))
+            cost.append(row)
+        
+        columns = min_cost_assignment(cost)
+        for row, (reservation_id, _, start, end) in enumerate(batch):
+            column = columns[row]
+            if column < 0 or column >= len(tables) or cost[row][column] >= INFEASIBLE_COST:
+                plan[reservation_id] = None
+                continue
+            table_id = str(tables[column].id)
+            occupied[table_id].append((start, end))
+            plan[reservation_id] = table_id
+    return plan
+
+
+def rank_tables(
+    tables: Sequence[Table],
+    busy_ids: set,
+    party_size: int,
+    preferences: Optional[TablePreferences] = None
+) -> List[Tuple[Table, int]]:
+    """Free tables that fit a party, cheapest (best) first, with their cost"""
+    ranked = [
+        (table, assignment_cost(table, party_size, preferences))
+        for table in tables
+        if str(table.id) not in busy_ids
+    ]
+    ranked = [(table, cost) for table, cost in ranked if cost < INFEASIBLE_COST]
+    ranked.sort(key=lambda item: (item[1], item[0].table_number))
+    return ranked
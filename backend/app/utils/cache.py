@@ -0,0 +1,71 @@
+"""
+In-process cache utilities
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LocalCache:
+    """
+    Small in-process cache with expiry and explicit invalidation
+
+    Each worker process has its own copy, so entries also expire after
+    `ttl_seconds` to pick up writes made by other processes.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss
+
+        Args:
+            key: Cache key
+            loader: Builds the value when it is missing or expired
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            # Drop the value if a write invalidated the cache while loading
+            if self._generation == generation:
+                self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or every key when none is given"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def metrics(self) -> dict:
+        """Hit and miss counters of this process"""
+        lookups = self.hits + self.misses
+        return {
+            "ttlSeconds": self.ttl_seconds,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else None
+        }
@@ -0,0 +1,35 @@
+"""
+Text search helpers - Turkish-aware case folding shared by Python and SQL
+"""
+import re
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
+# Turkish letters folded to their ASCII base before lowercasing, so "İZMİR",
+# "izmir" and "Izmir" all match and "Şahin" is found by "sahin". Translating
+# before lower() also avoids Python turning "İ" into "i" plus a combining dot.
+TURKISH_CHARS = "İIıŞşĞğÜüÖöÇç"
+ASCII_CHARS = "iiissgguuoocc"
+
+_FOLD_TABLE = str.maketrans(TURKISH_CHARS, ASCII_CHARS)
+_NON_DIGITS = re.compile(r"\D")
+
+
+def fold_text(value: str) -> str:
+    """Fold a search string the same way as fold_expression()"""
+    return value.translate(_FOLD_TABLE).lower()
+
+
+def digits_only(value: str) -> str:
+    """Strip everything but digits, the same way as digits_expression()"""
+    return _NON_DIGITS.sub("", value)
+
+
+def fold_expression(column) -> ColumnElement:
+    """SQL expression folding a text column for case-insensitive Turkish search"""
+    return func.lower(func.translate(column, TURKISH_CHARS, ASCII_CHARS))
+
+
+def digits_expression(column) -> ColumnElement:
+    """SQL expression keeping only the digits of a text column"""
+    return func.regexp_replace(func.coalesce(column, ""), "[^0-9]", "", "g")
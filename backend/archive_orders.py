@@ -0,0 +1,41 @@
+"""
+Order archive script
+
+Moves served and cancelled orders older than a given age to the archive tables
+and deletes expired idempotency keys.
+Usage: python archive_orders.py [--days N] [--batch-size N]
+"""
+import argparse
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.services.idempotency import purge_expired_keys
+from app.services.order_archive import archive_orders
+import app.models  # noqa: F401 - register all tables
+
+
+def run_archive(days: int, batch_size: int):
+    """Archive finished orders older than `days` days"""
+    
+    # Create tables
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    
+    try:
+        archived = archive_orders(db, days, batch_size)
+        print(f"✓ {archived} orders archived")
+        purged = purge_expired_keys(db)
+        print(f"✓ {purged} expired idempotency keys deleted")
+    except Exception as e:
+        print(f"❌ Error archiving orders: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive served and cancelled orders")
+    parser.add_argument("--days", type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS, help="Minimum order age in days")
+    parser.add_argument("--batch-size", type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE, help="Orders moved per transaction")
+    args = parser.parse_args()
+    run_archive(args.days, args.batch_size)
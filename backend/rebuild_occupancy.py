@@ -0,0 +1,38 @@
+"""
+Occupancy ledger rebuild script
+
+Regenerates occupancy_slots from reservation history in bulk.
+Usage: python rebuild_occupancy.py [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+import argparse
+from datetime import date
+from app.database import SessionLocal, engine, Base
+from app.services.occupancy import rebuild_ledger
+import app.models  # noqa: F401 - register all tables
+
+
+def rebuild_occupancy(date_from: date = None, date_to: date = None):
+    """Rebuild the occupancy ledger for a date range (all dates by default)"""
+    
+    # Create tables
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    
+    try:
+        rows = rebuild_ledger(db, date_from, date_to)
+        db.commit()
+        print(f"✓ Occupancy ledger rebuilt: {rows} slots written")
+    except Exception as e:
+        print(f"❌ Error rebuilding occupancy ledger: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the occupancy slot ledger")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    rebuild_occupancy(args.date_from, args.date_to)
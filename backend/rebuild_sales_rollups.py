@@ -0,0 +1,38 @@
+"""
+Sales rollup rebuild script
+
+Regenerates sales_daily and sales_hourly from served orders (live and archived) in bulk.
+Usage: python rebuild_sales_rollups.py [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+import argparse
+from datetime import date
+from app.database import SessionLocal, engine, Base
+from app.services.sales_rollup import rebuild_rollups
+import app.models  # noqa: F401 - register all tables
+
+
+def rebuild_sales_rollups(date_from: date = None, date_to: date = None):
+    """Rebuild the sales rollups for a date range (all dates by default)"""
+    
+    # Create tables
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    
+    try:
+        rows = rebuild_rollups(db, date_from, date_to)
+        db.commit()
+        print(f"✓ Sales rollups rebuilt: {rows} daily rows written")
+    except Exception as e:
+        print(f"❌ Error rebuilding sales rollups: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily and hourly sales rollups")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    rebuild_sales_rollups(args.date_from, args.date_to)
@@ -11,11 +11,17 @@ if __name__ == "__main__":
     logger.info(f"🔗 API Docs: http://{settings.HOST}:{settings.PORT}/api/docs")
     logger.info(f"🔗 Health check: http://{settings.HOST}:{settings.PORT}/health")
     
+    reload = settings.ENVIRONMENT == "development"
+    workers = 1 if reload else settings.WORKERS
+    if workers > 1 and not settings.SOCKETIO_MESSAGE_QUEUE:
+        logger.warning("⚠️ WORKERS > 1 without SOCKETIO_MESSAGE_QUEUE: kitchen broadcasts only reach clients of the same worker")
+    
     uvicorn.run(
         "app.main:socket_app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.ENVIRONMENT == "development",
+        reload=reload,
+        workers=workers,
         log_level=settings.LOG_LEVEL.lower()
     )
 
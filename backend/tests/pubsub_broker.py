@@ -0,0 +1,111 @@
+"""
+Local stand-in for a Redis server, pub/sub only
+
+Speaks enough of the Redis protocol (RESP2) for socketio.AsyncRedisManager:
+SUBSCRIBE, UNSUBSCRIBE, PUBLISH and PING. Any other command is answered with
+OK. Runs its own event loop in a daemon thread so worker processes started
+by a test can share it.
+
+    with PubSubBroker() as broker:
+        env["SOCKETIO_MESSAGE_QUEUE"] = broker.url
+"""
+import asyncio
+import threading
+from typing import Dict, List, Optional, Set
+
+
+def encode(value) -> bytes:
+    """RESP encoding of an int, bytes or a list of those"""
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    """Read one command (an array of bulk strings); None when the client is gone"""
+    header = await reader.readline()
+    if not header:
+        return None
+    if not header.startswith(b"*"):
+        # Inline command
+        return header.split()
+    parts = []
+    for _ in range(int(header[1:])):
+        length = int((await reader.readline())[1:])
+        parts.append((await reader.readexactly(length + 2))[:-2])
+    return parts
+
+
+class PubSubBroker:
+    def __init__(self):
+        self.port: Optional[int] = None
+        self.published = 0
+        self._channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    def __enter__(self) -> "PubSubBroker":
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._serve, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        server.close()
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                command = await read_command(reader)
+                if command is None:
+                    break
+                name = command[0].upper()
+                if name == b"SUBSCRIBE":
+                    for channel in command[1:]:
+                        subscribed.add(channel)
+                        self._channels.setdefault(channel, set()).add(writer)
+                        writer.write(encode([b"subscribe", channel, len(subscribed)]))
+                elif name == b"UNSUBSCRIBE":
+                    for channel in command[1:] or list(subscribed):
+                        subscribed.discard(channel)
+                        self._channels.get(channel, set()).discard(writer)
+                        writer.write(encode([b"unsubscribe", channel, len(subscribed)]))
+                elif name == b"PUBLISH":
+                    channel, message = command[1], command[2]
+                    receivers = list(self._channels.get(channel, ()))
+                    for receiver in receivers:
+                        receiver.write(encode([b"message", channel, message]))
+                    self.published += 1
+                    writer.write(encode(len(receivers)))
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                else:
+                    writer.write(b"+OK\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            for channel in subscribed:
+                self._channels.get(channel, set()).discard(writer)
+            writer.close()
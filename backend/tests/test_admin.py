@@ -0,0 +1,126 @@
+"""
+Admin dashboard and user directory
+"""
+from datetime import date
+from typing import List
+import pytest
+
+
+@pytest.fixture
+def admin(make_user) -> dict:
+    return make_user("admin")[1]
+
+
+def without_auth(statements: List[str]) -> List[str]:
+    """Drop the current-user lookup every authenticated request makes"""
+    return [s for s in statements if "WHERE users.id = " not in s]
+
+
+def stats(client, admin) -> dict:
+    response = client.get("/api/v1/admin/stats", headers=admin)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+def test_stats_are_one_query_cold_and_none_warm(client, db, admin, make_user, count_statements):
+    from app.models.table import Table, TableStatus
+    for _ in range(3):
+        make_user()
+    db.add_all([
+        Table(table_number="S1", capacity=2), Table(table_number="S2", capacity=4),
+        Table(table_number="S3", capacity=4, status=TableStatus.occupied)
+    ])
+    db.commit()
+    client.post("/api/v1/reservations/", json={
+        "date": date.today().isoformat(), "time": "23:00", "party_size": 2
+    }, headers=make_user()[1])
+
+    with count_statements() as cold:
+        data = stats(client, admin)
+    with count_statements() as warm:
+        assert stats(client, admin) == data
+
+    assert len(without_auth(cold)) <= 1
+    assert without_auth(warm) == []
+    assert data["totalCustomers"] == 4
+    assert data["todayReservations"] == 1
+    assert (data["availableTables"], data["occupiedTables"]) == (2, 1)
+
+    caches = client.get("/api/v1/admin/metrics", headers=admin).json()["data"]["caches"]
+    assert caches["dashboardStats"]["hits"] >= 1
+
+
+def test_writes_drop_the_cached_stats(client, admin, make_user, count_statements):
+    assert stats(client, admin)["totalCustomers"] == 0
+    make_user()
+
+    with count_statements() as statements:
+        assert stats(client, admin)["totalCustomers"] == 1
+    assert len(without_auth(statements)) == 1
+
+
+def directory(client, admin, **params) -> dict:
+    response = client.get("/api/v1/admin/users", params=params, headers=admin)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_user_directory_pages_filters_and_searches(client, admin, make_user):
+    make_user(first_name="Şükrü", last_name="Öztürk", email="sukru@example.com")
+    make_user("kitchen", first_name="Zeynep", last_name="Çelik", email="chef.zeynep@example.com")
+    for _ in range(5):
+        make_user()
+
+    seen, cursor = [], None
+    while True:
+        page = directory(client, admin, limit=3, **({"cursor": cursor} if cursor else {}))
+        seen += [user["id"] for user in page["data"]]
+        cursor = page["meta"]["nextCursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 8
+    assert "passwordHash" not in page["data"][0] and "password_hash" not in page["data"][0]
+
+    first = directory(client, admin, limit=3)["meta"]
+    assert first["roleCounts"] == {"customer": 6, "kitchen": 1, "admin": 1}
+    assert [u["firstName"] for u in directory(client, admin, role="kitchen")["data"]] == ["Zeynep"]
+    assert [u["firstName"] for u in directory(client, admin, search="sukru ozt")["data"]] == ["Şükrü"]
+    assert [u["firstName"] for u in directory(client, admin, search="chef.")["data"]] == ["Zeynep"]
+    assert directory(client, admin, search="example.com")["data"] == []
+
+    response = client.get("/api/v1/admin/users", params={"limit": 3, "cursor": "garbage"}, headers=admin)
+    assert response.status_code == 400
+
+
+def test_user_directory_search_uses_the_indexes(client, db, admin):
+    from sqlalchemy import event, text
+    from app.database import engine
+    db.execute(text("""
+        INSERT INTO users (id, email, password_hash, first_name, last_name, role, created_at, updated_at)
+        SELECT 'u' || n, 'guest' || n || '@example.com', 'x', 'Guest' || n, md5(n::text), 'customer',
+               now() - n * interval '1 minute', now()
+        FROM generate_series(1, 50000) AS n
+    """))
+    db.commit()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users"))
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "ORDER BY users.created_at DESC" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        page = directory(client, admin, limit=20, search="guest4242")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert {u["firstName"] for u in page["data"]} >= {"Guest4242"}
+
+    statement, parameters = captured[-1]
+    with engine.connect() as conn:
+        plan = "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters))
+    assert "Seq Scan on users" not in plan
+    for index in ("ix_users_email_prefix", "ix_users_first_name_trgm", "ix_users_last_name_trgm"):
+        assert index in plan
@@ -0,0 +1,110 @@
+"""
+Table availability index and whole-day grid
+"""
+import pytest
+
+DAY = "2026-11-20"
+AVAILABLE = "/api/v1/tables/available"
+
+
+@pytest.fixture
+def tables(db) -> dict:
+    from app.models.table import Table
+    tables = [Table(table_number=f"A{i}", capacity=4) for i in range(1, 4)]
+    db.add_all(tables)
+    db.commit()
+    return {t.table_number: str(t.id) for t in tables}
+
+
+def available(client, at: str) -> list:
+    response = client.get(AVAILABLE, params={"date": DAY, "time": at, "party_size": 2})
+    assert response.status_code == 200
+    return sorted(t["tableNumber"] for t in response.json()["data"])
+
+
+def reservation_reads(statements: list) -> list:
+    return [s for s in statements if "FROM reservations" in s]
+
+
+def test_warm_day_is_answered_from_the_index(client, tables, count_statements):
+    with count_statements() as cold:
+        available(client, "19:00")
+    with count_statements() as warm:
+        available(client, "21:30")
+
+    assert len(reservation_reads(cold)) == 1
+    assert reservation_reads(warm) == []
+
+
+def test_bookings_update_the_index_in_place(client, make_user, tables, count_statements):
+    assert available(client, "19:00") == ["A1", "A2", "A3"]
+    response = client.post("/api/v1/reservations/", json={
+        "date": DAY, "time": "19:00", "party_size": 2, "table_id": tables["A2"]
+    }, headers=make_user()[1])
+    assert response.status_code == 201
+
+    with count_statements() as statements:
+        assert available(client, "20:30") == ["A1", "A3"]
+        assert available(client, "21:00") == ["A1", "A2", "A3"]
+    assert reservation_reads(statements) == []
+
+
+def test_cancelled_booking_frees_the_table(client, make_user, tables):
+    response = client.post("/api/v1/reservations/", json={
+        "date": DAY, "time": "19:00", "party_size": 2, "table_id": tables["A1"]
+    }, headers=make_user()[1])
+    assert available(client, "19:00") == ["A2", "A3"]
+
+    admin = make_user("admin")[1]
+    client.patch(f"/api/v1/reservations/{response.json()['id']}", json={"status": "cancelled"}, headers=admin)
+    assert available(client, "19:00") == ["A1", "A2", "A3"]
+
+
+def brute_force_grid(table_ids, intervals, open_min, close_min, slot_minutes, duration):
+    """Slot-by-slot overlap check of every booking"""
+    grid = []
+    for table_id in table_ids:
+        row = []
+        for slot_start in range(open_min, close_min - slot_minutes + 1, slot_minutes):
+            row.append(all(
+                not (start < slot_start + duration and end > slot_start)
+                for start, end in intervals.get(table_id, ())
+            ))
+        grid.append(row)
+    return grid
+
+
+def test_slot_grid_matches_brute_force():
+    import random
+    import time
+    from app.services.availability import slot_grid
+    rng = random.Random(7)
+    table_ids = [f"t{i}" for i in range(200)]
+    intervals = {}
+    for _ in range(2000):
+        start = rng.randrange(10 * 60, 24 * 60, 15)
+        intervals.setdefault(rng.choice(table_ids), []).append((start, start + rng.choice([60, 90, 120, 180])))
+
+    started = time.perf_counter()
+    grid = slot_grid(table_ids, intervals, 12 * 60, 24 * 60, 15, 120)
+    elapsed = time.perf_counter() - started
+
+    assert grid.shape == (200, 48)
+    assert grid.tolist() == brute_force_grid(table_ids, intervals, 12 * 60, 24 * 60, 15, 120)
+    assert elapsed < 0.05
+
+
+def test_availability_grid_endpoint(client, make_user, tables):
+    client.post("/api/v1/reservations/", json={
+        "date": DAY, "time": "19:00", "party_size": 2, "table_id": tables["A1"]
+    }, headers=make_user()[1])
+    response = client.get("/api/v1/tables/availability-grid", params={"date": DAY, "slot_minutes": 30})
+    assert response.status_code == 200
+    data = response.json()["data"]
+
+    rows = {t["tableNumber"]: t["available"] for t in data["tables"]}
+    slot_19 = data["slots"].index("19:00")
+    # A 2 hour booking starting 17:30 to 20:30 would overlap 19:00-21:00
+    assert [rows["A1"][slot_19 + i] for i in range(-4, 5)] == [True, False, False, False, False, False, False, False, True]
+    assert all(rows["A2"][slot_19 - 4:slot_19 + 5])
+    assert data["availableCounts"][slot_19] == 2
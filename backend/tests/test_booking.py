@@ -0,0 +1,81 @@
+"""
+Double-booking protection
+"""
+from datetime import date, time
+import uuid
+import pytest
+from sqlalchemy.exc import IntegrityError
+from conftest import run_concurrently
+
+DAY = date(2026, 11, 20)
+
+
+@pytest.fixture
+def table_id(db) -> str:
+    from app.models.table import Table
+    table = Table(table_number="B1", capacity=4)
+    db.add(table)
+    db.commit()
+    return str(table.id)
+
+
+def reservation(user_id: str, table_id: str, start: time, end: time = None, **fields):
+    from app.models.reservation import Reservation
+    return Reservation(
+        user_id=user_id, table_id=table_id, date=DAY, time=start, end_time=end, party_size=2,
+        confirmation_number=f"RES-{uuid.uuid4().hex[:8].upper()}", **fields
+    )
+
+
+def test_database_rejects_overlapping_confirmed_bookings(db, make_user, table_id):
+    guest = make_user()[0]
+    db.add(reservation(guest.id, table_id, time(19, 0)))
+    db.commit()
+
+    db.add(reservation(guest.id, table_id, time(20, 0)))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+
+def test_database_allows_adjacent_and_cancelled_bookings(db, make_user, table_id):
+    from app.models.reservation import ReservationStatus
+    guest = make_user()[0]
+    db.add(reservation(guest.id, table_id, time(19, 0), time(21, 0)))
+    db.add(reservation(guest.id, table_id, time(21, 0), time(23, 0)))
+    db.add(reservation(guest.id, table_id, time(20, 0), status=ReservationStatus.cancelled))
+    db.commit()
+
+
+def test_one_of_many_simultaneous_overlapping_bookings_wins(client, db, make_user, table_id):
+    from app.models.reservation import Reservation
+    guests = [make_user()[1] for _ in range(10)]
+    # Every request overlaps every other one
+    starts = ["19:00", "19:15", "19:30", "19:45", "20:00"] * 2
+
+    responses = run_concurrently([
+        lambda headers=headers, start=start: client.post("/api/v1/reservations/", json={
+            "date": DAY.isoformat(), "time": start, "party_size": 2, "table_id": table_id
+        }, headers=headers)
+        for headers, start in zip(guests, starts)
+    ])
+
+    assert sorted(r.status_code for r in responses) == [201] + [409] * 9
+    assert db.query(Reservation).count() == 1
+
+
+def test_simultaneous_bookings_of_different_tables_all_succeed(client, db, make_user):
+    from app.models.table import Table
+    tables = [Table(table_number=f"C{i}", capacity=4) for i in range(6)]
+    db.add_all(tables)
+    db.commit()
+    headers = make_user()[1]
+
+    responses = run_concurrently([
+        lambda table=table: client.post("/api/v1/reservations/", json={
+            "date": DAY.isoformat(), "time": "19:00", "party_size": 2, "table_id": str(table.id)
+        }, headers=headers)
+        for table in tables
+    ])
+
+    assert [r.status_code for r in responses] == [201] * 6
@@ -0,0 +1,144 @@
+"""
+Reservation calendar snapshots and deltas
+"""
+from datetime import date, time
+import pytest
+
+pytestmark = pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+
+DAY = "2026-11-20"
+CALENDAR = "/api/v1/reservations/calendar/by-date"
+
+
+@pytest.fixture
+def staff(make_user):
+    return make_user("server")[1]
+
+
+@pytest.fixture
+def book(client, make_user):
+    """Book a reservation on DAY through the API and return its id"""
+    headers = make_user()[1]
+
+    def book(at: str = "19:00") -> str:
+        response = client.post("/api/v1/reservations/", json={
+            "date": DAY, "time": at, "party_size": 2
+        }, headers=headers)
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    return book
+
+
+def test_calendar_statement_count_is_constant(client, staff, book, count_statements):
+    book()
+    with count_statements() as few:
+        assert client.get(CALENDAR, params={"date": DAY}, headers=staff).status_code == 200
+    with count_statements() as few_delta:
+        client.get(CALENDAR, params={"date": DAY, "since": 0}, headers=staff)
+
+    for _ in range(20):
+        book()
+    with count_statements() as many:
+        response = client.get(CALENDAR, params={"date": DAY}, headers=staff)
+    with count_statements() as many_delta:
+        client.get(CALENDAR, params={"date": DAY, "since": 0}, headers=staff)
+
+    assert len(response.json()["data"]["reservations"]) == 21
+    assert len(many) == len(few)
+    assert len(many_delta) == len(few_delta)
+
+
+def test_unchanged_day_returns_304(client, staff, book):
+    book()
+    etag = client.get(CALENDAR, params={"date": DAY}, headers=staff).headers["ETag"]
+    response = client.get(CALENDAR, params={"date": DAY}, headers={**staff, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    book("20:00")
+    response = client.get(CALENDAR, params={"date": DAY}, headers={**staff, "If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_recent_changes_are_sent_again(client, staff, book, monkeypatch):
+    from app.config import settings
+    reservation_id = book()
+
+    monkeypatch.setattr(settings, "CALENDAR_VERSION_LAG_SECONDS", 60)
+    version = client.get(CALENDAR, params={"date": DAY}, headers=staff).json()["data"]["version"]
+    delta = client.get(CALENDAR, params={"date": DAY, "since": version}, headers=staff).json()["data"]
+    assert [r["id"] for r in delta["reservations"]] == [reservation_id]
+    assert delta["version"] == version
+
+    monkeypatch.setattr(settings, "CALENDAR_VERSION_LAG_SECONDS", 0)
+    version = client.get(CALENDAR, params={"date": DAY}, headers=staff).json()["data"]["version"]
+    delta = client.get(CALENDAR, params={"date": DAY, "since": version}, headers=staff).json()["data"]
+    assert delta["reservations"] == []
+
+
+def test_late_commit_is_not_skipped(client, staff, book, make_user):
+    """A version taken before one already visible but committed after it"""
+    from app.database import SessionLocal
+    from app.models.reservation import Reservation
+
+    guest = make_user()[0]
+    slow = SessionLocal()
+    try:
+        late = Reservation(user_id=guest.id, date=date.fromisoformat(DAY), time=time(18, 0),
+                           party_size=4, confirmation_number="RES-SLOW0001")
+        slow.add(late)
+        slow.flush()
+        late_version = late.change_version
+
+        book()
+        version = client.get(CALENDAR, params={"date": DAY}, headers=staff).json()["data"]["version"]
+        assert version < late_version
+
+        slow.commit()
+        delta = client.get(CALENDAR, params={"date": DAY, "since": version}, headers=staff).json()["data"]
+        assert late.id in [r["id"] for r in delta["reservations"]]
+    finally:
+        slow.close()
+
+
+def test_moved_reservation_is_reported_deleted(client, staff, book, make_user):
+    reservation_id = book()
+    admin = make_user("admin")[1]
+    response = client.patch(f"/api/v1/reservations/{reservation_id}", json={"date": "2026-11-21"}, headers=admin)
+    assert response.status_code == 200
+
+    delta = client.get(CALENDAR, params={"date": DAY, "since": 0}, headers=staff).json()["data"]
+    assert delta["reservations"] == []
+    assert delta["deletedIds"] == [reservation_id]
+
+
+def test_deleted_users_and_tables_reach_the_delta(client, db, staff, make_user):
+    from sqlalchemy import text
+    from app.models.reservation import Reservation
+    from app.models.table import Table
+    table = Table(table_number="C1", capacity=4)
+    guests = [make_user()[0] for _ in range(3)]
+    db.add(table)
+    db.flush()
+    reservations = [
+        Reservation(user_id=guest.id, table_id=table.id if i == 0 else None, date=date(2026, 11, 20),
+                    time=time(19 + i, 0), party_size=2, confirmation_number=f"RES-CASCADE{i}")
+        for i, guest in enumerate(guests)
+    ]
+    db.add_all(reservations)
+    db.commit()
+    ids = [r.id for r in reservations]
+    since = db.execute(text("SELECT last_value FROM reservation_change_seq")).scalar()
+
+    admin = make_user("admin")[1]
+    assert client.delete(f"/api/v1/tables/{table.id}", headers=admin).status_code == 204
+    delta = client.get(CALENDAR, params={"date": DAY, "since": since}, headers=staff).json()["data"]
+    assert [(r["id"], r["tableId"]) for r in delta["reservations"]] == [(ids[0], None)]
+
+    # Through the ORM cascade and through ON DELETE CASCADE
+    db.delete(guests[1])
+    db.commit()
+    db.execute(text("DELETE FROM users WHERE id = :id"), {"id": guests[2].id})
+    db.commit()
+    delta = client.get(CALENDAR, params={"date": DAY, "since": since}, headers=staff).json()["data"]
+    assert delta["deletedIds"] == sorted(ids[1:])
@@ -0,0 +1,93 @@
+"""
+Streaming exports
+"""
+import csv
+import io
+import json
+import os
+import threading
+import time
+import pytest
+from sqlalchemy import text
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def resident_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+
+@pytest.fixture
+def admin(make_user) -> dict:
+    return make_user("admin")[1]
+
+
+def test_exports_filter_by_date_and_format(client, db, admin, make_user):
+    from app.models.reservation import Reservation
+    guest = make_user(first_name="Ayşe")[0]
+    for day, number in [("2026-11-19", "RES-A"), ("2026-11-20", "RES-B"), ("2026-11-21", "RES-C")]:
+        db.add(Reservation(user_id=guest.id, date=day, time="19:00", party_size=2, confirmation_number=number))
+    db.commit()
+    params = {"date_from": "2026-11-20", "date_to": "2026-11-21"}
+
+    response = client.get("/api/v1/admin/export/reservations", params=params, headers=admin)
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="reservations_2026-11-20_2026-11-21.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["confirmation_number"] for row in rows] == ["RES-B", "RES-C"]
+    assert rows[0]["customer_first_name"] == "Ayşe"
+
+    response = client.get("/api/v1/admin/export/reservations", params={**params, "format": "ndjson"}, headers=admin)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["date"], row["status"]) for row in rows] == [("2026-11-20", "confirmed"), ("2026-11-21", "confirmed")]
+
+    bad_range = {"date_from": "2026-11-21", "date_to": "2026-11-20"}
+    assert client.get("/api/v1/admin/export/reservations", params=bad_range, headers=admin).status_code == 400
+
+
+@pytest.mark.slow
+def test_exporting_a_million_rows_keeps_memory_flat(live_server, db, admin, make_menu_items):
+    """One million order items are streamed through a real server while the process RSS is sampled"""
+    requests = pytest.importorskip("requests")
+    menu_item_id = make_menu_items()[0]
+    db.execute(text("""
+        INSERT INTO orders (id, order_number, status, order_time, subtotal, total_amount, created_at, updated_at)
+        SELECT 'o' || n, 'ORD-' || n, 'served', now() - n * interval '1 minute', 40, 40, now(), now()
+        FROM generate_series(1, 250000) AS n
+    """))
+    db.execute(text("""
+        INSERT INTO order_items (id, order_id, menu_item_id, quantity, price_at_order, special_notes, created_at)
+        SELECT 'i' || n || '-' || k, 'o' || n, :menu_item_id, k, 10, 'no onions, extra sauce', now()
+        FROM generate_series(1, 250000) AS n, generate_series(1, 4) AS k
+    """), {"menu_item_id": menu_item_id})
+    db.commit()
+    db.execute(text("ANALYZE"))
+
+    peak = 0
+    sampling = True
+
+    def sample() -> None:
+        nonlocal peak
+        while sampling:
+            peak = max(peak, resident_bytes())
+            time.sleep(0.01)
+
+    sampler = threading.Thread(target=sample)
+    lines = 0
+    with requests.get(f"{live_server}/api/v1/admin/export/order-items", headers=admin, stream=True) as response:
+        assert response.status_code == 200
+        chunks = response.iter_lines(chunk_size=64 * 1024)
+        header = next(chunks)
+        assert header.startswith(b"id,order_id,order_number")
+        baseline = resident_bytes()
+        sampler.start()
+        for _ in chunks:
+            lines += 1
+    sampling = False
+    sampler.join()
+
+    assert lines == 1000000
+    growth = peak - baseline
+    print(f"\n1M row export: RSS grew {growth / 2 ** 20:.1f} MiB")
+    assert growth < 64 * 2 ** 20
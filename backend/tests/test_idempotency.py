@@ -0,0 +1,122 @@
+"""
+Idempotency-Key retries and key expiry
+"""
+from datetime import datetime, timedelta
+import pytest
+from conftest import run_concurrently
+
+
+def test_concurrent_retries_create_one_order(client, db, make_user, make_menu_items):
+    from app.models.order import Order
+    headers = {**make_user("server")[1], "Idempotency-Key": "order-attempt-1"}
+    body = {"items": [{"menu_item_id": make_menu_items()[0], "quantity": 2}]}
+
+    responses = run_concurrently([
+        lambda: client.post("/api/v1/orders/", json=body, headers=headers) for _ in range(8)
+    ])
+
+    assert {r.status_code for r in responses} == {201}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 7
+    assert db.query(Order).count() == 1
+
+
+def test_concurrent_retries_create_one_reservation(client, db, make_user):
+    from app.models.reservation import Reservation
+    headers = {**make_user()[1], "Idempotency-Key": "booking-attempt-1"}
+    body = {"date": "2026-11-20", "time": "19:00", "party_size": 2}
+
+    responses = run_concurrently([
+        lambda: client.post("/api/v1/reservations/", json=body, headers=headers) for _ in range(8)
+    ])
+
+    assert {r.status_code for r in responses} == {201}
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert db.query(Reservation).count() == 1
+
+
+def test_key_reused_with_another_body_is_rejected(client, make_user):
+    headers = {**make_user()[1], "Idempotency-Key": "booking-attempt-1"}
+    body = {"date": "2026-11-20", "time": "19:00", "party_size": 2}
+    assert client.post("/api/v1/reservations/", json=body, headers=headers).status_code == 201
+    response = client.post("/api/v1/reservations/", json={**body, "party_size": 3}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_purge_deletes_only_expired_keys(db, make_user):
+    from app.config import settings
+    from app.models.idempotency import IdempotencyKey
+    from app.services.idempotency import purge_expired_keys
+    user = make_user()[0]
+    expired = datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS, minutes=1)
+    db.add_all([
+        IdempotencyKey(user_id=user.id, scope="POST /orders", key="old", request_hash="x", created_at=expired),
+        IdempotencyKey(user_id=user.id, scope="POST /orders", key="new", request_hash="x"),
+    ])
+    db.commit()
+
+    assert purge_expired_keys(db) == 1
+    assert [k.key for k in db.query(IdempotencyKey).all()] == ["new"]
+
+
+def test_claim_survives_a_conflicting_key_that_disappears(db, make_user, monkeypatch):
+    from fastapi import HTTPException
+    from app.database import SessionLocal
+    from app.models.idempotency import IdempotencyKey
+    from app.schemas.order import OrderCreate
+    from app.services import idempotency
+    user = make_user()[0]
+    payload = OrderCreate(items=[])
+
+    def hold_key() -> None:
+        other = SessionLocal()
+        other.add(IdempotencyKey(user_id=user.id, scope="POST /orders", key="k", request_hash="x"))
+        other.commit()
+        other.close()
+
+    # Not seen before the insert, then purged before it is read back
+    hold_key()
+    lookups = []
+    real_find_key = idempotency._find_key
+
+    def find_key(*args):
+        lookups.append(args)
+        if len(lookups) == 2:
+            db.query(IdempotencyKey).delete()
+            db.commit()
+        return real_find_key(*args) if len(lookups) > 2 else None
+
+    monkeypatch.setattr(idempotency, "_find_key", find_key)
+    record = idempotency.claim_idempotency_key(db, user.id, "POST /orders", "k", payload)
+    assert isinstance(record, IdempotencyKey)
+    db.rollback()
+
+    # Never readable: gives up with a 409
+    hold_key()
+    monkeypatch.setattr(idempotency, "_find_key", lambda *args: None)
+    with pytest.raises(HTTPException) as error:
+        idempotency.claim_idempotency_key(db, user.id, "POST /orders", "k", payload)
+    assert error.value.status_code == 409
+
+
+def test_purger_runs_on_its_own_schedule(db, make_user, monkeypatch):
+    import asyncio
+    from app.config import settings
+    from app.models.idempotency import IdempotencyKey
+    from app.services.idempotency import run_key_purger
+    user = make_user()[0]
+    expired = datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS, minutes=1)
+    db.add(IdempotencyKey(user_id=user.id, scope="POST /orders", key="old", request_hash="x", created_at=expired))
+    db.commit()
+
+    assert settings.ORDER_ARCHIVE_INTERVAL_MINUTES == 0
+    monkeypatch.setattr(settings, "IDEMPOTENCY_PURGE_INTERVAL_MINUTES", 0.001)
+
+    async def run_briefly() -> None:
+        task = asyncio.create_task(run_key_purger())
+        await asyncio.sleep(0.5)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+    db.expire_all()
+    assert db.query(IdempotencyKey).count() == 0
@@ -0,0 +1,119 @@
+"""
+Kitchen ticket scheduler
+"""
+from datetime import datetime, timedelta
+import random
+import time
+from app.models.order import OrderStatus
+from app.services.kitchen_scheduler import PLAN_LIMIT, KitchenScheduler, Ticket
+
+OPEN = datetime(2026, 11, 20, 19, 0)
+
+
+def ticket(order_id: str, minutes_in: int, prep_minutes: int) -> Ticket:
+    return Ticket(order_id, order_id.upper(), OPEN + timedelta(minutes=minutes_in), prep_minutes)
+
+
+def test_longest_prep_is_fired_first():
+    scheduler = KitchenScheduler(stations=1)
+    scheduler.add_ticket(ticket("salad", 0, 5))
+    scheduler.add_ticket(ticket("steak", 2, 18))
+
+    snapshot = scheduler.snapshot(now=OPEN + timedelta(minutes=2))
+    assert [t["orderId"] for t in snapshot["fireNext"]] == ["steak", "salad"]
+    etas = {t["orderId"]: t["estimatedReadyAt"] for t in snapshot["tickets"]}
+    assert etas == {
+        "steak": (OPEN + timedelta(minutes=20)).isoformat(),
+        "salad": (OPEN + timedelta(minutes=25)).isoformat()
+    }
+
+
+def test_cooking_tickets_hold_their_station():
+    scheduler = KitchenScheduler(stations=2)
+    for order_id, prep in [("a", 10), ("b", 10), ("c", 10)]:
+        scheduler.add_ticket(ticket(order_id, 0, prep))
+    scheduler.order_status_changed("a", OrderStatus.preparing, OPEN)
+    scheduler.order_status_changed("b", OrderStatus.preparing, OPEN + timedelta(minutes=4))
+
+    tickets = {t["orderId"]: t for t in scheduler.snapshot(now=OPEN + timedelta(minutes=5))["tickets"]}
+    assert tickets["a"]["status"] == "PREPARING"
+    assert tickets["c"]["startAt"] == (OPEN + timedelta(minutes=10)).isoformat()
+
+    # Sent back to waiting, then finished
+    scheduler.order_status_changed("b", OrderStatus.pending)
+    scheduler.order_status_changed("a", OrderStatus.ready)
+    snapshot = scheduler.snapshot(now=OPEN + timedelta(minutes=5))
+    assert sorted(t["orderId"] for t in snapshot["fireNext"]) == ["b", "c"]
+    assert "a" not in [t["orderId"] for t in snapshot["tickets"]]
+
+
+def test_rush_of_300_covers_an_hour():
+    """About 100 tables of three in an hour on eight stations, run minute by minute"""
+    rng = random.Random(5)
+    stations = 8
+    scheduler = KitchenScheduler(stations)
+    arrivals = sorted((rng.randrange(0, 60), f"o{i}") for i in range(100))
+    cooking = {}
+    event_seconds = []
+
+    def timed(call, *args):
+        started = time.perf_counter()
+        call(*args)
+        event_seconds.append(time.perf_counter() - started)
+
+    run_started = time.perf_counter()
+    for minute in range(0, 240):
+        now = OPEN + timedelta(minutes=minute)
+        for order_id, done_at in list(cooking.items()):
+            if done_at <= now:
+                del cooking[order_id]
+                timed(scheduler.order_status_changed, order_id, OrderStatus.ready, now)
+        while arrivals and arrivals[0][0] == minute:
+            order_id = arrivals.pop(0)[1]
+            timed(scheduler.add_ticket, ticket(order_id, minute, rng.choice([6, 9, 12, 15, 18])))
+
+        snapshot = scheduler.snapshot(now=now, fire_next=stations - len(cooking))
+        waiting = sorted(scheduler._waiting.values(), key=lambda t: (t.fire_by, t.order_id))
+        assert [t["orderId"] for t in snapshot["fireNext"]] == [t.order_id for t in waiting[:stations - len(cooking)]]
+        assert len(scheduler._heap) <= 2 * len(scheduler._waiting) + 16
+
+        # Free stations are planned to start their next ticket right away
+        starts = {t["orderId"]: t["startAt"] for t in snapshot["tickets"]}
+        for fired in snapshot["fireNext"]:
+            assert starts[fired["orderId"]] == now.isoformat()
+            timed(scheduler.order_status_changed, fired["orderId"], OrderStatus.preparing, now)
+            cooking[fired["orderId"]] = now + timedelta(minutes=fired["prepMinutes"])
+
+    assert not scheduler._waiting and not scheduler._cooking
+    assert len(event_seconds) >= 300
+    assert max(event_seconds) < 0.005
+    assert time.perf_counter() - run_started < 5
+
+
+def test_events_stay_cheap_with_a_long_backlog():
+    """Every event is followed by a snapshot, as the order routes do"""
+    rng = random.Random(7)
+    scheduler = KitchenScheduler(stations=8)
+    for i in range(20000):
+        scheduler.add_ticket(ticket(f"b{i}", rng.randrange(0, 180), rng.choice([6, 9, 12, 15, 18])))
+    event_seconds = []
+    now = OPEN + timedelta(minutes=30)
+
+    for i in range(500):
+        order_id = rng.choice(list(scheduler._waiting)[:200])
+        started = time.perf_counter()
+        if i % 3 == 0:
+            scheduler.add_ticket(ticket(f"n{i}", rng.randrange(0, 180), rng.choice([6, 9, 12])))
+        else:
+            status = OrderStatus.preparing if i % 3 == 1 else OrderStatus.cancelled
+            scheduler.order_status_changed(order_id, status, now)
+        snapshot = scheduler.snapshot(now=now, fire_next=3)
+        event_seconds.append(time.perf_counter() - started)
+
+    waiting = sorted(scheduler._waiting.values(), key=lambda t: (t.fire_by, t.order_id))
+    assert snapshot["waiting"] == len(waiting)
+    assert [t["orderId"] for t in snapshot["fireNext"]] == [t.order_id for t in waiting[:3]]
+    planned = [t["orderId"] for t in snapshot["tickets"] if t["status"] == "PENDING"]
+    assert planned == [t.order_id for t in waiting[:PLAN_LIMIT]]
+    # 99th percentile, so a garbage collection pause does not fail the run
+    assert sorted(event_seconds)[-5] < 0.005
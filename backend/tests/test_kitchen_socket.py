@@ -0,0 +1,151 @@
+"""
+Kitchen Socket.IO feed
+
+Events are emitted on the live server's own loop and received with a
+polling Socket.IO client.
+"""
+import time
+from typing import Callable, List, Tuple
+import pytest
+
+# The sync Socket.IO client polls over requests (see requirements.txt)
+requests = pytest.importorskip("requests")
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for socket frames")
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def kitchen(live_server, app):
+    """Frames received by a client in the kitchen room"""
+    import socketio
+    frames: List[Tuple[str, dict]] = []
+    client = socketio.Client()
+    client.on("*", lambda event, data=None: frames.append((event, data)))
+    client.connect(live_server, transports=["polling"])
+    client.emit("join_kitchen")
+    wait_for(lambda: any(event == "joined_kitchen" for event, _ in frames))
+    yield frames
+    client.disconnect()
+
+
+@pytest.fixture
+def staff(make_user) -> dict:
+    return {"server": make_user("server")[1], "kitchen": make_user("kitchen")[1]}
+
+
+def create_order(live_server, staff, menu_item_id: str) -> str:
+    response = requests.post(f"{live_server}/api/v1/orders/", json={
+        "items": [{"menu_item_id": menu_item_id, "quantity": 1}]
+    }, headers=staff["server"])
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def set_status(live_server, staff, order_id: str, status: str) -> None:
+    response = requests.patch(f"{live_server}/api/v1/orders/{order_id}/status", json={
+        "status": status
+    }, headers=staff["kitchen"])
+    assert response.status_code == 200
+
+
+def test_order_events_carry_a_sequence(live_server, kitchen, staff, make_menu_items):
+    order_id = create_order(live_server, staff, make_menu_items()[0])
+    set_status(live_server, staff, order_id, "preparing")
+    wait_for(lambda: sum(event == "order-updated" for event, _ in kitchen) == 1)
+
+    sequenced = [(event, data) for event, data in kitchen if event in ("new-order", "order-updated")]
+    assert [event for event, _ in sequenced] == ["new-order", "order-updated"]
+    new_order, update = sequenced[0][1], sequenced[1][1]
+    assert new_order["id"] == update["orderId"] == order_id
+    assert update["seq"] == new_order["seq"] + 1
+    assert update["source"] == new_order["source"]
+    assert (update["previousStatus"], update["status"]) == ("PENDING", "PREPARING")
+
+    # Schedules are full snapshots and are not sequenced
+    schedules = [data for event, data in kitchen if event == "kitchen-schedule"]
+    assert schedules and all("seq" not in data for data in schedules)
+
+
+def test_rush_is_coalesced_into_kitchen_batches(live_server, kitchen, staff, make_menu_items, monkeypatch):
+    from app.realtime import coalescer
+    monkeypatch.setattr(coalescer, "window", 0.5)
+    menu_item_id = make_menu_items()[0]
+
+    first = create_order(live_server, staff, menu_item_id)
+    second = create_order(live_server, staff, menu_item_id)
+    set_status(live_server, staff, first, "preparing")
+    set_status(live_server, staff, first, "ready")
+    wait_for(lambda: any(event == "kitchen-batch" for event, _ in kitchen))
+    time.sleep(0.6)
+
+    batches = [data for event, data in kitchen if event == "kitchen-batch"]
+    assert len(batches) == 1
+    assert not [event for event, _ in kitchen if event in ("new-order", "order-updated", "kitchen-schedule")]
+    events = batches[0]["events"]
+    new_orders = {e["data"]["id"]: e["data"]["status"] for e in events if e["event"] == "new-order"}
+    # The first order's updates are folded into its new-order event
+    assert new_orders == {first: "READY", second: "PENDING"}
+    assert sum(e["event"] == "kitchen-schedule" for e in events) == 1
+    assert "seq" in batches[0] and "source" in batches[0]
+
+
+def test_fifty_kitchen_clients_during_a_rush(live_server, app, staff, make_user, make_menu_items, monkeypatch):
+    """Every client ends up with the latest state of every order, in fewer frames than events"""
+    import socketio
+    from app.realtime import coalescer
+    monkeypatch.setattr(coalescer, "window", 0.1)
+    admin = make_user("admin")[1]
+    menu_item_id = make_menu_items()[0]
+
+    def metrics() -> dict:
+        return requests.get(f"{live_server}/api/v1/admin/metrics", headers=admin).json()["data"]["realtime"]
+
+    clients, frames = [], []
+    try:
+        for _ in range(50):
+            received = []
+            client = socketio.Client()
+            client.on("kitchen-batch", lambda data, received=received: received.append(data))
+            client.connect(live_server, transports=["polling"])
+            client.emit("join_kitchen")
+            clients.append(client)
+            frames.append(received)
+        time.sleep(0.5)
+        before = metrics()
+
+        orders = [create_order(live_server, staff, menu_item_id) for _ in range(20)]
+        for order_id in orders:
+            set_status(live_server, staff, order_id, "preparing")
+        for order_id in orders[:10]:
+            set_status(live_server, staff, order_id, "ready")
+
+        def latest_states(received: list) -> dict:
+            states = {}
+            for batch in sorted(received, key=lambda b: b["seq"]):
+                for e in batch["events"]:
+                    if e["event"] == "new-order":
+                        states[e["data"]["id"]] = e["data"]["status"]
+                    elif e["event"] == "order-updated":
+                        states[e["data"]["orderId"]] = e["data"]["status"]
+            return states
+
+        expected = {order_id: "READY" if i < 10 else "PREPARING" for i, order_id in enumerate(orders)}
+        wait_for(lambda: all(latest_states(received) == expected for received in frames), timeout=20)
+        after = metrics()
+    finally:
+        for client in clients:
+            client.disconnect()
+
+    events_in = after["eventsIn"] - before["eventsIn"]
+    frames_out = after["framesOut"] - before["framesOut"]
+    # Each order write emits its own event plus a schedule snapshot
+    assert events_in == 2 * (20 + 20 + 10)
+    assert frames_out < events_in / 2
+    assert all(len(received) == frames_out for received in frames)
+    print(f"\n50 clients: {events_in} events in, {frames_out} frames out each ({events_in / frames_out:.1f}x)")
@@ -0,0 +1,60 @@
+"""
+Occupancy ledger and table analytics
+"""
+import pytest
+
+DAY = "2026-11-20"
+
+
+@pytest.fixture
+def tables(db) -> dict:
+    from app.models.table import Table
+    tables = [Table(table_number="O1", capacity=2), Table(table_number="O2", capacity=6)]
+    db.add_all(tables)
+    db.commit()
+    return {t.table_number: str(t.id) for t in tables}
+
+
+def ledger(db) -> list:
+    from app.models.occupancy import OccupancySlot
+    db.expire_all()
+    return sorted(
+        (str(row.date), row.slot, row.table_id, row.reservation_id)
+        for row in db.query(OccupancySlot).all()
+    )
+
+
+def test_ledger_follows_reservation_writes(client, db, make_user, tables):
+    guest, admin = make_user()[1], make_user("admin")[1]
+    first = client.post("/api/v1/reservations/", json={
+        "date": DAY, "time": "19:00", "end_time": "20:30", "party_size": 2, "table_id": tables["O1"]
+    }, headers=guest).json()["id"]
+    second = client.post("/api/v1/reservations/", json={
+        "date": DAY, "time": "19:30", "party_size": 5, "table_id": tables["O2"]
+    }, headers=guest).json()["id"]
+
+    slots = client.get("/api/v1/admin/occupancy", params={"date": DAY}, headers=admin).json()["data"]["slots"]
+    by_time = {s["time"]: (s["occupiedTables"], s["occupiedSeats"]) for s in slots}
+    assert by_time["19:00"] == (1, 2)
+    assert by_time["20:00"] == (2, 8)
+    assert by_time["21:00"] == (1, 6)
+    assert "21:30" not in by_time
+
+    client.patch(f"/api/v1/reservations/{second}", json={"time": "21:00"}, headers=admin)
+    client.patch(f"/api/v1/reservations/{first}", json={"status": "cancelled"}, headers=admin)
+    assert {row[3] for row in ledger(db)} == {second}
+    assert min(row[1] for row in ledger(db)) == 21 * 60
+
+
+def test_rebuild_reproduces_the_ledger(client, db, make_user, tables):
+    from app.services.occupancy import rebuild_ledger
+    guest = make_user()[1]
+    for at, end, table in [("12:10", "13:05", "O1"), ("22:30", "01:00", "O2"), ("18:00", None, "O1")]:
+        client.post("/api/v1/reservations/", json={
+            "date": DAY, "time": at, "end_time": end, "party_size": 2, "table_id": tables[table]
+        }, headers=guest)
+    written = ledger(db)
+
+    rebuild_ledger(db)
+    db.commit()
+    assert ledger(db) == written
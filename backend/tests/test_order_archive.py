@@ -0,0 +1,81 @@
+"""
+Order archival
+"""
+import time
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def staff(make_user) -> dict:
+    return {role: make_user(role)[1] for role in ("admin", "server")}
+
+
+def place_order(client, staff, menu_item_id: str, status: str = None, age_days: int = 0, db=None) -> str:
+    response = client.post("/api/v1/orders/", json={
+        "items": [{"menu_item_id": menu_item_id, "quantity": 2}]
+    }, headers=staff["server"])
+    order_id = response.json()["id"]
+    if status or age_days:
+        db.execute(text("""
+            UPDATE orders SET status = COALESCE(:status, status), order_time = now() - :age * interval '1 day'
+            WHERE id = :id
+        """), {"status": status, "age": age_days, "id": order_id})
+        db.commit()
+    return order_id
+
+
+def test_only_old_finished_orders_are_archived(client, db, staff, make_menu_items):
+    from app.services.order_archive import archive_orders
+    menu_item_id = make_menu_items()[0]
+    old_served = place_order(client, staff, menu_item_id, "served", 40, db)
+    old_cancelled = place_order(client, staff, menu_item_id, "cancelled", 40, db)
+    old_pending = place_order(client, staff, menu_item_id, None, 40, db)
+    new_served = place_order(client, staff, menu_item_id, "served", 1, db)
+
+    assert archive_orders(db, older_than_days=30, batch_size=1) == 2
+
+    hot = set(db.execute(text("SELECT id FROM orders")).scalars())
+    archived = set(db.execute(text("SELECT id FROM orders_archive")).scalars())
+    assert hot == {old_pending, new_served}
+    assert archived == {old_served, old_cancelled}
+    assert db.execute(text("SELECT count(*) FROM order_items_archive")).scalar() == 2
+
+    listed = client.get("/api/v1/orders/", headers=staff["admin"]).json()
+    assert {o["id"] for o in listed} == hot
+    listed = client.get("/api/v1/orders/", params={"include_archived": True}, headers=staff["admin"]).json()
+    assert {o["id"] for o in listed} == hot | archived
+    assert client.get(f"/api/v1/orders/{old_served}", headers=staff["admin"]).status_code == 404
+    order = client.get(f"/api/v1/orders/{old_served}", params={"include_archived": True}, headers=staff["admin"]).json()
+    assert order["order_items"][0]["quantity"] == 2
+
+
+@pytest.mark.slow
+def test_archiving_a_year_of_history(db, make_menu_items):
+    """About 200k finished orders with three items each"""
+    from app.services.order_archive import archive_orders
+    menu_item_id = make_menu_items()[0]
+    db.execute(text("""
+        INSERT INTO orders (id, order_number, status, order_time, subtotal, total_amount, created_at, updated_at)
+        SELECT 'o' || n, 'ORD-' || n, CASE WHEN n % 10 = 0 THEN 'cancelled' ELSE 'served' END::orderstatus,
+               now() - (n % 365) * interval '1 day' - interval '1 hour', 30, 30, now(), now()
+        FROM generate_series(1, 200000) AS n
+    """))
+    db.execute(text("""
+        INSERT INTO order_items (id, order_id, menu_item_id, quantity, price_at_order, created_at)
+        SELECT 'i' || n || '-' || k, 'o' || n, :menu_item_id, 1, 10, now()
+        FROM generate_series(1, 200000) AS n, generate_series(1, 3) AS k
+    """), {"menu_item_id": menu_item_id})
+    db.commit()
+    db.execute(text("ANALYZE"))
+    old = db.execute(text("SELECT count(*) FROM orders WHERE order_time < now() - interval '30 days'")).scalar()
+
+    started = time.perf_counter()
+    moved = archive_orders(db, older_than_days=30)
+    elapsed = time.perf_counter() - started
+
+    assert moved == old
+    assert db.execute(text("SELECT count(*) FROM orders")).scalar() == 200000 - old
+    assert db.execute(text("SELECT count(*) FROM order_items_archive")).scalar() == 3 * old
+    print(f"\narchived {moved} orders in {elapsed:.1f}s ({moved / elapsed:.0f}/s)")
+    assert elapsed < 120
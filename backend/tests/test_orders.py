@@ -0,0 +1,171 @@
+"""
+Order creation, kitchen view and status changes
+"""
+from typing import Dict, List
+import pytest
+
+
+@pytest.fixture
+def staff(make_user) -> Dict[str, dict]:
+    return {role: make_user(role)[1] for role in ("admin", "server", "kitchen")}
+
+
+def place_order(client, staff, menu_item_ids: List[str], quantity: int = 1) -> dict:
+    response = client.post("/api/v1/orders/", json={
+        "items": [{"menu_item_id": menu_item_id, "quantity": quantity} for menu_item_id in menu_item_ids]
+    }, headers=staff["server"])
+    assert response.status_code == 201
+    return response.json()
+
+
+def set_status(client, staff, order_id: str, status: str) -> dict:
+    response = client.patch(f"/api/v1/orders/{order_id}/status", json={"status": status}, headers=staff["kitchen"])
+    assert response.status_code == 200
+    return response.json()
+
+
+def order_reads(statements: List[str]) -> List[str]:
+    return [s for s in statements if "FROM orders" in s]
+
+
+def test_kitchen_view_lists_only_active_orders(client, staff, make_menu_items):
+    menu_item_id = make_menu_items()[0]
+    orders = [place_order(client, staff, [menu_item_id])["id"] for _ in range(5)]
+    set_status(client, staff, orders[0], "served")
+    set_status(client, staff, orders[1], "cancelled")
+    set_status(client, staff, orders[3], "ready")
+
+    response = client.get("/api/v1/orders/kitchen", headers=staff["kitchen"])
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [o["id"] for o in data] == [orders[2], orders[3], orders[4]]
+    assert [o["status"] for o in data] == ["PENDING", "READY", "PENDING"]
+    assert data[0]["orderItems"][0]["menuItem"]["name"] == "Dish 0"
+
+
+def test_kitchen_view_is_one_query_then_cached(client, staff, make_menu_items, count_statements):
+    menu_item_ids = make_menu_items(3)
+    first = place_order(client, staff, menu_item_ids)["id"]
+    place_order(client, staff, menu_item_ids[:1])
+
+    with count_statements() as cold:
+        client.get("/api/v1/orders/kitchen", headers=staff["kitchen"])
+    with count_statements() as warm:
+        client.get("/api/v1/orders/kitchen", headers=staff["kitchen"])
+    assert len(order_reads(cold)) == 1
+    assert order_reads(warm) == []
+
+    # Any order write drops the cached view
+    set_status(client, staff, first, "served")
+    with count_statements() as statements:
+        data = client.get("/api/v1/orders/kitchen", headers=staff["kitchen"]).json()["data"]
+    assert len(order_reads(statements)) == 1
+    assert first not in [o["id"] for o in data]
+
+
+def test_kitchen_view_ignores_order_history(client, db, staff, make_menu_items):
+    from sqlalchemy import text
+    place_order(client, staff, make_menu_items())
+    db.execute(text("""
+        INSERT INTO orders (id, order_number, status, order_time, subtotal, total_amount, created_at, updated_at)
+        SELECT gen_random_uuid()::text, 'ORD-H' || n, 'served', now() - n * interval '1 minute', 0, 0, now(), now()
+        FROM generate_series(1, 50000) AS n
+    """))
+    db.commit()
+    db.execute(text("ANALYZE orders"))
+
+    plan = "\n".join(db.execute(text("""
+        EXPLAIN SELECT * FROM orders
+        WHERE status IN ('pending', 'preparing', 'ready') ORDER BY order_time
+    """)).scalars())
+    assert "ix_orders_active_order_time" in plan
+    assert "Seq Scan" not in plan
+    assert len(client.get("/api/v1/orders/kitchen", headers=staff["kitchen"]).json()["data"]) == 1
+
+
+def test_create_order_round_trips_do_not_grow_with_items(client, staff, make_menu_items, count_statements):
+    menu_item_ids = make_menu_items(50)
+    place_order(client, staff, menu_item_ids[:1])
+
+    counts = {}
+    for n in (1, 10, 50):
+        with count_statements() as statements:
+            order = place_order(client, staff, menu_item_ids[:n], quantity=2)
+        assert len(order["order_items"]) == n
+        assert len([s for s in statements if "FROM menu_items" in s]) == 1
+        assert len([s for s in statements if s.startswith("INSERT INTO order_items")]) == 1
+        counts[n] = len(statements)
+    assert counts[1] == counts[10] == counts[50]
+
+
+def test_unknown_menu_item_writes_nothing(client, db, staff, make_menu_items):
+    from app.models.order import Order
+    response = client.post("/api/v1/orders/", json={
+        "items": [{"menu_item_id": make_menu_items()[0], "quantity": 1}, {"menu_item_id": "missing", "quantity": 1}]
+    }, headers=staff["server"])
+    assert response.status_code == 404
+    assert db.query(Order).count() == 0
+
+
+def test_order_totals_follow_item_changes(client, db, staff, make_menu_items):
+    from decimal import Decimal
+    from app.models.order import Order
+    mains, dessert = make_menu_items(1, "12.50")[0], make_menu_items(1, "4.25")[0]
+    created = place_order(client, staff, [mains, dessert], quantity=2)
+    assert Decimal(created["subtotal"]) == Decimal(created["total_amount"]) == Decimal("33.50")
+
+    order = db.get(Order, created["id"])
+    mains_line = next(item for item in order.order_items if item.menu_item_id == mains)
+    mains_line.quantity = 3
+    db.commit()
+    assert order.total_amount == Decimal("46.00")
+
+    order.order_items.remove(mains_line)
+    db.commit()
+    assert order.subtotal == order.total_amount == Decimal("8.50")
+
+
+def test_today_revenue_counts_served_orders(client, staff, make_menu_items):
+    menu_item_id = make_menu_items(1, "20.00")[0]
+    served = [place_order(client, staff, [menu_item_id], quantity=q)["id"] for q in (1, 2)]
+    place_order(client, staff, [menu_item_id])
+    for order_id in served:
+        set_status(client, staff, order_id, "served")
+
+    stats = client.get("/api/v1/admin/stats", headers=staff["admin"]).json()["data"]
+    assert stats["todayRevenue"] == 60.0
+
+
+def test_bulk_status_is_one_update_for_any_number_of_orders(client, db, staff, make_menu_items, count_statements):
+    from app.models.order import Order, OrderStatus
+    menu_item_id = make_menu_items()[0]
+    orders = [place_order(client, staff, [menu_item_id])["id"] for _ in range(51)]
+
+    counts = {}
+    for batch in (orders[:1], orders[1:]):
+        with count_statements() as statements:
+            response = client.patch("/api/v1/orders/status", json={
+                "order_ids": batch, "status": "ready"
+            }, headers=staff["kitchen"])
+        assert response.status_code == 200
+        assert len(response.json()["data"]["updated"]) == len(batch)
+        assert len([s for s in statements if s.startswith("UPDATE orders")]) == 1
+        counts[len(batch)] = len(statements)
+    assert counts[1] == counts[50]
+
+    db.expire_all()
+    ready = db.query(Order).filter(Order.status == OrderStatus.ready, Order.ready_time.isnot(None)).count()
+    assert ready == 51
+
+
+def test_bulk_status_reports_unchanged_and_missing_orders(client, staff, make_menu_items):
+    menu_item_id = make_menu_items()[0]
+    pending, preparing = (place_order(client, staff, [menu_item_id])["id"] for _ in range(2))
+    set_status(client, staff, preparing, "preparing")
+
+    data = client.patch("/api/v1/orders/status", json={
+        "order_ids": [pending, preparing, "missing"], "status": "preparing"
+    }, headers=staff["kitchen"]).json()["data"]
+    assert [(u["orderId"], u["previousStatus"]) for u in data["updated"]] == [(pending, "PENDING")]
+    assert data["unchanged"] == [preparing]
+    assert data["notFound"] == ["missing"]
@@ -0,0 +1,62 @@
+"""
+Reservation listing
+"""
+from datetime import date, time, timedelta
+import uuid
+
+LIST = "/api/v1/reservations/"
+
+
+def add_reservations(db, make_user, n: int) -> None:
+    """n reservations, each with its own guest and table, three per day"""
+    from app.models.reservation import Reservation
+    from app.models.table import Table
+    for i in range(n):
+        guest = make_user()[0]
+        table = Table(table_number=f"L{uuid.uuid4().hex[:6]}", capacity=4)
+        db.add(table)
+        db.flush()
+        db.add(Reservation(
+            user_id=guest.id, table_id=table.id, date=date(2026, 11, 1) + timedelta(days=i // 3),
+            time=time(19, 0), party_size=2, confirmation_number=f"RES-{uuid.uuid4().hex[:8].upper()}"
+        ))
+    db.commit()
+
+
+def test_list_statement_count_is_constant(client, db, make_user, count_statements):
+    staff = make_user("manager")[1]
+    add_reservations(db, make_user, 2)
+    with count_statements() as few:
+        assert len(client.get(LIST, headers=staff).json()["data"]["reservations"]) == 2
+
+    add_reservations(db, make_user, 30)
+    with count_statements() as many:
+        response = client.get(LIST, headers=staff)
+
+    reservations = response.json()["data"]["reservations"]
+    assert len(reservations) == 32
+    assert all(r["user"] and r["table"] for r in reservations)
+    assert len(many) == len(few)
+
+
+def test_keyset_pages_cover_every_reservation_once(client, db, make_user):
+    staff = make_user("manager")[1]
+    add_reservations(db, make_user, 7)
+    everything = [r["id"] for r in client.get(LIST, headers=staff).json()["data"]["reservations"]]
+
+    paged, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get(LIST, params=params, headers=staff).json()["data"]
+        paged += [r["id"] for r in page["reservations"]]
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+
+    assert paged == everything
+
+
+def test_invalid_cursor_is_rejected(client, make_user):
+    staff = make_user("manager")[1]
+    response = client.get(LIST, params={"limit": 3, "cursor": "not-a-cursor"}, headers=staff)
+    assert response.status_code == 400
@@ -0,0 +1,162 @@
+"""
+Front desk reservation search
+"""
+import json
+import pytest
+from sqlalchemy import event, text
+from conftest import auth_headers
+
+# Every guest has RESERVATIONS // GUESTS reservations at either size
+GUESTS = 100_000
+RESERVATIONS = 1_000_000
+SMALL = (20_000, 200_000)
+
+
+def confirmation_number(n: int) -> str:
+    """Confirmation number of the n-th seeded reservation"""
+    return "RES-%08X" % (n * 2654435761 % 2 ** 32)
+
+
+def phone_number(n: int) -> str:
+    """Phone of the n-th seeded guest, the way a guest reads it out"""
+    digits = "%09d" % (n * 48271 % 10 ** 9)
+    return f"05{digits[:2]} {digits[2:5]} {digits[5:]}"
+
+
+@pytest.fixture(scope="module", params=[
+    pytest.param(SMALL, id="small"),
+    pytest.param((GUESTS, RESERVATIONS), id="1M", marks=pytest.mark.slow)
+])
+def search_client(request, database, reset_database, password_hash):
+    """Client over a small seed, or RESERVATIONS reservations of GUESTS guests when run with -m slow"""
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal, engine
+    from app.models.reservation import Reservation
+    from app.models.user import User, UserRole
+
+    guests, reservations = request.param
+    reset_database()
+    # Bulk load without the indexes, then build them and VACUUM so the
+    # trigram indexes have no pending list left
+    indexes = list(User.__table__.indexes) + list(Reservation.__table__.indexes)
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn)
+        conn.execute(text("""
+            INSERT INTO users (id, email, password_hash, first_name, last_name, phone, role, created_at, updated_at)
+            SELECT 'guest-' || g, 'guest' || g || '@example.com', 'x', 'Guest' || g, 'Family' || g,
+                   '+905' || lpad((g::bigint * 48271 % 1000000000)::text, 9, '0'), 'customer', now(), now()
+            FROM generate_series(1, :guests) g
+        """), {"guests": guests})
+        conn.execute(text("""
+            INSERT INTO reservations (id, user_id, date, time, party_size, status, confirmation_number, created_at, updated_at)
+            SELECT 'reservation-' || g, 'guest-' || (g % :guests + 1), date '2026-01-01' + g % 365, time '19:00',
+                   2, 'confirmed', 'RES-' || upper(lpad(to_hex(g::bigint * 2654435761 % 4294967296), 8, '0')), now(), now()
+            FROM generate_series(1, :reservations) g
+        """), {"guests": guests, "reservations": reservations})
+        for index in indexes:
+            index.create(conn)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users"))
+        conn.execute(text("VACUUM ANALYZE reservations"))
+
+    db = SessionLocal()
+    staff = User(email="host@example.com", password_hash=password_hash, first_name="Front",
+                 last_name="Desk", role=UserRole.server)
+    db.add(staff)
+    db.commit()
+    db.refresh(staff)
+    headers = auth_headers(staff)
+    db.close()
+
+    yield TestClient(database), headers, reservations
+    reset_database()
+
+
+def explain_search(client, headers, q: str) -> dict:
+    """Run the search and EXPLAIN ANALYZE the statement it sent"""
+    from app.database import engine
+    sent = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "similarity" in statement:
+            sent.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get("/api/v1/reservations/search", params={"q": q}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    statement, parameters = sent[0]
+    with engine.connect() as conn:
+        plans = [
+            conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters).scalar()
+            for _ in range(3)
+        ]
+    plans = [json.loads(plan) if isinstance(plan, str) else plan for plan in plans]
+    return min((plan[0] for plan in plans), key=lambda plan: plan["Execution Time"])
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def assert_index_driven(plan: dict) -> None:
+    nodes = list(plan_nodes(plan["Plan"]))
+    assert not [n for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") == "reservations"]
+    assert sum(n.get("Rows Removed by Filter", 0) for n in nodes) < 1000
+    assert plan["Execution Time"] < 20
+
+
+def test_search_by_name(search_client):
+    client, headers, _ = search_client
+    response = client.get("/api/v1/reservations/search", params={"q": "family12345"}, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert results
+    assert len(results) == RESERVATIONS // GUESTS
+    assert {r["customer"]["lastName"] for r in results} == {"Family12345"}
+
+
+def test_search_matches_every_word(search_client):
+    client, headers, _ = search_client
+    response = client.get("/api/v1/reservations/search", params={"q": "guest12345 family12345"}, headers=headers)
+    results = response.json()["data"]
+    assert results
+    assert {(r["customer"]["firstName"], r["customer"]["lastName"]) for r in results} == {("Guest12345", "Family12345")}
+
+
+def test_search_by_confirmation_number(search_client):
+    client, headers, _ = search_client
+    number = confirmation_number(123_456)
+    response = client.get("/api/v1/reservations/search", params={"q": number.lower()}, headers=headers)
+    results = response.json()["data"]
+    assert results[0]["confirmationNumber"] == number
+
+
+def test_search_by_phone(search_client):
+    client, headers, _ = search_client
+    response = client.get("/api/v1/reservations/search", params={"q": phone_number(4242)}, headers=headers)
+    results = response.json()["data"]
+    assert results
+    assert {r["customer"]["lastName"] for r in results} == {"Family4242"}
+
+
+def test_search_without_match(search_client):
+    client, headers, _ = search_client
+    response = client.get("/api/v1/reservations/search", params={"q": "zzqxw"}, headers=headers)
+    assert response.json()["data"] == []
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("q", [
+    "zzqxw", "family12345", "guest12345 family12345", confirmation_number(123_456), phone_number(4242)
+])
+def test_search_plan_is_index_driven(search_client, q):
+    client, headers, reservations = search_client
+    if reservations < RESERVATIONS:
+        pytest.skip("a small table is rightly read with a sequential scan")
+    assert_index_driven(explain_search(client, headers, q))
@@ -0,0 +1,112 @@
+"""
+Sales rollups and revenue analytics
+"""
+from datetime import date, timedelta
+import time
+import pytest
+from sqlalchemy import text
+from conftest import run_concurrently
+
+ENDPOINTS = ["/api/v1/admin/analytics/sales", "/api/v1/admin/analytics/categories", "/api/v1/admin/analytics/items"]
+
+
+@pytest.fixture
+def staff(make_user) -> dict:
+    return {role: make_user(role)[1] for role in ("admin", "server", "kitchen")}
+
+
+def rollups(db) -> dict:
+    return {
+        table: sorted(db.execute(text(
+            f"SELECT {bucket}, menu_item_id, quantity, revenue, order_count FROM {table} WHERE quantity <> 0"
+        )).all())
+        for table, bucket in (("sales_daily", "day"), ("sales_hourly", "hour"))
+    }
+
+
+def test_rollups_follow_orders_and_match_a_rebuild(client, db, staff, make_menu_items):
+    from app.services.sales_rollup import rebuild_rollups
+    mains, desserts = make_menu_items(1, "18.00")[0], make_menu_items(1, "6.50")[0]
+    orders = []
+    for quantity in (1, 2, 3, 4):
+        orders.append(client.post("/api/v1/orders/", json={"items": [
+            {"menu_item_id": mains, "quantity": quantity}, {"menu_item_id": desserts, "quantity": 1}
+        ]}, headers=staff["server"]).json()["id"])
+
+    client.patch(f"/api/v1/orders/{orders[0]}/status", json={"status": "served"}, headers=staff["kitchen"])
+    client.patch("/api/v1/orders/status", json={"order_ids": orders[1:3], "status": "served"}, headers=staff["kitchen"])
+    # Served by mistake and sent back
+    client.patch(f"/api/v1/orders/{orders[2]}", json={"status": "ready"}, headers=staff["server"])
+    client.delete(f"/api/v1/orders/{orders[1]}", headers=staff["admin"])
+
+    incremental = rollups(db)
+    assert sum(row.quantity for row in incremental["sales_daily"]) == 1 + 1
+    rebuild_rollups(db)
+    db.commit()
+    assert rollups(db) == incremental
+
+    data = client.get(ENDPOINTS[0], headers=staff["admin"]).json()["data"]
+    assert data["totalRevenue"] == 24.5
+
+
+def test_simultaneous_transitions_are_counted_once(client, db, staff, make_menu_items):
+    menu_item_id = make_menu_items(1, "12.00")[0]
+    place = lambda: client.post("/api/v1/orders/", json={
+        "items": [{"menu_item_id": menu_item_id, "quantity": 1}]
+    }, headers=staff["server"]).json()["id"]
+
+    # The same order served twice at once, through both single-order routes
+    order_id = place()
+    responses = run_concurrently([
+        lambda: client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "served"}, headers=staff["kitchen"]),
+        lambda: client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "served"}, headers=staff["kitchen"]),
+        lambda: client.patch(f"/api/v1/orders/{order_id}", json={"status": "served"}, headers=staff["server"]),
+    ])
+    assert [r.status_code for r in responses] == [200] * 3
+    assert [(row.quantity, row.order_count) for row in rollups(db)["sales_daily"]] == [(1, 1)]
+
+    # Deleted while being sent back: subtracted once
+    responses = run_concurrently([
+        lambda: client.delete(f"/api/v1/orders/{order_id}", headers=staff["admin"]),
+        lambda: client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "ready"}, headers=staff["kitchen"]),
+    ])
+    assert responses[0].status_code == 204
+    assert rollups(db)["sales_daily"] == []
+
+
+def seed_daily_rollups(db, make_menu_items, items: int, days: int) -> str:
+    """Random daily rows for every item over the last days; returns the first day"""
+    make_menu_items(items)
+    db.execute(text("""
+        INSERT INTO sales_daily (day, menu_item_id, category, quantity, revenue, order_count)
+        SELECT d::date, m.id, m.category, 1 + (random() * 20)::int, (random() * 400)::numeric(12, 2), 1 + (random() * 15)::int
+        FROM generate_series(current_date - :days, current_date, interval '1 day') AS d, menu_items m
+    """), {"days": days})
+    db.commit()
+    db.execute(text("ANALYZE sales_daily"))
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def test_analytics_read_only_the_rollups(client, db, staff, make_menu_items, count_statements):
+    date_from = seed_daily_rollups(db, make_menu_items, items=10, days=30)
+    for endpoint in ENDPOINTS:
+        with count_statements() as statements:
+            response = client.get(endpoint, params={"date_from": date_from}, headers=staff["admin"])
+        assert response.status_code == 200
+        assert not [s for s in statements if "FROM orders" in s or "order_items" in s]
+
+
+@pytest.mark.slow
+def test_twelve_months_of_analytics_are_fast(client, db, staff, make_menu_items):
+    """A year of daily rows for a 100 item menu; p95 of each endpoint under 50 ms"""
+    date_from = seed_daily_rollups(db, make_menu_items, items=100, days=365)
+    for endpoint in ENDPOINTS:
+        client.get(endpoint, params={"date_from": date_from}, headers=staff["admin"])
+        timings = []
+        for _ in range(20):
+            started = time.perf_counter()
+            client.get(endpoint, params={"date_from": date_from}, headers=staff["admin"])
+            timings.append(time.perf_counter() - started)
+        p95 = sorted(timings)[18]
+        print(f"\n{endpoint}: p95 {p95 * 1000:.1f} ms")
+        assert p95 < 0.05
@@ -0,0 +1,150 @@
+"""
+Kitchen broadcasts across worker processes
+
+Each worker is a separate uvicorn process, as on separate hosts, sharing
+the test database and a local stand-in broker (see pubsub_broker).
+"""
+from contextlib import contextmanager
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Callable, Iterator, List
+import pytest
+import socketio
+
+# Worker health checks and the sync Socket.IO client (see requirements.txt)
+requests = pytest.importorskip("requests")
+from pubsub_broker import PubSubBroker
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.02)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def is_up(url: str) -> bool:
+    try:
+        return requests.get(f"{url}/health", timeout=1).status_code == 200
+    except requests.ConnectionError:
+        return False
+
+
+@contextmanager
+def worker_processes(count: int, message_queue: str) -> Iterator[List[str]]:
+    """Start count uvicorn processes and return their base URLs"""
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=message_queue)
+    urls, processes = [], []
+    try:
+        for _ in range(count):
+            port = free_port()
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:socket_app", "--port", str(port), "--log-level", "warning"],
+                cwd=BACKEND_DIR, env=env
+            ))
+            urls.append(f"http://127.0.0.1:{port}")
+        # Every process imports the app; give slow machines time
+        for url in urls:
+            wait_for(lambda: is_up(url), timeout=60)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(5)
+            except subprocess.TimeoutExpired:
+                # Graceful shutdown can wait on the queue listener
+                process.kill()
+                process.wait()
+
+
+@contextmanager
+def kitchen_clients(urls: List[str]) -> Iterator[List[list]]:
+    """One kitchen room client per URL; yields the frames each receives"""
+    clients, frames = [], []
+    try:
+        for url in urls:
+            received = []
+            client = socketio.Client()
+            client.on("*", lambda event, data=None, received=received: received.append((event, data)))
+            client.connect(url, transports=["polling"])
+            client.emit("join_kitchen")
+            clients.append(client)
+            frames.append(received)
+        for received in frames:
+            wait_for(lambda: any(event == "joined_kitchen" for event, _ in received))
+        yield frames
+    finally:
+        for client in clients:
+            client.disconnect()
+
+
+def new_orders(received: list) -> List[str]:
+    return [data["id"] for event, data in received if event == "new-order"]
+
+
+@pytest.fixture
+def server_headers(make_user) -> dict:
+    return make_user("server")[1]
+
+
+def test_client_manager_follows_the_message_queue_url(monkeypatch):
+    from app.config import settings
+    from app.realtime import create_client_manager
+
+    monkeypatch.setattr(settings, "SOCKETIO_MESSAGE_QUEUE", None)
+    assert create_client_manager() is None
+    monkeypatch.setattr(settings, "SOCKETIO_MESSAGE_QUEUE", "redis://localhost:6379/0")
+    assert isinstance(create_client_manager(), socketio.AsyncRedisManager)
+    monkeypatch.setattr(settings, "SOCKETIO_MESSAGE_QUEUE", "kafka://localhost:9092")
+    with pytest.raises(ValueError):
+        create_client_manager()
+
+
+@pytest.mark.slow
+def test_order_placed_on_one_worker_reaches_the_kitchen_on_another(server_headers, make_menu_items):
+    menu_item_id = make_menu_items()[0]
+    with PubSubBroker() as broker, worker_processes(2, broker.url) as urls, kitchen_clients(urls[:1]) as frames:
+        response = requests.post(f"{urls[1]}/api/v1/orders/", json={
+            "items": [{"menu_item_id": menu_item_id, "quantity": 1}]
+        }, headers=server_headers)
+        assert response.status_code == 201
+        wait_for(lambda: new_orders(frames[0]) == [response.json()["id"]])
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("workers", [1, 4, 8])
+def test_broadcast_throughput(workers, server_headers, make_menu_items):
+    """
+    Orders are placed round robin on every worker while a kitchen client on
+    each worker must see all of them; prints delivered frames per second
+    """
+    menu_item_id = make_menu_items()[0]
+    orders = 40
+    with PubSubBroker() as broker, worker_processes(workers, broker.url) as urls, kitchen_clients(urls) as frames:
+        started = time.perf_counter()
+        for i in range(orders):
+            response = requests.post(f"{urls[i % workers]}/api/v1/orders/", json={
+                "items": [{"menu_item_id": menu_item_id, "quantity": 1}]
+            }, headers=server_headers)
+            assert response.status_code == 201
+        wait_for(lambda: all(len(new_orders(received)) == orders for received in frames))
+        elapsed = time.perf_counter() - started
+
+    delivered = orders * workers
+    print(f"\n{workers} workers: {delivered} new-order frames in {elapsed:.2f}s ({delivered / elapsed:.0f}/s)")
+    for received in frames:
+        assert len(set(new_orders(received))) == orders
@@ -0,0 +1,119 @@
+"""
+Table turnover and occupancy analytics
+"""
+from datetime import date, timedelta
+import random
+import time
+import numpy as np
+from sqlalchemy import text
+from app.services.table_analytics import AREAS, occupancy_metrics
+
+STATUSES = ["confirmed", "completed", "completed", "completed", "cancelled", "no_show"]
+
+
+def synthetic_columns(rng: random.Random, n_tables: int, nights: int, n_reservations: int) -> dict:
+    table_ids = sorted(f"t{i:03d}" for i in range(n_tables))
+    tables = {
+        "table_id": np.array(table_ids),
+        "table_area": np.array([rng.choice(AREAS) for _ in table_ids]),
+        "table_capacity": np.array([rng.choice([2, 4, 6]) for _ in table_ids]),
+    }
+    rows = [
+        # Some reservations have no table or a deleted one
+        (rng.choice(table_ids + ["", "gone"]), rng.randrange(nights), rng.choice(STATUSES),
+         rng.randint(1, 6), rng.choice([60, 90, 120]))
+        for _ in range(n_reservations)
+    ]
+    columns = list(zip(*rows))
+    return {
+        **tables,
+        "table": np.array(columns[0]),
+        "night": np.array(columns[1]),
+        "status": np.array(columns[2]),
+        "party_size": np.array(columns[3]),
+        "minutes": np.array(columns[4]),
+    }
+
+
+def reference_metrics(columns: dict, nights: int, service_minutes: int) -> dict:
+    """The same figures with a plain loop over reservations"""
+    area = dict(zip(columns["table_id"], columns["table_area"]))
+    capacity = dict(zip(columns["table_id"], columns["table_capacity"]))
+    seated_minutes, turns, used = [], {}, {a: 0 for a in AREAS}
+    no_shows, completed = 0, 0
+    for table, status, party, minutes in zip(columns["table"], columns["status"], columns["party_size"], columns["minutes"]):
+        no_shows += status == "no_show"
+        completed += status == "completed"
+        if table in area and status in ("confirmed", "completed"):
+            seated_minutes.append(minutes)
+            turns[area[table]] = turns.get(area[table], 0) + 1
+            used[area[table]] += party * minutes
+    seats = {a: sum(c for t, c in capacity.items() if area[t] == a) for a in AREAS}
+    tables = {a: sum(1 for t in area if area[t] == a) for a in AREAS}
+    return {
+        "noShowRate": round(no_shows / (no_shows + completed), 4),
+        "averageSeatingMinutes": round(sum(seated_minutes) / len(seated_minutes), 1),
+        "turnsPerTableNight": round(len(seated_minutes) / (len(area) * nights), 3),
+        "areas": {
+            a: (round(turns.get(a, 0) / (tables[a] * nights), 3), round(used[a] / (seats[a] * service_minutes * nights), 4))
+            for a in AREAS
+        }
+    }
+
+
+def test_metrics_match_a_per_row_loop():
+    columns = synthetic_columns(random.Random(1), n_tables=30, nights=28, n_reservations=3000)
+    metrics = occupancy_metrics(columns, date(2026, 1, 1), date(2026, 1, 28), 360)
+    expected = reference_metrics(columns, 28, 360)
+
+    for key in ("noShowRate", "averageSeatingMinutes", "turnsPerTableNight"):
+        assert metrics[key] == expected[key]
+    assert {a["area"]: (a["turnsPerTableNight"], a["seatUtilization"]) for a in metrics["areas"]} == expected["areas"]
+
+
+def test_metrics_for_a_year_are_vectorized():
+    columns = synthetic_columns(random.Random(2), n_tables=60, nights=365, n_reservations=100000)
+    started = time.perf_counter()
+    occupancy_metrics(columns, date(2025, 1, 1), date(2025, 12, 31), 360)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_occupancy_endpoint_over_a_year_of_reservations(client, db, make_user):
+    """60 tables with up to three seatings a night for a year"""
+    guest = make_user()[0]
+    admin = make_user("admin")[1]
+    date_to = date.today()
+    date_from = date_to - timedelta(days=364)
+    db.execute(text("""
+        INSERT INTO tables (id, table_number, capacity, area, smoking_allowed, is_window, is_wall, is_vip, status, created_at, updated_at)
+        SELECT 't' || n, 'Y' || n, (ARRAY[2, 4, 6])[1 + n % 3], (ARRAY['TERRACE', 'MAIN_HALL', 'VIP'])[1 + n % 3]::tablearea,
+               false, false, false, false, 'available', now(), now()
+        FROM generate_series(1, 60) AS n
+    """))
+    db.execute(text("""
+        INSERT INTO reservations (id, user_id, table_id, date, time, end_time, party_size, status, confirmation_number, created_at, updated_at)
+        SELECT 'r' || t || '-' || d || '-' || k, :user_id, 't' || t, CAST(:date_from AS date) + d,
+               make_time(17 + 2 * k, 0, 0), make_time(18 + 2 * k, 30, 0), 1 + (t + d + k) % 6,
+               (ARRAY['completed', 'completed', 'completed', 'no_show', 'cancelled'])[1 + (t * 7 + d + k) % 5]::reservationstatus,
+               'RES-Y' || t || '-' || d || '-' || k, now(), now()
+        FROM generate_series(1, 60) AS t, generate_series(0, 364) AS d, generate_series(0, 2) AS k
+        WHERE (t + d * 3 + k) % 4 <> 0
+    """), {"user_id": guest.id, "date_from": date_from})
+    db.commit()
+    db.execute(text("ANALYZE reservations"))
+
+    started = time.perf_counter()
+    response = client.get("/api/v1/admin/analytics/occupancy", params={
+        "date_from": date_from.isoformat(), "date_to": date_to.isoformat()
+    }, headers=admin)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    data = response.json()["data"]
+
+    total = db.execute(text("SELECT count(*) FROM reservations")).scalar()
+    assert data["reservations"]["total"] == total
+    assert data["nights"] == 365
+    assert data["averageSeatingMinutes"] == 90.0
+    assert 0 < data["turnsPerTableNight"] < 3
+    print(f"\noccupancy analytics over {total} reservations: {elapsed * 1000:.0f} ms")
+    assert elapsed < 5
@@ -0,0 +1,83 @@
+"""
+Table assignment solver
+"""
+from itertools import permutations
+import random
+import time
+from app.models.table import Table
+from app.schemas.reservation import TablePreferences
+from app.services.table_assignment import min_cost_assignment, plan_assignments
+
+
+def make_tables(capacities) -> list:
+    return [
+        Table(id=f"t{i}", table_number=f"T{i}", capacity=capacity, is_window=False, is_wall=False,
+              is_vip=False, smoking_allowed=False)
+        for i, capacity in enumerate(capacities)
+    ]
+
+
+def test_assignment_is_optimal():
+    rng = random.Random(3)
+    for _ in range(50):
+        rows, columns = rng.randint(1, 5), rng.randint(5, 7)
+        cost = [[rng.randint(0, 100) for _ in range(columns)] for _ in range(rows)]
+        best = min(
+            sum(cost[row][column] for row, column in enumerate(choice))
+            for choice in permutations(range(columns), rows)
+        )
+        chosen = min_cost_assignment(cost)
+        assert len(set(chosen)) == rows
+        assert sum(cost[row][column] for row, column in enumerate(chosen)) == best
+
+
+def test_small_party_does_not_take_the_big_table():
+    tables = make_tables([4, 2])
+    plan = plan_assignments(tables, {}, [("small", 2, 1140, 1260), ("big", 4, 1140, 1260)])
+    assert plan == {"small": "t1", "big": "t0"}
+
+
+def test_overlapping_reservations_are_planned_together():
+    tables = make_tables([4, 2])
+    tables[0].is_window = True
+    reservations = [("window", 2, 1140, 1260), ("family", 4, 1170, 1290)]
+    preferences = {"window": TablePreferences(window=True)}
+
+    # One at a time in start order, the couple takes the big window table
+    greedy = {}
+    for reservation in reservations:
+        greedy.update(plan_assignments(tables, {
+            table_id: [(r[2], r[3]) for r in reservations if greedy.get(r[0]) == table_id] for table_id in ("t0", "t1")
+        }, [reservation], preferences))
+    assert greedy == {"window": "t0", "family": None}
+
+    plan = plan_assignments(tables, {}, reservations, preferences)
+    assert plan == {"window": "t1", "family": "t0"}
+    # A later, non-overlapping booking can reuse a table
+    plan = plan_assignments(tables, {}, reservations + [("late", 4, 1290, 1380)], preferences)
+    assert plan["late"] == "t0"
+
+
+def test_busy_night_plan_is_valid():
+    rng = random.Random(11)
+    tables = make_tables([rng.choice([2, 2, 4, 4, 6, 8]) for _ in range(60)])
+    reservations = []
+    for i in range(400):
+        start = rng.randrange(17 * 60, 23 * 60, 15)
+        reservations.append((f"r{i}", rng.choice([1, 2, 2, 3, 4, 5, 6]), start, start + 120))
+
+    started = time.perf_counter()
+    plan = plan_assignments(tables, {}, reservations)
+    elapsed = time.perf_counter() - started
+
+    capacity = {str(t.id): t.capacity for t in tables}
+    seated = {}
+    for reservation_id, party_size, start, end in reservations:
+        table_id = plan[reservation_id]
+        if table_id is None:
+            continue
+        assert capacity[table_id] >= party_size
+        assert all(end <= other_start or start >= other_end for other_start, other_end in seated.get(table_id, ()))
+        seated.setdefault(table_id, []).append((start, end))
+    assert sum(len(windows) for windows in seated.values()) > 150
+    assert elapsed < 2
@@ -0,0 +1,45 @@
+"""
+Table suggestions for a reservation
+"""
+import pytest
+
+DAY = "2026-11-20"
+
+
+@pytest.fixture
+def tables(db):
+    from app.models.table import Table
+    tables = [Table(table_number=number, capacity=4) for number in ("T1", "T2")]
+    db.add_all(tables)
+    db.commit()
+    return {t.table_number: str(t.id) for t in tables}
+
+
+def book(client, headers, table_id: str) -> str:
+    response = client.post("/api/v1/reservations/", json={
+        "date": DAY, "time": "19:00", "party_size": 2, "table_id": table_id
+    }, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def suggested(client, headers, reservation_id: str) -> list:
+    response = client.get(f"/api/v1/reservations/{reservation_id}/table-suggestions", headers=headers)
+    assert response.status_code == 200
+    return sorted(t["tableNumber"] for t in response.json()["data"])
+
+
+def test_confirmed_reservation_keeps_its_table(client, make_user, tables):
+    staff = make_user("server")[1]
+    reservation_id = book(client, make_user()[1], tables["T1"])
+    assert suggested(client, staff, reservation_id) == ["T1", "T2"]
+
+
+def test_cancelled_reservation_does_not_free_a_retaken_table(client, make_user, tables):
+    admin = make_user("admin")[1]
+    cancelled_id = book(client, make_user()[1], tables["T1"])
+    response = client.patch(f"/api/v1/reservations/{cancelled_id}", json={"status": "cancelled"}, headers=admin)
+    assert response.status_code == 200
+    book(client, make_user()[1], tables["T1"])
+
+    assert suggested(client, admin, cancelled_id) == ["T2"]
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import api from '../services/api';
 import { User } from '../types';
 
@@ -11,6 +11,8 @@ interface UserFormData {
   password?: string;
 }
 
+const PAGE_SIZE = 50;
+
 const initialFormData: UserFormData = {
   firstName: '',
   lastName: '',
@@ -25,6 +27,10 @@ export default function CustomersPage() {
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [roleCounts, setRoleCounts] = useState<Record<string, number>>({});
+  const [newThisMonth, setNewThisMonth] = useState(0);
 
   // Modal states
   const [showAddModal, setShowAddModal] = useState(false);
@@ -35,23 +41,54 @@ export default function CustomersPage() {
   const [formError, setFormError] = useState('');
   const [formSuccess, setFormSuccess] = useState('');
 
+  // Requests for the current search term; aborted when the term changes so a
+  // late response (first page or load more) of an older term is never shown
+  const searchRequest = useRef<AbortController | null>(null);
+
+  // Search runs on the server; wait for typing to pause before refetching
   useEffect(() => {
-    fetchCustomers();
-  }, []);
+    const controller = new AbortController();
+    searchRequest.current = controller;
+    setNextCursor(null);
+    const timer = setTimeout(() => fetchCustomers(), searchTerm ? 300 : 0);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm]);
 
-  const fetchCustomers = async () => {
+  const fetchCustomers = async (cursor?: string) => {
+    const signal = searchRequest.current?.signal;
     try {
-      const response = await api.get('/admin/users');
+      const response = await api.get('/admin/users', {
+        params: { limit: PAGE_SIZE, search: searchTerm.trim() || undefined, cursor },
+        signal,
+      });
+      if (signal?.aborted) return;
       if (response.data.success) {
-        setCustomers(response.data.data);
+        const { data, meta } = response.data;
+        setCustomers(prev => (cursor ? [...prev, ...data] : data));
+        setNextCursor(meta?.nextCursor ?? null);
+        if (meta?.roleCounts) {
+          setRoleCounts(meta.roleCounts);
+          setNewThisMonth(meta.newThisMonth ?? 0);
+        }
       }
     } catch (err: any) {
+      if (signal?.aborted) return;
       setError(err.response?.data?.error?.message || 'Failed to load customers');
     } finally {
-      setIsLoading(false);
+      if (!signal?.aborted) setIsLoading(false);
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    await fetchCustomers(nextCursor);
+    setIsLoadingMore(false);
+  };
+
   const handleAddUser = () => {
     setFormData(initialFormData);
     setFormError('');
@@ -132,10 +169,6 @@ export default function CustomersPage() {
     }
   };
 
-  const filteredCustomers = customers.filter(customer =>
-    `${customer.firstName} ${customer.lastName} ${customer.email}`.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   const getRoleBadge = (role: string) => {
     const badges: Record<string, string> = {
       admin: 'badge badge-info',
@@ -170,13 +203,11 @@ export default function CustomersPage() {
     );
   }
 
-  const staffCount = customers.filter(c => c.role === 'admin' || c.role === 'kitchen' || c.role === 'manager' || c.role === 'server').length;
-  const customerCount = customers.filter(c => c.role === 'customer').length;
-  const thisMonthCount = customers.filter(c => {
-    const joinDate = new Date(c.createdAt);
-    const now = new Date();
-    return joinDate.getMonth() === now.getMonth() && joinDate.getFullYear() === now.getFullYear();
-  }).length;
+  // Counts cover the whole directory, not just the loaded pages
+  const totalCount = Object.values(roleCounts).reduce((sum, count) => sum + count, 0);
+  const staffCount = ['admin', 'kitchen', 'manager', 'server'].reduce((sum, role) => sum + (roleCounts[role] || 0), 0);
+  const customerCount = roleCounts.customer || 0;
+  const thisMonthCount = newThisMonth;
 
   return (
     <div className="p-6">
@@ -227,7 +258,7 @@ export default function CustomersPage() {
             </tr>
           </thead>
           <tbody>
-            {filteredCustomers.map((customer) => (
+            {customers.map((customer) => (
               <tr key={customer.id}>
                 <td>
                   <div className="flex items-center gap-2.5">
@@ -260,7 +291,7 @@ export default function CustomersPage() {
           </tbody>
         </table>
 
-        {filteredCustomers.length === 0 && (
+        {customers.length === 0 && (
           <div className="text-center py-10 text-white/60">
             <div className="w-10 h-10 rounded-2xl border border-white/[0.14] bg-white/[0.06] flex items-center justify-center mx-auto mb-3 shadow-lg">
               👥
@@ -270,13 +301,25 @@ export default function CustomersPage() {
             </p>
           </div>
         )}
+
+        {nextCursor && (
+          <div className="text-center pt-4">
+            <button
+              onClick={handleLoadMore}
+              disabled={isLoadingMore}
+              className="px-4 py-2 rounded-lg bg-white/10 text-white/80 hover:bg-white/20 transition-colors text-sm disabled:opacity-50"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Stats */}
       <div className="grid grid-cols-12 gap-3.5">
         <div className="col-span-3 kpi-card">
           <div className="kpi-label">Total Customers</div>
-          <div className="kpi-value">{customers.length}</div>
+          <div className="kpi-value">{totalCount}</div>
           <div className="kpi-hint">All registered accounts.</div>
         </div>
         <div className="col-span-3 kpi-card">
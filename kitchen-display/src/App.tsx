@@ -1,8 +1,8 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import api from './services/api';
 import socketService from './services/socket';
 import OrderCard from './components/OrderCard';
-import { Order } from './types';
+import { Order, KitchenSchedule } from './types';
 
 function App() {
   const [orders, setOrders] = useState<Order[]>([]);
@@ -11,6 +11,9 @@ function App() {
   const [connectionStatus, setConnectionStatus] = useState<'connected' | 'disconnected'>('disconnected');
   const [filter, setFilter] = useState<'all' | 'active'>('active');
   const [currentTime, setCurrentTime] = useState(Date.now());
+  // Sequence number of the last applied socket event, per server process
+  const lastSeq = useRef<Record<string, number>>({});
+  const [schedule, setSchedule] = useState<KitchenSchedule | null>(null);
 
   // Audio notification
   const playNotificationSound = () => {
@@ -21,7 +24,7 @@ function App() {
   // Fetch orders
   const fetchOrders = useCallback(async () => {
     try {
-      const response = await api.get('/orders');
+      const response = await api.get('/orders/kitchen');
       if (response.data.success) {
         setOrders(response.data.data);
       }
@@ -35,10 +38,8 @@ function App() {
   // Update order status
   const handleUpdateStatus = async (orderId: string, status: string) => {
     try {
-      const response = await api.patch(`/orders/${orderId}/status`, { status });
-      if (response.data.success) {
-        fetchOrders();
-      }
+      // The resulting order-updated event refreshes the card
+      await api.patch(`/orders/${orderId}/status`, { status });
     } catch (err: any) {
       alert(err.response?.data?.error?.message || 'Durum güncellenemedi');
     }
@@ -54,27 +55,87 @@ function App() {
     socket.on('connect', () => {
       setConnectionStatus('connected');
       console.log('✅ Mutfak Ekranı sunucuya bağlandı');
+      // Events may have been missed while disconnected
+      if (Object.keys(lastSeq.current).length > 0) {
+        lastSeq.current = {};
+        fetchOrders();
+      }
     });
 
     socket.on('disconnect', () => {
       setConnectionStatus('disconnected');
     });
 
+    // Events are deltas; a gap in the sequence means one was missed
+    const applyEvent = (event: { seq: number; source: string }, apply: () => void) => {
+      const last = lastSeq.current[event.source];
+      if (last !== undefined && event.seq !== last + 1) {
+        fetchOrders();
+      } else {
+        apply();
+      }
+      lastSeq.current[event.source] = event.seq;
+    };
+
+    const addOrder = (newOrder: Order) => {
+      setOrders(prev => [newOrder, ...prev.filter(o => o.id !== newOrder.id)]);
+    };
+
+    const updateOrder = (update: any) => {
+      setOrders(prev => prev.map(o =>
+        o.id === update.orderId
+          ? { ...o, status: update.status, notes: update.notes, updatedAt: update.updatedAt }
+          : o
+      ));
+    };
+
+    const removeOrder = (orderId: string) => {
+      setOrders(prev => prev.filter(o => o.id !== orderId));
+    };
+
     // Listen for new orders
     socketService.onNewOrder((newOrder) => {
       console.log('🔔 Yeni sipariş geldi:', newOrder);
       playNotificationSound();
-      fetchOrders();
+      applyEvent(newOrder, () => addOrder(newOrder));
     });
 
     // Listen for order updates
-    socketService.onOrderUpdated((updatedOrder) => {
-      console.log('📝 Sipariş güncellendi:', updatedOrder);
-      fetchOrders();
+    socketService.onOrderUpdated((update) => {
+      console.log('📝 Sipariş güncellendi:', update);
+      applyEvent(update, () => updateOrder(update));
+    });
+
+    // Listen for bulk status changes
+    socketService.onOrdersUpdated((bulk) => {
+      applyEvent(bulk, () => bulk.updates.forEach(updateOrder));
+    });
+
+    // Listen for deleted orders
+    socketService.onOrderDeleted((deleted) => {
+      applyEvent(deleted, () => removeOrder(deleted.orderId));
     });
 
-    // Refresh orders every 30 seconds
-    const refreshInterval = setInterval(fetchOrders, 30000);
+    // Fire-next list and estimated ready times
+    socketService.onKitchenSchedule(setSchedule);
+
+    // During rush periods the server merges events into batches
+    socketService.onKitchenBatch((batch) => {
+      applyEvent(batch, () => {
+        batch.events.forEach(({ event, data }) => {
+          if (event === 'new-order') {
+            playNotificationSound();
+            addOrder(data);
+          } else if (event === 'order-updated') {
+            updateOrder(data);
+          } else if (event === 'order-deleted') {
+            removeOrder(data.orderId);
+          } else if (event === 'kitchen-schedule') {
+            setSchedule(data);
+          }
+        });
+      });
+    });
 
     // Update current time every second for timers
     const timeInterval = setInterval(() => {
@@ -82,7 +143,6 @@ function App() {
     }, 1000);
 
     return () => {
-      clearInterval(refreshInterval);
       clearInterval(timeInterval);
       socketService.disconnect();
     };
@@ -201,6 +261,7 @@ function App() {
               order={order}
               onUpdateStatus={handleUpdateStatus}
               elapsedTime={getElapsedTime(order.createdAt)}
+              ticket={schedule?.tickets.find(t => t.orderId === order.id)}
             />
           ))
         )}
@@ -1,12 +1,13 @@
-import { Order } from '../types';
+import { Order, ScheduledTicket } from '../types';
 
 interface OrderCardProps {
   order: Order;
   onUpdateStatus: (orderId: string, status: string) => void;
   elapsedTime: number;
+  ticket?: ScheduledTicket;
 }
 
-export default function OrderCard({ order, onUpdateStatus, elapsedTime }: OrderCardProps) {
+export default function OrderCard({ order, onUpdateStatus, elapsedTime, ticket }: OrderCardProps) {
   const getStatusClass = (status: string) => {
     const classes: Record<string, string> = {
       PENDING: 'status-pending border-yellow-500/50',
@@ -76,10 +77,15 @@ export default function OrderCard({ order, onUpdateStatus, elapsedTime }: OrderC
       </div>
 
       {/* Status Badge */}
-      <div className="mb-4">
+      <div className="mb-4 flex items-center justify-between">
         <span className={`${getStatusBadgeClass(order.status)} text-white px-4 py-1.5 rounded-full text-xs font-semibold uppercase tracking-wider shadow-lg`}>
           {getStatusText(order.status)}
         </span>
+        {ticket && (
+          <span className={`text-xs tracking-wider ${ticket.late ? 'text-red-400' : 'text-[#9aa3b2]'}`}>
+            Tahmini hazır: {new Date(ticket.estimatedReadyAt + 'Z').toLocaleTimeString('tr-TR', { hour: '2-digit', minute: '2-digit' })}
+          </span>
+        )}
       </div>
 
       {/* Order Items */}
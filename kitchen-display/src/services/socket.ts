@@ -1,4 +1,5 @@
 import { io, Socket } from 'socket.io-client';
+import { KitchenSchedule } from '../types';
 
 const SOCKET_URL = import.meta.env.VITE_SOCKET_URL || 'http://localhost:7001';
 
@@ -16,6 +17,9 @@ class SocketService {
 
       this.socket.on('connect', () => {
         console.log('✅ Connected to WebSocket server');
+        // Order events are only sent to the kitchen room
+        this.socket?.emit('join_kitchen');
+        this.socket?.emit('get_kitchen_schedule');
       });
 
       this.socket.on('disconnect', () => {
@@ -48,6 +52,30 @@ class SocketService {
     }
   }
 
+  onOrdersUpdated(callback: (data: { updates: any[]; seq: number; source: string }) => void) {
+    if (this.socket) {
+      this.socket.on('orders-updated', callback);
+    }
+  }
+
+  onOrderDeleted(callback: (data: { orderId: string; seq: number; source: string }) => void) {
+    if (this.socket) {
+      this.socket.on('order-deleted', callback);
+    }
+  }
+
+  onKitchenSchedule(callback: (schedule: KitchenSchedule) => void) {
+    if (this.socket) {
+      this.socket.on('kitchen-schedule', callback);
+    }
+  }
+
+  onKitchenBatch(callback: (batch: { seq: number; source: string; events: { event: string; data: any }[] }) => void) {
+    if (this.socket) {
+      this.socket.on('kitchen-batch', callback);
+    }
+  }
+
   emit(event: string, data: any) {
     if (this.socket) {
       this.socket.emit(event, data);
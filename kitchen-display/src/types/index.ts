@@ -49,3 +49,20 @@ export interface User {
   lastName: string;
 }
 
+export interface ScheduledTicket {
+  orderId: string;
+  orderNumber: string;
+  status: 'PENDING' | 'PREPARING';
+  prepMinutes: number;
+  startAt: string;
+  estimatedReadyAt: string;
+  late: boolean;
+}
+
+export interface KitchenSchedule {
+  generatedAt: string;
+  stations: number;
+  waiting: number;
+  fireNext: { orderId: string; orderNumber: string; prepMinutes: number; fireBy: string }[];
+  tickets: ScheduledTicket[];
+}